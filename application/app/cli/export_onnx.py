@@ -0,0 +1,64 @@
+import os
+import sys
+import argparse
+
+def main(argv=None):
+    """
+    학습된 모델을 ONNX 로 변환 (배치/시퀀스 축 동적).
+
+    python -m app.cli.export_onnx <model.pt> [-o <출력.onnx>] [--opset 18]
+    → onnxruntime 이 있으면 torch 출력과 비교(parity)까지 확인
+    """
+    import app.models.OnnxBackend as OnnxBackend
+
+    parser = argparse.ArgumentParser(description="TransformerMacroAutoencoder ONNX 변환")
+    parser.add_argument("model", help="모델 가중치 (.pt)")
+    parser.add_argument("-o", "--output", default=None, help="출력 경로 (기본값: <모델명>.onnx)")
+    parser.add_argument("--opset", type=int, default=OnnxBackend.ONNX_OPSET, help="ONNX opset 버전")
+    args = parser.parse_args(argv)
+
+    import numpy as np
+    import torch
+
+    import app.core.globals as g_vars
+    from app.models.TransformerMacroDetector import TransformerMacroAutoencoder
+
+    path = OnnxBackend.export_onnx(args.model, args.output, opset=args.opset)
+    print(f"💾 ONNX 저장: {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+
+    try:
+        session = OnnxBackend.OnnxAutoencoder(path)
+    except ImportError as e:
+        print(f"⚠️ parity 확인 생략: {e}")
+        return 0
+
+    model = TransformerMacroAutoencoder(
+        input_size=g_vars.input_size,
+        d_model=g_vars.d_model,
+        nhead=g_vars.n_head,
+        num_layers=g_vars.num_layers,
+        dim_feedforward=g_vars.dim_feedforward,
+        dropout=g_vars.dropout
+    )
+    model.load_state_dict(torch.load(args.model, map_location="cpu", weights_only=True))
+    model.eval()
+
+    # 내보낼 때와 다른 배치/시퀀스 길이로 동적 축 확인
+    worst = 0.0
+    rng = np.random.default_rng(0)
+    for batch, seq_len in ((1, g_vars.SEQ_LEN), (5, g_vars.SEQ_LEN), (3, max(g_vars.SEQ_LEN // 2, 1))):
+        x = rng.standard_normal((batch, seq_len, g_vars.input_size)).astype(np.float32)
+        with torch.no_grad():
+            expected = model(torch.from_numpy(x)).numpy()
+        err = float(np.abs(session(x) - expected).max())
+        worst = max(worst, err)
+        print(f"   batch {batch}, seq {seq_len}: 최대 오차 {err:.2e}")
+
+    if worst > 1e-4:
+        print(f"❌ parity 실패 (최대 오차 {worst:.2e})")
+        return 1
+    print(f"✅ parity 통과 (최대 오차 {worst:.2e})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import os
+import sys
+import json
+import argparse
+
+def main(argv=None):
+    """
+    int8 양자화 가중치 생성 + 보정(calibration) 리포트.
+
+    python -m app.cli.quantize <model.pt> <scaler.pkl> <기록.json> [<기록.json> ...]
+    → <모델명>_int8.pt, <모델명>_int8_report.json 저장
+    """
+    parser = argparse.ArgumentParser(description="TransformerMacroAutoencoder int8 동적 양자화 및 보정 리포트")
+    parser.add_argument("model", help="fp32 모델 가중치 (.pt)")
+    parser.add_argument("scaler", help="모델과 같이 학습된 스케일러 (.pkl)")
+    parser.add_argument("recordings", nargs="+", help="보정용 기록 JSON (user/ 기록 권장)")
+    parser.add_argument("--stride", type=int, default=None, help="보정 윈도우 간격 (기본값: STRIDE)")
+    parser.add_argument("--no-save", action="store_true", help="리포트만 출력하고 int8 가중치는 저장하지 않음")
+    args = parser.parse_args(argv)
+
+    import numpy as np
+    import pandas as pd
+    import joblib
+    import torch
+
+    import app.core.globals as g_vars
+    import app.models.Quantization as Quantization
+    import app.repostitories.JsonController as JsonController
+    import app.repostitories.FeatureCache as FeatureCache
+    from app.models.TransformerMacroDetector import TransformerMacroAutoencoder
+    from app.utilites.make_sequence import make_seq
+
+    model = TransformerMacroAutoencoder(
+        input_size=g_vars.input_size,
+        d_model=g_vars.d_model,
+        nhead=g_vars.n_head,
+        num_layers=g_vars.num_layers,
+        dim_feedforward=g_vars.dim_feedforward,
+        dropout=g_vars.dropout
+    )
+    model.load_state_dict(torch.load(args.model, map_location="cpu", weights_only=True))
+    model.eval()
+    scaler = joblib.load(args.scaler)
+
+    stride = args.stride or g_vars.STRIDE
+    windows = []
+    for path in args.recordings:
+        def compute_features():
+            return FeatureCache.build_features(JsonController.load(path) or [])
+
+        features = FeatureCache.get_or_compute(path, compute_features)
+        if len(features) < g_vars.SEQ_LEN:
+            print(f"⚠️ 기록이 짧아 제외: {os.path.basename(path)} ({len(features)} rows)")
+            continue
+        scaled = scaler.transform(pd.DataFrame(np.asarray(features), columns=g_vars.FEATURES)) * 10
+        windows.append(np.asarray(make_seq(scaled, g_vars.SEQ_LEN, stride), dtype=np.float32))
+
+    if not windows:
+        print("❌ 보정에 쓸 윈도우가 없습니다.")
+        return 1
+    windows = np.concatenate(windows)
+
+    qmodel = Quantization.quantize_int8(model)
+    report = Quantization.calibration_report(
+        model, qmodel, windows, threshold=g_vars.threshold, batch_size=g_vars.infer_batch_size
+    )
+    print(Quantization.format_report(report))
+
+    report_path = os.path.splitext(args.model)[0] + "_int8_report.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(f"📝 리포트 저장: {report_path}")
+
+    if not args.no_save:
+        print(f"💾 int8 가중치 저장: {Quantization.save_int8(qmodel, args.model)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
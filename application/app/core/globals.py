@@ -14,7 +14,7 @@ MAX_QUEUE_SIZE = 100000
 SEQ_LEN = settings.SEQ_LEN
 STRIDE = settings.STRIDE
 
-FEATURES = FEATURES_indi
+FEATURES = list(settings.features) or FEATURES_indi
 
 input_size = len(FEATURES)
 LAST_EVENT_TS:float = 0.0
@@ -32,6 +32,33 @@ d_model=settings.d_model
 num_layers=settings.num_layers
 dropout=settings.dropout
 batch_size=settings.batch_size
+infer_batch_size=settings.infer_batch_size
+latency_budget=settings.latency_budget
+batch_max_size=settings.batch_max_size
+batch_max_wait_ms=settings.batch_max_wait_ms
+batch_p99_ms=settings.batch_p99_ms
+socket_workers=settings.socket_workers
+socket_max_message_mb=settings.socket_max_message_mb
+socket_idle_timeout=settings.socket_idle_timeout
+socket_pipeline_depth=settings.socket_pipeline_depth
+socket_max_inflight=settings.socket_max_inflight
+ip_max_inflight=settings.ip_max_inflight
+client_rate_limit=settings.client_rate_limit
+client_rate_burst=settings.client_rate_burst
+client_mb_per_sec=settings.client_mb_per_sec
+session_ttl=settings.session_ttl
+session_max=settings.session_max
+socket_processes=settings.socket_processes
+torch_threads_per_worker=settings.torch_threads_per_worker
+model_registry_max_mb=settings.model_registry_max_mb
+model_registry_max_models=settings.model_registry_max_models
+model_watch_interval=settings.model_watch_interval
+model_swap_settle=settings.model_swap_settle
+inference_backend=settings.inference_backend
+onnx_threads=settings.onnx_threads
+inference_runtime=settings.inference_runtime
+quantize=settings.quantize
+model_mmap=settings.model_mmap
 lr=settings.lr
 tolerance=settings.tolerance
 n_head=settings.n_head
@@ -43,6 +70,13 @@ dim_feedforward = settings.dim_feedforward
 
 weight_threshold = settings.weight_threshold
 
+indicator_backend = settings.indicator_backend
+indicator_workers = settings.indicator_workers
+feature_cache = settings.feature_cache
+feature_cache_max_mb = settings.feature_cache_max_mb
+train_source = settings.train_source
+corpus_name = settings.corpus_name
+
 filter_tolerance = tolerance * 100
 offset = chunk_size + 10
 
@@ -2,6 +2,9 @@ import pandas as pd
 import numpy as np
 from numba import njit
 
+from app.core.settings import settings
+from app.core.indicators_numba import compute_indicators, KERNEL_FEATURES
+
 FEATURES_indi = [
     # 평균, 표준 편차 => 그래프 형상
     "speed_mean", "speed_std", 
@@ -36,67 +39,169 @@ def fast_unique_ratio(x):
     """고유값 비율 (기록기의 양자화된 좌표/고정값 탐지)"""
     return len(np.unique(x)) / len(x)
 
-def indicators_generation(df_chunk: pd.DataFrame, chunk_size: int = None, offset: int = 0) -> pd.DataFrame:
-    empty_df = pd.DataFrame(columns=FEATURES_indi)
+# ===== 지표 레지스트리 =====
+# 이름 → (입력 목록, 계산 함수). 계산 함수는 fn(chunk_size, *입력 Series) -> Series
+# 원본 컬럼(x, y, deltatime)은 입력으로만 쓰이고, 나머지는 모두 레지스트리에 등록된 노드입니다.
+RAW_COLUMNS = ("x", "y", "deltatime")
+FEATURE_REGISTRY = {}
+
+_EPS = 1e-7
+
+def register_indicator(name: str, *inputs: str):
+    """지표 계산 함수를 입력 목록과 함께 레지스트리에 등록"""
+    def deco(fn):
+        FEATURE_REGISTRY[name] = (tuple(inputs), fn)
+        return fn
+    return deco
+
+# [A] 기본 물리량 (안정성 강화)
+register_indicator("dt", "deltatime")(lambda c, deltatime: deltatime.clip(0.005, 0.1))
+register_indicator("dx", "x")(lambda c, x: x.diff())
+register_indicator("dy", "y")(lambda c, y: y.diff())
+register_indicator("dist", "dx", "dy")(lambda c, dx, dy: np.hypot(dx, dy))
+register_indicator("speed", "dist", "dt")(lambda c, dist, dt: (dist / dt).clip(0, 5000))
+register_indicator("acc", "speed", "dt")(lambda c, speed, dt: (speed.diff() / dt).clip(-100000, 100000))
+
+# 방향 전환 및 미세 떨림
+register_indicator("theta", "dx", "dy")(lambda c, dx, dy: np.arctan2(dy, dx))
+
+@register_indicator("angle_vel", "theta", "dt")
+def _angle_vel(c, theta, dt):
+    d_theta = theta.diff()
+    return np.arctan2(np.sin(d_theta), np.cos(d_theta)) / dt
+
+register_indicator("micro_shake", "speed", "angle_vel")(
+    lambda c, speed, angle_vel: speed.diff().abs() + angle_vel.diff().abs()
+)
+
+# [B] 직선도(Straightness) 기본값 계산
+# 윈도우 내에서의 실제 변위와 총 이동거리의 비율
+register_indicator("total_path_dist", "dist")(lambda c, dist: dist.rolling(c).sum())
+register_indicator("displacement", "x", "y")(lambda c, x, y: np.hypot(x - x.shift(c), y - y.shift(c)))
+register_indicator("straightness", "displacement", "total_path_dist")(
+    lambda c, displacement, total_path_dist: (displacement / (total_path_dist + _EPS)).clip(0, 1)
+)
+
+# [C] 통계 지표 (직선도 포함)
+def _register_rolling_stats(col: str):
+    register_indicator(f"{col}_mean", col)(lambda c, v: v.rolling(c).mean())
+    register_indicator(f"{col}_std", col)(lambda c, v: v.rolling(c).std())
+    register_indicator(f"{col}_skew", col)(lambda c, v: v.rolling(c).skew())
+    register_indicator(f"{col}_rough", col)(lambda c, v: v.diff().abs().rolling(c).mean())
+
+for _col in ["speed", "acc", "straightness", "angle_vel", "micro_shake"]:
+    _register_rolling_stats(_col)
+
+# [D] 기타 핵심 분석
+register_indicator("dt_entropy", "deltatime")(
+    lambda c, deltatime: deltatime.rolling(c).apply(fast_entropy, raw=True, engine='numba')
+)
+register_indicator("speed_entropy", "speed")(
+    lambda c, speed: speed.rolling(c).apply(fast_entropy, raw=True, engine='numba')
+)
+register_indicator("bending_energy", "angle_vel")(lambda c, angle_vel: (angle_vel**2).rolling(c).mean())
+register_indicator("path_sinuosity", "total_path_dist", "displacement")(
+    lambda c, total_path_dist, displacement: (total_path_dist / (displacement + _EPS)).clip(0, 100)
+)
+
+def plan_features(features: list) -> list:
+    """요청한 지표를 만드는 데 필요한 노드만 위상 정렬 순서로 반환"""
+    order = []
+    visiting = set()
+    done = set()
+
+    def visit(name):
+        if name in RAW_COLUMNS or name in done:
+            return
+        if name not in FEATURE_REGISTRY:
+            raise KeyError(f"등록되지 않은 지표: {name}")
+        if name in visiting:
+            raise ValueError(f"지표 의존성 순환: {name}")
+        visiting.add(name)
+        for dep in FEATURE_REGISTRY[name][0]:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+        order.append(name)
+
+    for f in features:
+        visit(f)
+    return order
+
+def _run_plan(df: pd.DataFrame, plan: list, features: list, chunk_size: int) -> pd.DataFrame:
+    # 마지막으로 쓰이는 시점이 지난 중간 결과는 바로 버려서 메모리를 아낍니다.
+    last_use = {}
+    for step, name in enumerate(plan):
+        for dep in FEATURE_REGISTRY[name][0]:
+            last_use[dep] = step
+    keep = set(features)
+
+    cols = {name: df[name] for name in RAW_COLUMNS}
+    for step, name in enumerate(plan):
+        inputs, fn = FEATURE_REGISTRY[name]
+        cols[name] = fn(chunk_size, *[cols[i] for i in inputs])
+        for dep in inputs:
+            if last_use.get(dep) == step and dep not in keep:
+                del cols[dep]
+
+    return pd.DataFrame({f: cols[f] for f in features})
+
+def indicators_array(x, y, deltatime, chunk_size: int, offset: int = 0, out: np.ndarray = None,
+                     base: int = 0, features: list = None, dtype=np.float32) -> np.ndarray:
+    """
+    DataFrame 없이 (n - offset, len(features)) 지표 배열을 바로 계산 (numba 커널).
+    추론 입력용 기본값은 float32, DataFrame 경로는 pandas 경로와 같은 float64 로 받습니다.
+    """
+    features = FEATURES_indi if features is None else features
+    if len(x) <= chunk_size:
+        return np.empty((0, len(features)), dtype=dtype)
+    if out is None:
+        out = np.zeros((len(x) - max(int(offset), 0), len(features)), dtype=dtype)
+    return compute_indicators(
+        x, y, deltatime, chunk_size, offset,
+        features=features, out=out, base=base, needed=set(plan_features(features)),
+    )
+
+def indicators_generation(df_chunk: pd.DataFrame, chunk_size: int = None, offset: int = 0,
+                          backend: str = None, features: list = None) -> pd.DataFrame:
+    """
+    지표 생성. backend 는 "numba"(기본, 융합 커널) 또는 "pandas"(기존 rolling 경로).
+    두 경로는 교차 검증용으로 계속 선택할 수 있습니다.
+    features 에 있는 지표와 그 의존 노드만 계산합니다 (기본값: FEATURES_indi).
+    numba 커널이 지원하지 않는 지표(dt_entropy 등)가 섞여 있으면 pandas 경로로 계산합니다.
+    """
+    features = list(FEATURES_indi if features is None else features)
+    empty_df = pd.DataFrame(columns=features)
+    backend = backend or settings.indicator_backend
 
     if len(df_chunk) <= chunk_size:
         return empty_df    
+
+    if backend == "numba" and all(f in KERNEL_FEATURES for f in features):
+        try:
+            values = indicators_array(
+                df_chunk["x"].to_numpy(),
+                df_chunk["y"].to_numpy(),
+                df_chunk["deltatime"].to_numpy(),
+                chunk_size=chunk_size,
+                offset=offset,
+                features=features,
+                dtype=np.float64,
+            )
+            return pd.DataFrame(values, columns=features, copy=False)
+        except Exception as e:
+            return empty_df
+
     try:
-        df = df_chunk.copy()
-        eps = 1e-7
-
-        # [A] 기본 물리량 (안정성 강화)
-        dt = df["deltatime"].clip(0.005, 0.1) 
-        df["dx"] = df["x"].diff()
-        df["dy"] = df["y"].diff()
-        df["dist"] = np.hypot(df["dx"], df["dy"])
-        
-        df["speed"] = (df["dist"] / dt).clip(0, 5000)
-        df["acc"] = (df["speed"].diff() / dt).clip(-100000, 100000)
-        
-        # 방향 전환 및 미세 떨림
-        df["theta"] = np.arctan2(df["dy"], df["dx"])
-        df["angle_vel"] = np.arctan2(np.sin(df["theta"].diff()), np.cos(df["theta"].diff())) / dt
-        df["micro_shake"] = (df["speed"].diff().abs() + df["angle_vel"].diff().abs())
-
-        # [B] 직선도(Straightness) 기본값 계산
-        # 윈도우 내에서의 실제 변위와 총 이동거리의 비율
-        total_path_dist = df["dist"].rolling(chunk_size).sum()
-        displacement = np.hypot(
-            df["x"] - df["x"].shift(chunk_size), 
-            df["y"] - df["y"].shift(chunk_size)
-        )
-        df["straightness"] = (displacement / (total_path_dist + eps)).clip(0, 1)
-
-        # [C] 통계 지표 생성 루프 (직선도 포함)
-        # 이제 직선도(straightness)도 속도나 가속도처럼 통계 분석을 거칩니다.
-        target_cols = ["speed", "acc", "straightness", "angle_vel", "micro_shake"]
-        for col in target_cols:
-            roll = df[col].rolling(chunk_size)
-            
-            # 가우시안 차트용 Mean, Std
-            df[f"{col}_mean"] = roll.mean()
-            df[f"{col}_std"] = roll.std()
-            
-            # 극단값/불규칙성 탐지용 Skew, Rough
-            if f"{col}_skew" in FEATURES_indi:
-                df[f"{col}_skew"] = roll.skew()
-            if f"{col}_rough" in FEATURES_indi:
-                df[f"{col}_rough"] = df[col].diff().abs().rolling(chunk_size).mean()
-
-        # [D] 기타 핵심 분석
-        df["dt_entropy"] = df["deltatime"].rolling(chunk_size).apply(fast_entropy, raw=True, engine='numba')
-        df["speed_entropy"] = df["speed"].rolling(chunk_size).apply(fast_entropy, raw=True, engine='numba')
-        df["bending_energy"] = (df["angle_vel"]**2).rolling(chunk_size).mean()
-        df["path_sinuosity"] = (total_path_dist / (displacement + eps)).clip(0, 100)
-
-        # [E] 최종 클린업
+        plan = plan_features(features)
+        df = _run_plan(df_chunk.reset_index(drop=True), plan, features, chunk_size)
+
+        # 최종 클린업
         df = df.replace([np.inf, -np.inf], np.nan).fillna(0)
         
         if offset > 0:
             df = df.iloc[offset:].reset_index(drop=True)    
         
-        return df[FEATURES_indi]
+        return df[features]
     except Exception as e:
         return empty_df
-    
\ No newline at end of file
@@ -0,0 +1,321 @@
+import numpy as np
+from numba import njit
+
+# 커널이 계산할 수 있는 지표 (커널 내부 순서)
+# 대상 열 t(speed, acc, straightness, angle_vel, micro_shake) × 통계 s(mean, std, skew, rough) → t * 4 + s
+_TARGET_COLS = ["speed", "acc", "straightness", "angle_vel", "micro_shake"]
+_STATS = ["mean", "std", "skew", "rough"]
+
+KERNEL_FEATURES = [f"{col}_{stat}" for col in _TARGET_COLS for stat in _STATS] + [
+    "path_sinuosity", "bending_energy",
+]
+
+_IDX_SINUOSITY = 20
+_IDX_BENDING = 21
+
+
+@njit
+def _welford_add(n, mean, m2, m3, v):
+    n1 = n + 1
+    delta = v - mean
+    dn = delta / n1
+    term1 = delta * dn * n
+    mean += dn
+    m3 += term1 * dn * (n1 - 2) - 3.0 * dn * m2
+    m2 += term1
+    return n1, mean, m2, m3
+
+
+@njit
+def _merge(na, ma, m2a, m3a, nb, mb, m2b, m3b):
+    n = na + nb
+    delta = mb - ma
+    dn = delta / n
+    mean = ma + nb * dn
+    m2 = m2a + m2b + delta * dn * na * nb
+    m3 = m3a + m3b + delta * dn * dn * na * nb * (na - nb) + 3.0 * dn * (na * m2b - nb * m2a)
+    return mean, m2, m3
+
+
+@njit
+def _finite(v):
+    if np.isfinite(v):
+        return v
+    return 0.0
+
+
+@njit
+def _roll_sum(v, c, base, res):
+    """
+    길이 c 롤링 합 (블록 분해).
+    윈도우 = 이전 블록 suffix + 현재 블록 prefix 이므로 값을 더하고 빼는 누적 오차가 없고,
+    블록 경계는 전역 인덱스(base + i) 기준이라 시작 위치가 달라도 같은 비트를 냅니다.
+    윈도우가 덜 찼거나 NaN 이 섞여 있으면 NaN.
+    """
+    n = v.shape[0]
+    suf = np.zeros(c)
+    p_sum = 0.0
+    last_nan = -1
+    for i in range(n):
+        pos = (base + i) % c
+        if pos == 0 and i > 0:
+            s = 0.0
+            lo = max(i - c, 0)
+            for j in range(i - 1, lo - 1, -1):
+                s += v[j]
+                suf[j - (i - c)] = s
+            p_sum = 0.0
+
+        vi = v[i]
+        if vi != vi:
+            last_nan = i
+        p_sum += vi
+
+        start = i - c + 1
+        if start < 0 or last_nan >= start:
+            res[i] = np.nan
+            continue
+
+        total = p_sum
+        if pos + 1 < c:
+            total += suf[pos + 1]
+        res[i] = total
+
+
+@njit
+def _roll_stats(v, c, base, row0, out, col_mean, col_std, col_skew, col_rough, col_sq):
+    """
+    값 배열 v 하나에 대해 mean/std/skew, |diff| 의 rough, v**2 평균(col_sq)을 한 번에 계산해서
+    out[i - row0, col] 에 float32 로 기록합니다. col 이 -1 이면 건너뜁니다.
+    """
+    n = v.shape[0]
+    need_moments = col_mean >= 0 or col_std >= 0 or col_skew >= 0
+
+    suf_mean = np.zeros(c)
+    suf_m2 = np.zeros(c)
+    suf_m3 = np.zeros(c)
+    suf_rough = np.zeros(c)
+    suf_sq = np.zeros(c)
+
+    p_n = 0
+    p_mean = 0.0
+    p_m2 = 0.0
+    p_m3 = 0.0
+    p_rough = 0.0
+    p_sq = 0.0
+    last_nan = -1
+    last_nan_rough = -1
+    prev = np.nan
+
+    for i in range(n):
+        pos = (base + i) % c
+        if pos == 0 and i > 0:
+            # 다 찬 블록의 suffix 를 뒤에서부터 계산
+            lo = max(i - c, 0)
+            sn = 0
+            sm = 0.0
+            s2 = 0.0
+            s3 = 0.0
+            sr = 0.0
+            ss = 0.0
+            for j in range(i - 1, lo - 1, -1):
+                k = j - (i - c)
+                if need_moments:
+                    sn, sm, s2, s3 = _welford_add(sn, sm, s2, s3, v[j])
+                    suf_mean[k] = sm
+                    suf_m2[k] = s2
+                    suf_m3[k] = s3
+                if col_rough >= 0:
+                    sr += abs(v[j] - v[j - 1]) if j > 0 else np.nan
+                    suf_rough[k] = sr
+                if col_sq >= 0:
+                    ss += v[j] * v[j]
+                    suf_sq[k] = ss
+            p_n = 0
+            p_mean = 0.0
+            p_m2 = 0.0
+            p_m3 = 0.0
+            p_rough = 0.0
+            p_sq = 0.0
+
+        vi = v[i]
+        if vi != vi:
+            last_nan = i
+        rough_i = abs(vi - prev)
+        if rough_i != rough_i:
+            last_nan_rough = i
+        prev = vi
+
+        if need_moments:
+            p_n, p_mean, p_m2, p_m3 = _welford_add(p_n, p_mean, p_m2, p_m3, vi)
+        p_rough += rough_i
+        p_sq += vi * vi
+
+        if i < row0:
+            continue
+        r = i - row0
+        start = i - c + 1
+        j = pos + 1
+
+        if need_moments:
+            mean = 0.0
+            std = 0.0
+            skew = 0.0
+            if start >= 0 and last_nan < start:
+                if j < c:
+                    mean, m2, m3 = _merge(c - j, suf_mean[j], suf_m2[j], suf_m3[j], p_n, p_mean, p_m2, p_m3)
+                else:
+                    mean, m2, m3 = p_mean, p_m2, p_m3
+
+                var = m2 / (c - 1)
+                std = np.sqrt(var) if var > 0 else 0.0
+
+                # pandas roll_skew 와 동일: 분산이 1e-14 이하이면 NaN → fillna(0)
+                B = m2 / c
+                if c >= 3 and B > 1e-14:
+                    C = m3 / c
+                    skew = (np.sqrt(c * (c - 1.0)) * C) / ((c - 2) * B * np.sqrt(B))
+
+            if col_mean >= 0:
+                out[r, col_mean] = _finite(mean)
+            if col_std >= 0:
+                out[r, col_std] = _finite(std)
+            if col_skew >= 0:
+                out[r, col_skew] = _finite(skew)
+
+        if col_rough >= 0:
+            val = 0.0
+            if start >= 0 and last_nan_rough < start:
+                total = p_rough
+                if j < c:
+                    total += suf_rough[j]
+                val = total / c
+            out[r, col_rough] = _finite(val)
+
+        if col_sq >= 0:
+            val = 0.0
+            if start >= 0 and last_nan < start:
+                total = p_sq
+                if j < c:
+                    total += suf_sq[j]
+                val = total / c
+            out[r, col_sq] = _finite(val)
+
+
+@njit
+def _fused_kernel(x, y, dt, dist, angle_vel, displacement, c, base, row0, out, cols, need_straightness):
+    n = x.shape[0]
+    eps = 1e-7
+
+    # [A] 기본 물리량 (1차 패스)
+    speed = np.empty(n)
+    acc = np.empty(n)
+    micro_shake = np.empty(n)
+    prev_speed = np.nan
+    prev_av = np.nan
+    for i in range(n):
+        s = dist[i] / dt[i]
+        if s == s:
+            s = min(max(s, 0.0), 5000.0)
+        a = (s - prev_speed) / dt[i]
+        if a == a:
+            a = min(max(a, -100000.0), 100000.0)
+        speed[i] = s
+        acc[i] = a
+        micro_shake[i] = abs(s - prev_speed) + abs(angle_vel[i] - prev_av)
+        prev_speed = s
+        prev_av = angle_vel[i]
+
+    # [B] 직선도 / 굴곡도
+    straightness = np.empty(n)
+    col_sin = cols[_IDX_SINUOSITY]
+    total_path_dist = np.empty(n if need_straightness or col_sin >= 0 else 0)
+    if total_path_dist.shape[0] > 0:
+        _roll_sum(dist, c, base, total_path_dist)
+    for i in range(total_path_dist.shape[0]):
+        tpd = total_path_dist[i]
+        disp = displacement[i]
+        if i < c or tpd != tpd:
+            straightness[i] = np.nan
+            if col_sin >= 0 and i >= row0:
+                out[i - row0, col_sin] = 0.0
+            continue
+        straightness[i] = min(max(disp / (tpd + eps), 0.0), 1.0)
+        if col_sin >= 0 and i >= row0:
+            out[i - row0, col_sin] = _finite(min(max(tpd / (disp + eps), 0.0), 100.0))
+
+    # [C] 롤링 통계 (2차 패스) - bending_energy 는 angle_vel 패스에서 v**2 평균으로 같이 계산
+    series = (speed, acc, straightness, angle_vel, micro_shake)
+    for t in range(5):
+        col_sq = cols[_IDX_BENDING] if t == 3 else -1
+        if cols[t * 4] < 0 and cols[t * 4 + 1] < 0 and cols[t * 4 + 2] < 0 and cols[t * 4 + 3] < 0 and col_sq < 0:
+            continue
+        _roll_stats(
+            series[t], c, base, row0, out,
+            cols[t * 4], cols[t * 4 + 1], cols[t * 4 + 2], cols[t * 4 + 3], col_sq,
+        )
+
+
+def compute_indicators(x, y, deltatime, chunk_size: int, offset: int = 0, features=None,
+                       out: np.ndarray = None, base: int = 0, needed: set = None) -> np.ndarray:
+    """
+    indicators_generation 의 numba 백엔드.
+
+    DataFrame 없이 x, y, deltatime 배열에서 바로 지표를 계산하고, (n - offset, len(features)) float32 배열
+    (out 을 주면 그 배열, float32 또는 float64)에 기록합니다. features 는 KERNEL_FEATURES 의 부분집합이어야 합니다.
+    base 는 x[0] 의 전역 인덱스로, 샤드 단위로 나눠 계산해도 전체 계산과 같은 비트를 내기 위해 씁니다.
+    needed 는 지표 플래너(plan_features)가 고른 노드 집합으로, 필요 없는 중간값(각속도, 변위 등)은 건너뜁니다.
+    """
+    features = list(KERNEL_FEATURES) if features is None else list(features)
+    unknown = [f for f in features if f not in KERNEL_FEATURES]
+    if unknown:
+        raise ValueError(f"numba 백엔드 미지원 지표: {unknown}")
+
+    c = int(chunk_size)
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    n = x.shape[0]
+    row0 = max(int(offset), 0)
+    n_out = max(n - row0, 0)
+
+    if out is None:
+        out = np.zeros((n_out, len(features)), dtype=np.float32)
+    elif out.shape != (n_out, len(features)) or out.dtype not in (np.float32, np.float64):
+        raise ValueError(f"out 배열 형태 오류: {out.shape} {out.dtype} (기대값: {(n_out, len(features))} float32/float64)")
+
+    if n_out == 0:
+        return out
+
+    cols = np.full(len(KERNEL_FEATURES), -1, dtype=np.int64)
+    for k, f in enumerate(features):
+        cols[KERNEL_FEATURES.index(f)] = k
+
+    dt = np.clip(np.asarray(deltatime, dtype=np.float64), 0.005, 0.1)
+
+    def need(name):
+        return needed is None or name in needed
+
+    # 삼각함수 / hypot 은 pandas 경로와 같은 numpy 구현으로 계산 (±pi 경계에서 부호가 갈리지 않도록)
+    dx = np.empty(n)
+    dy = np.empty(n)
+    dx[0] = dy[0] = np.nan
+    np.subtract(x[1:], x[:-1], out=dx[1:])
+    np.subtract(y[1:], y[:-1], out=dy[1:])
+    dist = np.hypot(dx, dy)
+
+    if need("angle_vel"):
+        theta = np.arctan2(dy, dx, out=dx)
+        d_theta = np.empty(n)
+        d_theta[0] = np.nan
+        np.subtract(theta[1:], theta[:-1], out=d_theta[1:])
+        angle_vel = np.arctan2(np.sin(d_theta), np.cos(d_theta, out=dy), out=d_theta)
+        angle_vel /= dt
+    else:
+        angle_vel = np.zeros(n)
+
+    displacement = np.full(n, np.nan)
+    if n > c and need("displacement"):
+        displacement[c:] = np.hypot(x[c:] - x[:-c], y[c:] - y[:-c])
+
+    _fused_kernel(x, y, dt, dist, angle_vel, displacement, c, int(base), row0, out, cols, need("straightness"))
+    return out
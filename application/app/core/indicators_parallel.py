@@ -0,0 +1,93 @@
+import os
+import numpy as np
+import pandas as pd
+from multiprocessing import Pool
+
+from app.core.settings import settings
+from app.core.indicators import FEATURES_indi, indicators_array, indicators_generation
+from app.core.indicators_numba import KERNEL_FEATURES
+
+# 샤드 하나가 최소한 이만큼의 출력 행을 맡도록 함 (작은 기록은 프로세스 기동 비용이 더 큼)
+MIN_SHARD_ROWS = 200_000
+
+
+def shard_halo(chunk_size: int, offset: int) -> int:
+    """
+    샤드 앞에 붙일 겹침 구간 길이.
+    출력 행 하나는 최대 2 * chunk_size 이전 좌표까지 참조하므로 (직선도 롤링 통계),
+    chunk_size + offset 이 그보다 짧으면 늘려서 씁니다.
+    """
+    return chunk_size + max(int(offset), chunk_size + 2)
+
+
+def shard_ranges(n: int, chunk_size: int, offset: int, n_shards: int) -> list:
+    """
+    출력 행 [offset, n) 을 n_shards 개로 나누고, 각 샤드의 입력 구간 (lo, a, b) 를 반환.
+    lo 는 halo 를 포함한 입력 시작, [a, b) 는 샤드가 내보내는 출력 행 (전역 인덱스).
+    """
+    row0 = max(int(offset), 0)
+    if n <= row0:
+        return []
+    halo = shard_halo(chunk_size, offset)
+    bounds = np.linspace(row0, n, max(int(n_shards), 1) + 1).astype(np.int64)
+
+    ranges = []
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        if b <= a:
+            continue
+        lo = max(int(a) - halo, 0)
+        ranges.append((lo, int(a), int(b)))
+    return ranges
+
+
+def _shard_worker(args):
+    x, y, dt, lo, a, chunk_size, features = args
+    # base = lo 로 블록 경계를 전역 인덱스에 맞춰서, 직렬 계산과 같은 비트를 냅니다.
+    return a, indicators_array(x, y, dt, chunk_size, offset=a - lo, base=lo, features=features, dtype=np.float64)
+
+
+def indicators_generation_parallel(df_chunk: pd.DataFrame, chunk_size: int, offset: int = 0,
+                                   features: list = None, workers: int = None,
+                                   min_shard_rows: int = MIN_SHARD_ROWS) -> pd.DataFrame:
+    """
+    큰 기록용 indicators_generation 병렬 드라이버.
+
+    기록을 chunk_size + offset 겹침(halo)이 있는 샤드로 나눠 프로세스 풀에서 numba 커널로 계산하고,
+    결과를 이어 붙입니다. 결과는 직렬 indicators_generation 과 비트 단위로 같습니다.
+    numba 백엔드가 아니거나 커널이 지원하지 않는 지표가 있으면 (pandas rolling 은 시작 위치에 따라
+    부동소수점 결과가 달라짐) 직렬 경로로 계산합니다.
+    """
+    features = list(FEATURES_indi if features is None else features)
+    n = len(df_chunk)
+
+    if workers is None:
+        workers = settings.indicator_workers
+    workers = int(workers) if workers and workers > 0 else (os.cpu_count() or 1)
+
+    n_out = n - max(int(offset), 0)
+    n_shards = min(workers, max(n_out // max(int(min_shard_rows), 1), 1))
+
+    parallel_ok = (
+        settings.indicator_backend == "numba"
+        and all(f in KERNEL_FEATURES for f in features)
+        and n > chunk_size
+    )
+    if not parallel_ok or n_shards <= 1:
+        return indicators_generation(df_chunk, chunk_size, offset, features=features)
+
+    x = df_chunk["x"].to_numpy(dtype=np.float64)
+    y = df_chunk["y"].to_numpy(dtype=np.float64)
+    dt = df_chunk["deltatime"].to_numpy(dtype=np.float64)
+
+    tasks = [
+        (x[lo:b], y[lo:b], dt[lo:b], lo, a, chunk_size, features)
+        for lo, a, b in shard_ranges(n, chunk_size, offset, n_shards)
+    ]
+
+    row0 = max(int(offset), 0)
+    out = np.empty((n_out, len(features)), dtype=np.float64)
+    with Pool(processes=min(workers, len(tasks))) as pool:
+        for a, values in pool.imap_unordered(_shard_worker, tasks):
+            out[a - row0:a - row0 + len(values)] = values
+
+    return pd.DataFrame(out, columns=features, copy=False)
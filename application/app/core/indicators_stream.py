@@ -0,0 +1,332 @@
+import math
+import numpy as np
+
+from app.core.indicators import FEATURES_indi
+
+# 배치 함수(indicators_generation)와의 허용 오차
+# 지표(열)마다 |stream - batch| <= STREAM_ATOL + STREAM_RTOL * max(|batch 열|) 이면 동일하다고 봅니다.
+# - pandas rolling 은 값을 더하고 빼는 누적 갱신이라, 값이 전부 같은 구간에서도 std 에 열 최대값의 ~1e-8 정도
+#   잔여 오차가 남습니다. 스트림은 블록 분해 모멘트 병합이라 이 구간에서 정확히 0 을 냅니다.
+# - 그 외 지표는 실측상 열 최대값 대비 1e-9 이하로 일치합니다.
+STREAM_RTOL = 1e-6
+STREAM_ATOL = 1e-9
+
+
+def within_tolerance(stream_rows: np.ndarray, batch_rows: np.ndarray) -> bool:
+    """스트림 결과와 배치 결과가 문서화된 허용 오차 안에서 같은지 확인"""
+    stream_rows = np.asarray(stream_rows, dtype=np.float64)
+    batch_rows = np.asarray(batch_rows, dtype=np.float64)
+    if stream_rows.shape != batch_rows.shape:
+        return False
+    if batch_rows.size == 0:
+        return True
+    scale = np.abs(batch_rows).max(axis=0)
+    return bool(np.all(np.abs(stream_rows - batch_rows) <= STREAM_ATOL + STREAM_RTOL * scale))
+
+_EPS = 1e-7
+_NAN = float("nan")
+
+_TARGET_COLS = ["speed", "acc", "straightness", "angle_vel", "micro_shake"]
+
+
+def _welford_add(n, mean, m2, m3, v):
+    """(n, 평균, 2차/3차 중심 모멘트 합)에 값 하나를 추가"""
+    n1 = n + 1
+    delta = v - mean
+    dn = delta / n1
+    term1 = delta * dn * n
+    mean += dn
+    m3 += term1 * dn * (n1 - 2) - 3.0 * dn * m2
+    m2 += term1
+    return n1, mean, m2, m3
+
+
+def _merge(na, ma, m2a, m3a, nb, mb, m2b, m3b):
+    """두 구간의 모멘트를 병합 (Chan/Pébay 공식)"""
+    n = na + nb
+    delta = mb - ma
+    dn = delta / n
+    mean = ma + nb * dn
+    m2 = m2a + m2b + delta * dn * na * nb
+    m3 = m3a + m3b + delta * dn * dn * na * nb * (na - nb) + 3.0 * dn * (na * m2b - nb * m2a)
+    return mean, m2, m3
+
+
+class _BlockWindow:
+    """
+    길이 size 의 롤링 윈도우를 O(1)로 유지하는 링 버퍼.
+
+    윈도우 [i-size+1, i] 를 '이전 블록의 suffix' + '현재 블록의 prefix' 로 나눠서 계산합니다.
+    - prefix: 현재 블록에 들어온 값들의 누적 모멘트 (값이 들어올 때마다 Welford 갱신)
+    - suffix: 블록이 찰 때마다 한 번 뒤에서부터 계산 (size 번에 한 번 O(size) → 분할상환 O(1))
+    누적합을 더하고 빼는 방식이 아니라서 세션이 길어져도 오차가 쌓이지 않습니다.
+    """
+    __slots__ = ("size", "order", "block", "suf_sum", "suf_mean", "suf_m2", "suf_m3",
+                 "p_n", "p_sum", "p_mean", "p_m2", "p_m3", "count", "last_nan")
+
+    def __init__(self, size: int, order: int = 3):
+        self.size = size
+        self.order = order  # 1: 합/평균만, 3: 평균 + 2차/3차 중심 모멘트
+        self.block = [0.0] * size
+        self.suf_sum = [0.0] * size
+        self.suf_mean = [0.0] * size
+        self.suf_m2 = [0.0] * size
+        self.suf_m3 = [0.0] * size
+        self.reset()
+
+    def reset(self):
+        self.p_n = 0
+        self.p_sum = 0.0
+        self.p_mean = 0.0
+        self.p_m2 = 0.0
+        self.p_m3 = 0.0
+        self.count = 0
+        self.last_nan = -1
+
+    def _seal(self):
+        # 다 찬 블록의 suffix 모멘트를 뒤에서부터 계산
+        block = self.block
+        if self.order == 1:
+            s = 0.0
+            for j in range(self.size - 1, -1, -1):
+                s += block[j]
+                self.suf_sum[j] = s
+        else:
+            n, mean, m2, m3 = 0, 0.0, 0.0, 0.0
+            for j in range(self.size - 1, -1, -1):
+                n, mean, m2, m3 = _welford_add(n, mean, m2, m3, block[j])
+                self.suf_mean[j] = mean
+                self.suf_m2[j] = m2
+                self.suf_m3[j] = m3
+
+        self.p_n = 0
+        self.p_sum = 0.0
+        self.p_mean = 0.0
+        self.p_m2 = 0.0
+        self.p_m3 = 0.0
+
+    def push(self, v: float):
+        pos = self.count % self.size
+        if pos == 0 and self.count > 0:
+            self._seal()
+
+        if v != v:
+            self.last_nan = self.count
+
+        self.block[pos] = v
+        if self.order == 1:
+            self.p_sum += v
+            self.p_n += 1
+        else:
+            self.p_n, self.p_mean, self.p_m2, self.p_m3 = _welford_add(
+                self.p_n, self.p_mean, self.p_m2, self.p_m3, v
+            )
+        self.count += 1
+
+    def ready(self) -> bool:
+        """윈도우가 가득 찼고 NaN 이 섞여 있지 않은지 (pandas rolling 의 min_periods=size 와 동일)"""
+        return self.count >= self.size and self.last_nan < self.count - self.size
+
+    def total(self) -> float:
+        pos = (self.count - 1) % self.size
+        s = self.p_sum
+        if pos + 1 < self.size:
+            s += self.suf_sum[pos + 1]
+        return s
+
+    def mean(self) -> float:
+        if self.order == 1:
+            return self.total() / self.size
+        return self.moments()[0]
+
+    def moments(self):
+        """(평균, 2차 중심 모멘트 합, 3차 중심 모멘트 합)"""
+        pos = (self.count - 1) % self.size
+        if pos + 1 >= self.size:
+            return self.p_mean, self.p_m2, self.p_m3
+        j = pos + 1
+        return _merge(
+            self.size - j, self.suf_mean[j], self.suf_m2[j], self.suf_m3[j],
+            self.p_n, self.p_mean, self.p_m2, self.p_m3,
+        )
+
+
+def _std(m2: float, n: int) -> float:
+    var = m2 / (n - 1)
+    return math.sqrt(var) if var > 0 else 0.0
+
+
+def _skew(m2: float, m3: float, n: int) -> float:
+    # pandas roll_skew 와 동일: 분산이 1e-14 이하이면 NaN → fillna(0)
+    B = m2 / n
+    if n < 3 or B <= 1e-14:
+        return 0.0
+    C = m3 / n
+    return (math.sqrt(n * (n - 1.0)) * C) / ((n - 2) * B * math.sqrt(B))
+
+
+def _finite(v: float) -> float:
+    # replace([inf, -inf], nan).fillna(0) 과 동일
+    return v if math.isfinite(v) else 0.0
+
+
+class StreamingIndicators:
+    """
+    indicators_generation 의 스트리밍 버전.
+
+    점 하나가 들어올 때마다 FEATURES_indi 한 줄을 O(1)로 계산합니다.
+    - push() 가 반환하는 행은 같은 점들을 indicators_generation(df, chunk_size, offset) 에 넣었을 때의
+      해당 행과 within_tolerance() 기준으로 같습니다.
+    - 처음 offset 개의 점은 배치 함수에서 잘려 나가는 구간이므로 None 을 반환합니다.
+    - max_deltatime 을 주면 deltatime 이 그보다 큰 점은 버립니다 (filter_tolerance 필터와 동일).
+    """
+
+    def __init__(self, chunk_size: int, offset: int = 0, features: list = None, max_deltatime: float = None):
+        self.chunk_size = int(chunk_size)
+        self.offset = int(offset)
+        self.features = list(features) if features is not None else list(FEATURES_indi)
+        self.max_deltatime = max_deltatime
+
+        supported = set(self._row_template())
+        unknown = [f for f in self.features if f not in supported]
+        if unknown:
+            raise ValueError(f"스트리밍 미지원 지표: {unknown}")
+
+        c = self.chunk_size
+        self._dist = _BlockWindow(c, order=1)
+        self._bending = _BlockWindow(c, order=1)
+        self._stats = {col: _BlockWindow(c, order=3) for col in _TARGET_COLS}
+        self._rough = {col: _BlockWindow(c, order=1) for col in _TARGET_COLS}
+
+        # displacement 계산용 좌표 링 버퍼 (x.shift(chunk_size))
+        self._xs = [0.0] * (c + 1)
+        self._ys = [0.0] * (c + 1)
+        self.reset()
+
+    @staticmethod
+    def _row_template():
+        row = {}
+        for col in _TARGET_COLS:
+            row[f"{col}_mean"] = 0.0
+            row[f"{col}_std"] = 0.0
+            row[f"{col}_skew"] = 0.0
+            row[f"{col}_rough"] = 0.0
+        row["path_sinuosity"] = 0.0
+        row["bending_energy"] = 0.0
+        return row
+
+    def reset(self):
+        """세션 상태 초기화"""
+        self.n = 0
+        self._prev_x = self._prev_y = _NAN
+        self._prev_speed = _NAN
+        self._prev_theta = _NAN
+        self._prev_angle_vel = _NAN
+        self._prev = {col: _NAN for col in _TARGET_COLS}
+        self._dist.reset()
+        self._bending.reset()
+        for w in self._stats.values():
+            w.reset()
+        for w in self._rough.values():
+            w.reset()
+
+    def push(self, x: float, y: float, deltatime: float):
+        """점 하나를 추가하고, 배치 결과에 포함될 행이면 features 순서의 np.ndarray 를 반환"""
+        if self.max_deltatime is not None and deltatime > self.max_deltatime:
+            return None
+
+        c = self.chunk_size
+        x = float(x)
+        y = float(y)
+
+        # [A] 기본 물리량
+        dt = min(max(float(deltatime), 0.005), 0.1)
+        dx = x - self._prev_x
+        dy = y - self._prev_y
+        # 배치 함수와 비트 단위로 맞추기 위해 삼각함수/hypot 은 numpy 구현을 사용
+        # (math.atan2 와 np.arctan2 는 1 ulp 차이가 날 수 있고, 방향이 정확히 반전되는 점에서 ±pi 부호가 갈림)
+        dist = float(np.hypot(dx, dy))
+
+        speed = dist / dt
+        if speed == speed:
+            speed = min(max(speed, 0.0), 5000.0)
+
+        acc = (speed - self._prev_speed) / dt
+        if acc == acc:
+            acc = min(max(acc, -100000.0), 100000.0)
+
+        theta = float(np.arctan2(dy, dx))
+        d_theta = theta - self._prev_theta
+        angle_vel = float(np.arctan2(np.sin(d_theta), np.cos(d_theta))) / dt
+        micro_shake = abs(speed - self._prev_speed) + abs(angle_vel - self._prev_angle_vel)
+
+        # [B] 직선도
+        self._dist.push(dist)
+        k = self.n % (c + 1)
+        self._xs[k] = x
+        self._ys[k] = y
+        if self.n >= c and self._dist.ready():
+            # 링 버퍼 크기가 c+1 이므로 바로 다음 칸이 c 스텝 이전 좌표
+            old = (self.n + 1) % (c + 1)
+            displacement = float(np.hypot(x - self._xs[old], y - self._ys[old]))
+            total_path_dist = self._dist.total()
+            straightness = min(max(displacement / (total_path_dist + _EPS), 0.0), 1.0)
+            path_sinuosity = min(max(total_path_dist / (displacement + _EPS), 0.0), 100.0)
+        else:
+            straightness = _NAN
+            path_sinuosity = _NAN
+
+        # [C] 롤링 통계
+        values = {
+            "speed": speed,
+            "acc": acc,
+            "straightness": straightness,
+            "angle_vel": angle_vel,
+            "micro_shake": micro_shake,
+        }
+        row = self._row_template()
+        for col in _TARGET_COLS:
+            v = values[col]
+            stats = self._stats[col]
+            rough = self._rough[col]
+            stats.push(v)
+            rough.push(abs(v - self._prev[col]))
+            self._prev[col] = v
+
+            if stats.ready():
+                mean, m2, m3 = stats.moments()
+                row[f"{col}_mean"] = _finite(mean)
+                row[f"{col}_std"] = _finite(_std(m2, c))
+                row[f"{col}_skew"] = _finite(_skew(m2, m3, c))
+            if rough.ready():
+                row[f"{col}_rough"] = _finite(rough.mean())
+
+        # [D] 기타 핵심 분석
+        self._bending.push(angle_vel * angle_vel)
+        if self._bending.ready():
+            row["bending_energy"] = _finite(self._bending.mean())
+        if path_sinuosity == path_sinuosity:
+            row["path_sinuosity"] = _finite(path_sinuosity)
+
+        self._prev_x, self._prev_y = x, y
+        self._prev_speed = speed
+        self._prev_theta = theta
+        self._prev_angle_vel = angle_vel
+
+        idx = self.n
+        self.n += 1
+        if idx < self.offset:
+            return None
+
+        return np.array([row[f] for f in self.features], dtype=np.float64)
+
+    def push_many(self, points) -> np.ndarray:
+        """(x, y, deltatime) 묶음을 차례로 넣고 새로 생긴 행들을 (k, len(features)) 로 반환"""
+        rows = []
+        for x, y, dt in points:
+            row = self.push(x, y, dt)
+            if row is not None:
+                rows.append(row)
+        if not rows:
+            return np.empty((0, len(self.features)), dtype=np.float64)
+        return np.vstack(rows)
@@ -14,6 +14,33 @@ class Settings:
         self.num_layers: int = 3
         self.dropout: float = 0.3
         self.batch_size: int = 64
+        self.infer_batch_size: int = 8  # 추론 시 한 번에 forward 하는 윈도우 수
+        self.inference_backend: str = "torch"  # "torch" | "onnx"(onnxruntime CPU, torch 미사용)
+        self.onnx_threads: int = 0  # onnxruntime intra-op 스레드 수 (0 이면 기본값)
+        self.inference_runtime: str = "eager"  # "eager" | "compiled"(TorchScript 고정 모델, 서버처럼 warmup 하는 경우 권장)
+        self.quantize: str = "none"  # "none" | "int8" (CPU 추론 시 nn.Linear 동적 양자화)
+        self.model_mmap: str = "auto"  # "auto"(워커 풀 socket_processes > 1 일 때만) | "on" | "off" : CPU 가중치를 메모리 맵 파일로 읽어 워커끼리 공유
+        self.latency_budget: float = 0.25  # 실시간 추론 판정 지연 허용치 (초)
+        self.batch_max_size: int = 8  # 서버: 여러 세션 윈도우를 모아 한 번에 forward 하는 최대 개수
+        self.batch_max_wait_ms: float = 5.0  # 서버: 배치가 덜 차도 이 시간이 지나면 실행
+        self.batch_p99_ms: float = 100.0  # 서버: 배치 지연 p99 상한 (넘으면 배치 크기 축소)
+        self.socket_workers: int = 8  # 서버: 요청을 판정하는 executor 스레드 수
+        self.socket_max_message_mb: float = 64  # 서버: 요청 하나의 최대 크기
+        self.socket_idle_timeout: float = 300.0  # 서버: 이 시간 동안 요청이 없으면 연결 종료 (초)
+        self.socket_pipeline_depth: int = 8  # 서버: 연결마다 처리 대기 중인 요청을 미리 받아 두는 개수 (연결 하나의 처리 대기/중 요청 상한)
+        self.socket_max_inflight: int = 256  # 서버: 전체 처리 대기/중 요청 한도 (넘으면 503 으로 바로 거절)
+        self.ip_max_inflight: int = 128  # 서버: 같은 IP 에서 온 연결 전체의 처리 대기/중 요청 한도 (넘으면 429, 연결 하나는 socket_pipeline_depth 로 제한)
+        self.client_rate_limit: float = 200.0  # 서버: IP 별 초당 요청 수 (토큰 버킷, 그 IP 의 모든 연결 합산, 0 = 제한 없음)
+        self.client_rate_burst: int = 400  # 서버: IP 별 순간 허용 요청 수
+        self.client_mb_per_sec: float = 64.0  # 서버: IP 별 초당 요청 크기 (모든 연결 합산, 0 = 제한 없음)
+        self.session_ttl: float = 120.0  # 서버: 스트리밍 세션을 이 시간 동안 안 쓰면 만료 (초)
+        self.session_max: int = 10000  # 서버: 동시에 유지하는 스트리밍 세션 수
+        self.socket_processes: int = 1  # 서버: 추론 워커 프로세스 수 (1 = 프로세스 하나로 처리, 0 = CPU 코어 수)
+        self.torch_threads_per_worker: int = 0  # 서버: 워커 프로세스당 torch 스레드 수 (0 = 코어 수 / 워커 수)
+        self.model_registry_max_mb: int = 512  # 메모리에 올려 두는 모델+스케일러 총 크기
+        self.model_registry_max_models: int = 16
+        self.model_watch_interval: float = 5.0  # 모델/스케일러 파일 변경 확인 간격 (초, 0 이면 감시 안 함)
+        self.model_swap_settle: float = 2.0  # 파일 저장 후 이 시간 동안 바뀌지 않아야 새 모델로 교체
         self.lr: float = 0.0005
         self.CLIP_BOUNDS: dict = {}
         self.n_head: int = 4
@@ -24,6 +51,13 @@ class Settings:
         self.dim_feedforward: int = 128
         self.improvement_val_loss_cut: float = 0.9
         self.chunk_size: int = 50
+        self.indicator_backend: str = "numba"  # "numba" | "pandas"
+        self.indicator_workers: int = 0  # 지표 병렬 계산 프로세스 수 (0 이면 CPU 코어 수)
+        self.features: list = []  # 사용할 지표 목록 (비어 있으면 FEATURES_indi 전체)
+        self.feature_cache: bool = True
+        self.feature_cache_max_mb: int = 1024
+        self.train_source: str = "json"  # "json"(파일 하나 선택) | "corpus"(user/, move_data/ 전체)
+        self.corpus_name: str = "corpus"
 
     @classmethod
     def load_settings(cls):
@@ -0,0 +1,161 @@
+import struct
+
+import numpy as np
+
+# 점 묶음용 바이너리 프로토콜 (JSON 과 같이 사용, 길이 접두 프레임 본문으로 전송).
+# 숫자는 모두 little-endian 이고, 배열은 복사 없이 np.frombuffer 로 바로 읽습니다.
+# 지표 계산에는 x, y, deltatime 만 쓰이므로 timestamp 는 보내지 않습니다.
+#
+# 요청: [헤더][id][model_id][x n개][y n개][deltatime n개]
+#   헤더 = magic "MDB1" | version u8 | flags u8 | id 길이 u16 | model_id 길이 u16 | 점 개수 n u32
+#   x, y      : int32 (flags & XY_FLOAT32 이면 float32)
+#   deltatime : float32 (flags & DT_FLOAT64 이면 float64)
+#   flags & SESSION_PUSH : id 는 스트리밍 세션 ID, 점은 이전 요청에 이어지는 새 점 (새 윈도우 판정만 응답)
+#   flags & SESSION_OPEN : 같은 ID 로 세션을 새로 열고 나서 점 추가
+#   flags & ALL_WINDOWS  : (SESSION_OPEN 과 같이) STRIDE 간격이 아니라 모든 윈도우를 판정 (청크 업로드용)
+#   flags & SESSION_CLOSE: 점 추가/판정 후 세션 닫기 (업로드 마지막 청크)
+#
+# 응답: [헤더][id][message][error_pct float32 n개][is_human u8 n개]
+#   헤더 = magic "MDR1" | version u8 | 예약 u8 | status u16 | id 길이 u16 | message 길이 u16 | 판정 개수 n u32
+REQUEST_MAGIC = b"MDB1"
+RESPONSE_MAGIC = b"MDR1"
+VERSION = 1
+
+XY_FLOAT32 = 0x01
+DT_FLOAT64 = 0x02
+SESSION_PUSH = 0x04
+SESSION_OPEN = 0x08
+ALL_WINDOWS = 0x10
+SESSION_CLOSE = 0x20
+
+REQUEST_HEADER = struct.Struct("<4sBBHHI")
+RESPONSE_HEADER = struct.Struct("<4sBBHHHI")
+_U16_MAX = 0xFFFF
+
+class ProtocolError(ValueError):
+    pass
+
+def is_binary_request(body: bytes) -> bool:
+    return body[:4] == REQUEST_MAGIC
+
+def peek_request(body: bytes) -> tuple:
+    """요청 본문 → (flags, id). 배열은 읽지 않음 (라우팅/에러 응답용)"""
+    if len(body) < REQUEST_HEADER.size:
+        return 0, None
+    _, _, flags, id_len, _, _ = REQUEST_HEADER.unpack_from(body)
+    start = REQUEST_HEADER.size
+    return flags, body[start:start + id_len].decode("utf-8", "replace")
+
+def encode_request(req_id: str, x, y, deltatime, model_id: str = None, session: str = None,
+                   all_windows: bool = False, close: bool = False) -> bytes:
+    """
+    클라이언트용: 좌표/시간 간격 배열 → 요청 본문
+    session: None(한 번 판정) | "push"(세션 req_id 에 이어서 추가) | "open"(세션 req_id 를 새로 열고 추가)
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    deltatime = np.asarray(deltatime)
+    flags = {None: 0, "push": SESSION_PUSH, "open": SESSION_OPEN | SESSION_PUSH}[session]
+    if all_windows:
+        flags |= ALL_WINDOWS
+    if close:
+        flags |= SESSION_CLOSE
+    if np.issubdtype(x.dtype, np.floating) or np.issubdtype(y.dtype, np.floating):
+        flags |= XY_FLOAT32
+    if deltatime.dtype == np.float64:
+        flags |= DT_FLOAT64
+
+    xy_dtype = "<f4" if flags & XY_FLOAT32 else "<i4"
+    dt_dtype = "<f8" if flags & DT_FLOAT64 else "<f4"
+    id_bytes = req_id.encode("utf-8")
+    model_bytes = (model_id or "").encode("utf-8")
+
+    return b"".join((
+        REQUEST_HEADER.pack(REQUEST_MAGIC, VERSION, flags, len(id_bytes), len(model_bytes), len(x)),
+        id_bytes,
+        model_bytes,
+        np.ascontiguousarray(x, dtype=xy_dtype).tobytes(),
+        np.ascontiguousarray(y, dtype=xy_dtype).tobytes(),
+        np.ascontiguousarray(deltatime, dtype=dt_dtype).tobytes(),
+    ))
+
+def upload_requests(upload_id: str, x, y, deltatime, chunk_points: int = 4096, model_id: str = None):
+    """
+    클라이언트용 청크 업로드: 큰 기록을 chunk_points 개씩 나눈 요청 본문들을 차례로 반환.
+    첫 청크가 모든 윈도우 판정 세션을 열고 마지막 청크가 닫습니다. 응답을 기다리지 않고 연달아 보내면
+    서버는 받는 대로 판정해서 청크별 응답(그 청크로 새로 생긴 윈도우 판정)을 순서대로 돌려줍니다.
+    """
+    n = len(x)
+    starts = range(0, max(n, 1), chunk_points)
+    for i in starts:
+        yield encode_request(
+            upload_id, x[i:i + chunk_points], y[i:i + chunk_points], deltatime[i:i + chunk_points],
+            model_id=model_id if i == 0 else None,
+            session="open" if i == 0 else "push",
+            all_windows=i == 0,
+            close=i == starts[-1],
+        )
+
+def decode_request(body: bytes) -> dict:
+    """요청 본문 → {"id", "model_id", "flags", "x", "y", "deltatime"} (배열은 body 를 그대로 보는 view)"""
+    if len(body) < REQUEST_HEADER.size:
+        raise ProtocolError("헤더가 잘렸습니다.")
+    magic, version, flags, id_len, model_len, n = REQUEST_HEADER.unpack_from(body)
+    if magic != REQUEST_MAGIC or version != VERSION:
+        raise ProtocolError(f"지원하지 않는 프로토콜: {magic!r} v{version}")
+
+    xy_dtype = np.dtype("<f4" if flags & XY_FLOAT32 else "<i4")
+    dt_dtype = np.dtype("<f8" if flags & DT_FLOAT64 else "<f4")
+    pos = REQUEST_HEADER.size
+    expected = pos + id_len + model_len + n * (2 * xy_dtype.itemsize + dt_dtype.itemsize)
+    if len(body) != expected:
+        raise ProtocolError(f"본문 길이가 맞지 않습니다: {len(body)} != {expected}")
+
+    req_id = body[pos:pos + id_len].decode("utf-8")
+    pos += id_len
+    model_id = body[pos:pos + model_len].decode("utf-8") or None
+    pos += model_len
+
+    x = np.frombuffer(body, dtype=xy_dtype, count=n, offset=pos)
+    pos += n * xy_dtype.itemsize
+    y = np.frombuffer(body, dtype=xy_dtype, count=n, offset=pos)
+    pos += n * xy_dtype.itemsize
+    deltatime = np.frombuffer(body, dtype=dt_dtype, count=n, offset=pos)
+
+    return {"id": req_id, "model_id": model_id, "flags": flags, "x": x, "y": y, "deltatime": deltatime}
+
+def encode_response(req_id: str, status: int, results: list = None, message: str = None) -> bytes:
+    """서버용: 판정 목록([{"is_human", "error_pct"}, ...]) → 응답 본문"""
+    results = results or []
+    id_bytes = (req_id or "").encode("utf-8")
+    msg_bytes = (message or "").encode("utf-8")
+    if len(msg_bytes) > _U16_MAX:
+        # 길이 필드가 u16 이라 긴 에러 메시지는 잘라서 보냄 (UTF-8 글자 중간에서 끊지 않도록)
+        msg_bytes = msg_bytes[:_U16_MAX].decode("utf-8", "ignore").encode("utf-8")
+    error_pct = np.fromiter((r["error_pct"] for r in results), dtype="<f4", count=len(results))
+    is_human = np.fromiter((r["is_human"] for r in results), dtype=np.uint8, count=len(results))
+
+    return b"".join((
+        RESPONSE_HEADER.pack(RESPONSE_MAGIC, VERSION, 0, status, len(id_bytes), len(msg_bytes), len(results)),
+        id_bytes,
+        msg_bytes,
+        error_pct.tobytes(),
+        is_human.tobytes(),
+    ))
+
+def decode_response(body: bytes) -> dict:
+    """클라이언트용: 응답 본문 → {"id", "status", "message", "error_pct", "is_human"}"""
+    magic, version, _, status, id_len, msg_len, n = RESPONSE_HEADER.unpack_from(body)
+    if magic != RESPONSE_MAGIC or version != VERSION:
+        raise ProtocolError(f"지원하지 않는 프로토콜: {magic!r} v{version}")
+
+    pos = RESPONSE_HEADER.size
+    req_id = body[pos:pos + id_len].decode("utf-8")
+    pos += id_len
+    message = body[pos:pos + msg_len].decode("utf-8") or None
+    pos += msg_len
+    error_pct = np.frombuffer(body, dtype="<f4", count=n, offset=pos)
+    pos += 4 * n
+    is_human = np.frombuffer(body, dtype=np.uint8, count=n, offset=pos).astype(bool)
+
+    return {"id": req_id, "status": status, "message": message, "error_pct": error_pct, "is_human": is_human}
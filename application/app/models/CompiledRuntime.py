@@ -0,0 +1,163 @@
+import os
+import re
+import glob
+import hashlib
+import warnings
+from multiprocessing import Queue
+
+import torch
+
+# TorchScript 로 고정(freeze)한 추론 전용 모델.
+# - (SEQ_LEN, 배치 버킷) 마다 한 번 trace → freeze → optimize_for_inference
+#   eval + no_grad 로 trace 하므로 TransformerEncoderLayer 의 fast path(_transformer_encoder_layer_fwd,
+#   fused attention)가 그래프에 그대로 들어가고, dropout 은 freeze 단계에서 제거됩니다.
+# - 결과는 .pt 옆에 <모델명>.b<버킷>_s<SEQ_LEN>.<태그>.ts 로 저장해서 다음 실행부터 trace 를 건너뜀
+#   (새로 저장할 때 태그가 다른 이전 파일은 지움)
+# - 만들거나 읽을 때마다 eager 출력과 비교(parity)해서 어긋나면 그 버킷은 eager 로 실행
+# torch.compile 은 실행 PC 에 C 컴파일러/triton 이 필요해서 배포(exe) 환경에서는 쓰지 않습니다.
+# shared_weights: 모델 가중치가 메모리 맵(SharedWeights)이면 freeze 하지 않고 trace 만 합니다.
+#   freeze/캐시 파일은 버킷마다 가중치 사본을 따로 가져서 워커 간 공유가 깨지고, trace 한 모듈은
+#   원래 모델의 파라미터를 그대로 참조합니다 (이 모델에서는 속도 차이 없음). 이때는 캐시 파일도 쓰지 않습니다.
+RUNTIME_VERSION = 1
+PARITY_ATOL = 1e-4
+_TAG_LEN = 12
+
+def batch_buckets(max_batch: int) -> list:
+    """1, 2, 4, ... max_batch 까지의 배치 버킷"""
+    buckets = []
+    b = 1
+    while b < max_batch:
+        buckets.append(b)
+        b *= 2
+    buckets.append(max(int(max_batch), 1))
+    return buckets
+
+class CompiledRuntime:
+    def __init__(self, model: torch.nn.Module, model_path: str, seq_len: int, input_size: int,
+                 device: str, max_batch: int = 1, variant: str = "fp32", shared_weights: bool = False,
+                 log_queue: Queue = None):
+        self.model = model.eval()
+        self.model_path = model_path
+        self.seq_len = int(seq_len)
+        self.input_size = int(input_size)
+        self.device = device
+        self.variant = variant  # "fp32" | "int8" - 태그가 달라 캐시를 따로 둠 (파일은 마지막으로 만든 쪽만 남음)
+        self.shared_weights = shared_weights
+        self.buckets = batch_buckets(max_batch)
+        self.log_queue = log_queue
+        self._compiled = {}
+
+    def _log(self, msg):
+        self.log_queue.put(msg) if self.log_queue else print(msg)
+
+    def _tag(self) -> str:
+        st = os.stat(self.model_path)
+        raw = "|".join(map(str, (
+            RUNTIME_VERSION, torch.__version__, st.st_size, st.st_mtime_ns,
+            self.input_size, self.device, self.variant,
+        )))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:_TAG_LEN]
+
+    def cache_path(self, bucket: int) -> str:
+        stem = os.path.splitext(self.model_path)[0]
+        return f"{stem}.b{bucket}_s{self.seq_len}.{self._tag()}.ts"
+
+    def _remove_stale(self, keep_tag: str):
+        # <모델명>.b<버킷>_s<SEQ_LEN>.<태그>.ts 만 지움 (model.pt 정리 중에 model.v2.pt 의 캐시를 지우지 않도록)
+        stem = os.path.splitext(self.model_path)[0]
+        own = re.compile(re.escape(stem) + rf"\.b\d+_s\d+\.([0-9a-f]{{{_TAG_LEN}}})\.ts")
+        for path in glob.glob(f"{glob.escape(stem)}.b*.ts"):
+            match = own.fullmatch(path)
+            if match and match.group(1) != keep_tag:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # 다른 프로세스가 읽는 중 (Windows) → 다음에 다시
+
+    def _example(self, bucket: int) -> torch.Tensor:
+        gen = torch.Generator().manual_seed(0)
+        return torch.rand(bucket, self.seq_len, self.input_size, generator=gen).to(self.device)
+
+    def parity(self, compiled, bucket: int) -> float:
+        """같은 입력에 대한 eager 출력과의 최대 절대 오차"""
+        x = self._example(bucket)
+        with torch.no_grad():
+            return (compiled(x) - self.model(x)).abs().max().item()
+
+    def _build(self, bucket: int):
+        x = self._example(bucket)
+        with torch.no_grad(), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            # 출력 검증은 아래 parity() 에서 하므로 trace 자체의 재실행 검사는 생략
+            traced = torch.jit.trace(self.model, x, check_trace=False)
+            if self.shared_weights:
+                return traced
+            return torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+
+    def _load_or_build(self, bucket: int):
+        path = self.cache_path(bucket)
+        compiled = None
+        if not self.shared_weights and os.path.exists(path):
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    compiled = torch.jit.load(path, map_location=self.device)
+            except Exception as e:
+                self._log(f"⚠️ 컴파일 캐시 읽기 실패 (다시 생성): {e}")
+
+        built = compiled is None
+        if built:
+            compiled = self._build(bucket)
+
+        err = self.parity(compiled, bucket)
+        if err > PARITY_ATOL:
+            self._log(f"⚠️ 컴파일 모델 parity 실패 (batch {bucket}, 오차 {err:.2e}) → eager 사용")
+            if not built:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return None
+
+        if built and not self.shared_weights:
+            try:
+                tmp_path = path + f".{os.getpid()}.tmp"
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    torch.jit.save(compiled, tmp_path)
+                os.replace(tmp_path, path)
+                self._remove_stale(self._tag())
+            except Exception as e:
+                self._log(f"⚠️ 컴파일 캐시 저장 실패: {e}")
+        self._log(f"⚡ 컴파일 모델 준비 (batch {bucket}, SEQ_LEN {self.seq_len}, parity {err:.1e})")
+        return compiled
+
+    def _get(self, bucket: int):
+        if bucket not in self._compiled:
+            try:
+                self._compiled[bucket] = self._load_or_build(bucket)
+            except Exception as e:
+                self._log(f"⚠️ 모델 컴파일 실패 (batch {bucket}) → eager 사용: {e}")
+                self._compiled[bucket] = None
+        return self._compiled[bucket]
+
+    def warmup(self):
+        """모든 버킷을 미리 준비 (첫 판정 지연 방지)"""
+        for bucket in self.buckets:
+            self._get(bucket)
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        b = x.shape[0]
+        if x.dim() != 3 or x.shape[1] != self.seq_len or b > self.buckets[-1]:
+            return self.model(x)
+
+        bucket = next(k for k in self.buckets if k >= b)
+        compiled = self._get(bucket)
+        if compiled is None:
+            return self.model(x)
+
+        if b < bucket:
+            # 버킷 크기에 맞게 0 으로 채워서 실행하고 앞부분만 사용 (샘플끼리는 독립)
+            pad = x.new_zeros((bucket - b,) + tuple(x.shape[1:]))
+            return compiled(torch.cat([x, pad], dim=0))[:b]
+        return compiled(x)
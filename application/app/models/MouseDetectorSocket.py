@@ -4,9 +4,25 @@ from typing import List, Optional
 class RequestBody(BaseModel):
     id: str
     data : List[dict]
+    model_id: Optional[str] = None  # 학습 시 filename (<ID>_model.pt / <ID>_scaler.pkl), 없으면 기본 모델
 
 class ResponseBody(BaseModel):
     id: str
     status: int
     analysis_results: List[dict]
-    message: Optional[str] = None
\ No newline at end of file
+    message: Optional[str] = None
+
+class AdminRequest(BaseModel):
+    # "stats" | "reload"(바뀐 모델 파일 바로 다시 읽기) | "load"(기본 모델을 model_id 모델로 교체)
+    # 임의 경로의 파일을 읽게(unpickle) 하지 않도록 모델은 학습 저장 경로의 model_id 로만 지정합니다.
+    admin: str
+    model_id: Optional[str] = None
+
+class SessionRequest(BaseModel):
+    # "open"(세션 열기) | "push"(새 점 추가 → 새 윈도우 판정) | "close"
+    # 워커 풀(socket_processes > 1)은 큰 push 를 파싱하지 않고 앞 4 KB 에서 session/session_id 를 찾으므로 data 보다 앞에 둡니다.
+    session: str
+    session_id: Optional[str] = None
+    model_id: Optional[str] = None
+    stride: Optional[int] = None  # open: 판정 간격 (1 이면 모든 윈도우, 청크 업로드용)
+    data: List[dict] = []
@@ -0,0 +1,114 @@
+import os
+import warnings
+from multiprocessing import Queue
+
+import numpy as np
+
+# ONNX Runtime(CPU) 추론 백엔드.
+# 점수 계산 프로세스에서 torch 를 import 하지 않도록, 이 모듈은 numpy/onnxruntime 만 씁니다.
+# (torch 는 .pt → .onnx 변환(export_onnx)할 때만 함수 안에서 import)
+ONNX_OPSET = 18
+INPUT_NAME = "input"
+OUTPUT_NAME = "output"
+
+def onnx_path_for(model_path: str) -> str:
+    """<모델명>.pt → <모델명>.onnx (.onnx 를 주면 그대로)"""
+    if model_path.lower().endswith(".onnx"):
+        return model_path
+    return os.path.splitext(model_path)[0] + ".onnx"
+
+def export_onnx(model_path: str, onnx_path: str = None, opset: int = ONNX_OPSET) -> str:
+    """
+    학습된 _model.pt 를 배치/시퀀스 축이 동적인 ONNX 그래프로 변환합니다.
+    (torch.onnx dynamo exporter 사용 - onnx, onnxscript 패키지 필요)
+    """
+    import torch
+    import app.core.globals as g_vars
+    from app.models.TransformerMacroDetector import TransformerMacroAutoencoder
+
+    onnx_path = onnx_path or onnx_path_for(model_path)
+
+    model = TransformerMacroAutoencoder(
+        input_size=g_vars.input_size,
+        d_model=g_vars.d_model,
+        nhead=g_vars.n_head,
+        num_layers=g_vars.num_layers,
+        dim_feedforward=g_vars.dim_feedforward,
+        dropout=g_vars.dropout
+    )
+    model.load_state_dict(torch.load(model_path, map_location="cpu", weights_only=True))
+    model.eval()
+
+    example = torch.zeros(2, g_vars.SEQ_LEN, g_vars.input_size)
+    # pos_encoder 최대 길이(500)까지 시퀀스 축을 열어 둠
+    batch = torch.export.Dim("batch")
+    seq = torch.export.Dim("seq", max=model.pos_encoder.shape[1])
+
+    # eval fast path(_transformer_encoder_layer_fwd)는 ONNX 연산자로 바꿀 수 없어서 변환 중에는 끕니다.
+    fastpath = torch.backends.mha.get_fastpath_enabled()
+    torch.backends.mha.set_fastpath_enabled(False)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            program = torch.onnx.export(
+                model, (example,),
+                input_names=[INPUT_NAME],
+                output_names=[OUTPUT_NAME],
+                dynamic_shapes={"x": {0: batch, 1: seq}},
+                opset_version=opset,
+                dynamo=True,
+            )
+        tmp_path = onnx_path + f".{os.getpid()}.tmp"
+        program.save(tmp_path)
+        os.replace(tmp_path, onnx_path)
+    finally:
+        torch.backends.mha.set_fastpath_enabled(fastpath)
+
+    return onnx_path
+
+def mse_per_sample(outputs: np.ndarray, batch: np.ndarray) -> np.ndarray:
+    """Loss_Calculation(MSE) 의 numpy 버전: 샘플별 평균 제곱 오차"""
+    diff = outputs - batch
+    return np.mean(diff * diff, axis=(1, 2))
+
+class OnnxAutoencoder:
+    """onnxruntime CPUExecutionProvider 세션 래퍼. (batch, seq, F) float32 → 재구성 결과"""
+    def __init__(self, onnx_path: str, intra_op_threads: int = 0):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("onnx 백엔드를 쓰려면 onnxruntime 패키지가 필요합니다 (pip install onnxruntime)") from e
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+
+        self.path = onnx_path
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        return self.session.run([OUTPUT_NAME], {INPUT_NAME: x})[0]
+
+    def errors(self, x: np.ndarray) -> np.ndarray:
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        return mse_per_sample(self(x), x)
+
+def load_session(model_path: str, intra_op_threads: int = 0, log_queue: Queue = None) -> OnnxAutoencoder:
+    """model_path(.pt 또는 .onnx)에 맞는 ONNX 세션. .onnx 가 없거나 .pt 보다 오래됐으면 먼저 변환합니다."""
+    def log(msg):
+        log_queue.put(msg) if log_queue else print(msg)
+
+    onnx_path = onnx_path_for(model_path)
+    stale = (
+        onnx_path != model_path and os.path.exists(model_path)
+        and (not os.path.exists(onnx_path) or os.path.getmtime(onnx_path) < os.path.getmtime(model_path))
+    )
+    if stale:
+        log(f"🔄 ONNX 변환 중: {os.path.basename(model_path)}")
+        export_onnx(model_path, onnx_path)
+
+    session = OnnxAutoencoder(onnx_path, intra_op_threads=intra_op_threads)
+    log(f"⚡ ONNX Runtime 백엔드: {os.path.basename(onnx_path)}")
+    return session
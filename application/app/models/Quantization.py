@@ -0,0 +1,143 @@
+import io
+import os
+import time
+import warnings
+from multiprocessing import Queue
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from app.utilites.loss_caculation import Loss_Calculation, recommend_threshold
+
+# CPU 전용 서버용 int8 동적 양자화.
+# nn.Linear (embedding, FFN linear1/linear2, decoder) 가중치를 int8 로 바꾸고, 활성값은 실행 시 양자화합니다.
+# self-attention 의 in_proj 는 nn.Linear 가 아니라서 fp32 로 남습니다.
+INT8_SUFFIX = "_int8.pt"
+
+def int8_path(model_path: str) -> str:
+    """fp32 가중치 옆에 두는 사전 양자화 가중치 경로 (<모델명>_int8.pt)"""
+    return os.path.splitext(model_path)[0] + INT8_SUFFIX
+
+def _disable_encoder_fastpath(model: nn.Module):
+    # 양자화된 Linear 는 weight 가 메서드라 TransformerEncoderLayer fast path 검사에서 에러가 납니다.
+    # 빈 forward pre-hook 을 달면 해당 레이어만 일반 경로로 실행됩니다 (fp32 모델에는 영향 없음).
+    for layer in model.modules():
+        if isinstance(layer, nn.TransformerEncoderLayer):
+            layer.register_forward_pre_hook(lambda module, args: None)
+    return model
+
+def quantize_int8(model: nn.Module) -> nn.Module:
+    """fp32 모델 → int8 동적 양자화 모델 (원본은 그대로 둠)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        qmodel = torch.ao.quantization.quantize_dynamic(model.eval(), {nn.Linear}, dtype=torch.qint8)
+    return _disable_encoder_fastpath(qmodel.eval())
+
+def save_int8(qmodel: nn.Module, model_path: str) -> str:
+    path = int8_path(model_path)
+    tmp_path = path + f".{os.getpid()}.tmp"
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        torch.save(qmodel.state_dict(), tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+def load_int8(model_path: str, model: nn.Module, log_queue: Queue = None) -> nn.Module:
+    """
+    fp32 모델을 int8 로 양자화. <모델명>_int8.pt 가 fp32 가중치보다 새 것이면 그 가중치를 읽고,
+    없으면 불러온 시점에 바로 양자화합니다.
+    """
+    def log(msg):
+        log_queue.put(msg) if log_queue else print(msg)
+
+    qmodel = quantize_int8(model)
+    path = int8_path(model_path)
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(model_path):
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                qmodel.load_state_dict(torch.load(path, map_location="cpu"))
+            log(f"⚡ int8 가중치 사용: {os.path.basename(path)}")
+        except Exception as e:
+            log(f"⚠️ int8 가중치 읽기 실패 (다시 양자화): {e}")
+            qmodel = quantize_int8(model)
+    else:
+        log("⚡ int8 동적 양자화 적용")
+    return qmodel
+
+def model_bytes(model: nn.Module) -> int:
+    buf = io.BytesIO()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        torch.save(model.state_dict(), buf)
+    return buf.getbuffer().nbytes
+
+def _errors_and_time(model: nn.Module, windows: np.ndarray, batch_size: int):
+    errors = []
+    start = time.perf_counter()
+    with torch.no_grad():
+        for i in range(0, len(windows), batch_size):
+            x = torch.from_numpy(np.ascontiguousarray(windows[i:i + batch_size], dtype=np.float32))
+            errors.append(Loss_Calculation(outputs=model(x), batch=x).numpy())
+    elapsed = time.perf_counter() - start
+    return np.concatenate(errors), elapsed / max(len(windows), 1)
+
+def _distribution(errors: np.ndarray) -> dict:
+    p50, p90, p99 = np.percentile(errors, [50, 90, 99])
+    return {
+        "mean": float(np.mean(errors)),
+        "std": float(np.std(errors)),
+        "p50": float(p50),
+        "p90": float(p90),
+        "p99": float(p99),
+        "max": float(np.max(errors)),
+    }
+
+def calibration_report(model: nn.Module, qmodel: nn.Module, windows: np.ndarray, threshold: float,
+                       batch_size: int = 8) -> dict:
+    """
+    같은 윈도우(스케일 완료된 (n, SEQ_LEN, F))에 대해 fp32 / int8 재구성 오차 분포, 학습식 임계치 변화,
+    현재 임계치 기준 판정 일치율, 윈도우당 지연과 가중치 크기를 비교합니다.
+    """
+    fp32_errors, fp32_time = _errors_and_time(model, windows, batch_size)
+    int8_errors, int8_time = _errors_and_time(qmodel, windows, batch_size)
+
+    fp32_threshold = float(recommend_threshold(fp32_errors))
+    int8_threshold = float(recommend_threshold(int8_errors))
+    rel_diff = np.abs(int8_errors - fp32_errors) / np.maximum(np.abs(fp32_errors), 1e-12)
+
+    return {
+        "windows": int(len(windows)),
+        "fp32": _distribution(fp32_errors),
+        "int8": _distribution(int8_errors),
+        "error_rel_diff": {
+            "mean": float(np.mean(rel_diff)),
+            "p99": float(np.percentile(rel_diff, 99)),
+            "max": float(np.max(rel_diff)),
+        },
+        "threshold": {
+            "current": float(threshold),
+            "fp32_recommended": fp32_threshold,
+            "int8_recommended": int8_threshold,
+            "drift_pct": (int8_threshold - fp32_threshold) / fp32_threshold * 100,
+        },
+        "verdict_agreement": float(np.mean((fp32_errors <= threshold) == (int8_errors <= threshold))),
+        "latency_ms": {"fp32": fp32_time * 1000, "int8": int8_time * 1000},
+        "size_bytes": {"fp32": model_bytes(model), "int8": model_bytes(qmodel)},
+    }
+
+def format_report(report: dict) -> str:
+    fp, q = report["fp32"], report["int8"]
+    th = report["threshold"]
+    lines = [
+        f"윈도우 수        : {report['windows']}",
+        f"오차 (fp32)      : mean {fp['mean']:.6f} | p50 {fp['p50']:.6f} | p90 {fp['p90']:.6f} | p99 {fp['p99']:.6f} | max {fp['max']:.6f}",
+        f"오차 (int8)      : mean {q['mean']:.6f} | p50 {q['p50']:.6f} | p90 {q['p90']:.6f} | p99 {q['p99']:.6f} | max {q['max']:.6f}",
+        f"샘플별 상대 차이 : mean {report['error_rel_diff']['mean'] * 100:.3f}% | p99 {report['error_rel_diff']['p99'] * 100:.3f}% | max {report['error_rel_diff']['max'] * 100:.3f}%",
+        f"임계치           : 현재 {th['current']:.6f} | 학습식 fp32 {th['fp32_recommended']:.6f} → int8 {th['int8_recommended']:.6f} ({th['drift_pct']:+.3f}%)",
+        f"판정 일치율      : {report['verdict_agreement'] * 100:.2f}%",
+        f"윈도우당 지연    : fp32 {report['latency_ms']['fp32']:.2f} ms → int8 {report['latency_ms']['int8']:.2f} ms",
+        f"가중치 크기      : fp32 {report['size_bytes']['fp32'] / 1024:.0f} KB → int8 {report['size_bytes']['int8'] / 1024:.0f} KB",
+    ]
+    return "\n".join(lines)
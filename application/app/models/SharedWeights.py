@@ -0,0 +1,64 @@
+import os
+import re
+import glob
+import hashlib
+
+import torch
+
+import app.core.globals as g_vars
+
+# 여러 추론 프로세스가 가중치를 한 벌만 쓰도록 하는 메모리 맵 가중치 (CPU 전용).
+# 모델 .pt 를 <모델 폴더>/.mmap_cache/<모델명>.<태그>.mmap.pt 로 한 번 다시 저장해 두고 torch.load(mmap=True) 로 읽으면
+# 가중치 텐서가 그 파일의 페이지 캐시를 바로 가리켜서, 같은 파일을 연 워커끼리 물리 메모리를 공유합니다.
+# 매핑은 MAP_PRIVATE 라 프로세스 안에서 텐서를 고쳐도 파일과 다른 워커에는 영향이 없습니다.
+#
+# 원본 .pt 를 바로 매핑하지 않는 이유: 재학습이 같은 파일에 덮어쓰면 매핑된 페이지가 깨지고(SIGBUS),
+# Windows 에서는 매핑 중인 파일에 저장 자체가 실패합니다. 사본은 원본 크기/mtime 태그로 이름을 정하고
+# 만든 뒤에는 수정하지 않습니다. 모델 선택 창(*.pt)에 사본이 보이지 않도록 하위 캐시 폴더에 둡니다.
+MMAP_SUFFIX = ".mmap.pt"
+CACHE_DIRNAME = ".mmap_cache"
+_TAG_LEN = 12
+
+def enabled() -> bool:
+    """model_mmap: "on"(또는 이전 설정의 true) 이면 사용. "auto" 는 워커 풀 워커에서 "on" 으로 바뀜"""
+    return g_vars.model_mmap in ("on", True)
+
+def cache_dir(model_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(model_path)), CACHE_DIRNAME)
+
+def _stem(model_path: str) -> str:
+    return os.path.join(cache_dir(model_path), os.path.splitext(os.path.basename(model_path))[0])
+
+def mmap_path(model_path: str) -> str:
+    st = os.stat(model_path)
+    tag = hashlib.sha256(f"{st.st_size}|{st.st_mtime_ns}".encode("utf-8")).hexdigest()[:_TAG_LEN]
+    return f"{_stem(model_path)}.{tag}{MMAP_SUFFIX}"
+
+def _remove_stale(model_path: str, keep: str):
+    # 이전 버전 사본 정리 (다른 프로세스가 아직 매핑 중이면 Windows 에서는 실패 → 다음에 다시)
+    # <모델명>.<태그>.mmap.pt 만 지움 (model.pt 정리 중에 model.v2.pt 의 사본을 지우지 않도록)
+    # 캐시 폴더를 쓰기 전 버전이 모델 옆에 만든 사본도 같이 정리
+    for stem in (_stem(model_path), os.path.splitext(model_path)[0]):
+        own = re.compile(re.escape(stem) + rf"\.[0-9a-f]{{{_TAG_LEN}}}" + re.escape(MMAP_SUFFIX))
+        for path in glob.glob(f"{glob.escape(stem)}.*{MMAP_SUFFIX}"):
+            if own.fullmatch(path) and path != keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+def prepare(model_path: str) -> str:
+    """매핑용 사본 경로 (없으면 만듦, 여러 워커가 동시에 만들어도 마지막 것 하나만 남음)"""
+    path = mmap_path(model_path)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        state = torch.load(model_path, map_location="cpu", weights_only=True)
+        tmp_path = path + f".{os.getpid()}.tmp"
+        torch.save(state, tmp_path)
+        os.replace(tmp_path, path)
+        _remove_stale(model_path, keep=path)
+    return path
+
+def load_state_dict(model_path: str) -> dict:
+    """워커끼리 공유되는 CPU state_dict. model.load_state_dict(state, assign=True) 로 복사 없이 붙임"""
+    return torch.load(prepare(model_path), map_location="cpu", weights_only=True, mmap=True)
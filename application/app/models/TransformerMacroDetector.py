@@ -43,4 +43,36 @@ class MacroDataset(Dataset):
         return len(self.X)
 
     def __getitem__(self, idx):
-        return self.X[idx]
\ No newline at end of file
+        return self.X[idx]
+
+class WindowedMacroDataset(Dataset):
+    """
+    지표 행렬 (n, F) 한 벌과 윈도우 시작 인덱스만 들고 있다가 __getitem__ 에서 윈도우를 잘라 주는 데이터셋.
+    윈도우가 겹쳐도 행이 중복 저장되지 않아서, 메모리가 SEQ_LEN/STRIDE 가 아니라 기록 길이에 비례합니다.
+    """
+    def __init__(self, features, starts, seq_len: int):
+        if isinstance(features, torch.Tensor):
+            self.features = features
+        else:
+            self.features = torch.from_numpy(np.ascontiguousarray(features, dtype=np.float32))
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.seq_len = seq_len
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, idx):
+        s = int(self.starts[idx])
+        return self.features[s:s + self.seq_len]
+
+    def subset(self, idx):
+        """같은 지표 텐서를 공유하는 부분 데이터셋 (윈도우 인덱스 기준)"""
+        return WindowedMacroDataset(self.features, self.starts[idx], self.seq_len)
+
+    def split(self, test_size: float = 0.2, shuffle: bool = True, random_state=None):
+        """윈도우 인덱스만 나눠서 train/val 데이터셋을 만듭니다 (지표 행렬은 복사하지 않음)"""
+        from sklearn.model_selection import train_test_split
+        train_idx, val_idx = train_test_split(
+            np.arange(len(self.starts)), test_size=test_size, shuffle=shuffle, random_state=random_state
+        )
+        return self.subset(train_idx), self.subset(val_idx)
@@ -0,0 +1,150 @@
+import os
+import json
+import hashlib
+import numpy as np
+from multiprocessing import Queue
+
+import app.core.globals as g_vars
+from app.core.indicators_parallel import indicators_generation_parallel
+from app.utilites.make_df_from_points import make_df_from_points
+
+# 지표 계산식이 바뀌면 올려서 이전 캐시를 무효화합니다.
+FEATURE_CACHE_VERSION = 1
+
+CACHE_DIRNAME = ".feature_cache"
+
+def cache_dir() -> str:
+    return os.path.join(g_vars.JsonPath, CACHE_DIRNAME)
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def cache_key(json_path: str, sort: bool = True) -> str:
+    """기록 파일 내용 해시 + 지표 생성 파라미터로 캐시 키 생성"""
+    params = {
+        "content": _file_digest(json_path),
+        "chunk_size": g_vars.chunk_size,
+        "offset": g_vars.offset,
+        "tolerance": g_vars.tolerance,
+        "features": list(g_vars.FEATURES),
+        "backend": g_vars.indicator_backend,
+        "version": FEATURE_CACHE_VERSION,
+    }
+    if not sort:
+        params["sort"] = False  # 기존 (정렬하는) 캐시 키는 그대로 유지
+    raw = json.dumps(params, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:32]
+
+def build_features(points: list, sort: bool = True) -> np.ndarray:
+    """
+    기록(dict 리스트) → 정렬/필터 → 지표 행렬 (n, len(FEATURES)) float32
+    sort=False 면 기록 순서 그대로 (JSON 추론 재생은 받은 순서대로 판정)
+    """
+    df = make_df_from_points(points, is_dict=True)
+    if sort:
+        df = df.sort_values('timestamp').reset_index(drop=True)
+    df = df[df["deltatime"] <= g_vars.filter_tolerance].reset_index(drop=True)
+
+    indi = indicators_generation_parallel(
+        df_chunk=df,
+        chunk_size=g_vars.chunk_size,
+        offset=g_vars.offset,
+        features=g_vars.FEATURES,
+        workers=g_vars.indicator_workers,
+    )
+    return np.ascontiguousarray(indi[g_vars.FEATURES].to_numpy(), dtype=np.float32)
+
+def load(key: str):
+    """캐시 적중 시 memory-map 된 지표 행렬, 없으면 None"""
+    path = os.path.join(cache_dir(), f"{key}.npy")
+    if not os.path.exists(path):
+        return None
+    try:
+        data = np.load(path, mmap_mode="r")
+    except Exception:
+        return None
+    # LRU 기준 시각 갱신
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    return data
+
+def store(key: str, features: np.ndarray):
+    directory = cache_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{key}.npy")
+    tmp_path = path + f".{os.getpid()}.tmp"
+
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(features, dtype=np.float32))
+    os.replace(tmp_path, path)
+
+    evict(keep=path)
+
+def evict(keep: str = None, max_bytes: int = None):
+    """캐시 용량이 상한을 넘으면 가장 오래 쓰지 않은 파일부터 삭제"""
+    if max_bytes is None:
+        max_bytes = int(g_vars.feature_cache_max_mb * 1024 * 1024)
+
+    directory = cache_dir()
+    if not os.path.isdir(directory):
+        return
+
+    entries = []
+    for name in os.listdir(directory):
+        if not name.endswith(".npy"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+def get_or_compute(json_path: str, compute, log_queue: Queue = None, sort: bool = True) -> np.ndarray:
+    """
+    json_path 기록의 지표 행렬을 캐시에서 읽고, 없으면 compute() 로 계산해서 저장합니다.
+    같은 파일/같은 설정으로 다시 학습·추론할 때는 JSON 파싱과 지표 생성을 모두 건너뜁니다.
+    sort 는 compute 가 build_features 에 넘긴 값과 같아야 합니다 (정렬 여부별로 캐시를 따로 둠).
+    """
+    def log(msg):
+        log_queue.put(msg) if log_queue else print(msg)
+
+    if not g_vars.feature_cache:
+        return compute()
+
+    try:
+        key = cache_key(json_path, sort=sort)
+    except OSError as e:
+        log(f"⚠️ 지표 캐시 키 생성 실패 (캐시 없이 진행): {e}")
+        return compute()
+
+    cached = load(key)
+    if cached is not None:
+        log(f"⚡ 지표 캐시 사용: {os.path.basename(json_path)} ({len(cached)} rows)")
+        return cached
+
+    features = compute()
+    try:
+        store(key, features)
+        log(f"💾 지표 캐시 저장: {os.path.basename(json_path)} ({len(features)} rows)")
+    except OSError as e:
+        log(f"⚠️ 지표 캐시 저장 실패: {e}")
+    return features
@@ -0,0 +1,176 @@
+import os
+import json
+import numpy as np
+from multiprocessing import Queue
+from sklearn.preprocessing import MinMaxScaler
+
+import app.core.globals as g_vars
+import app.repostitories.JsonController as JsonController
+import app.repostitories.FeatureCache as FeatureCache
+from app.models.TransformerMacroDetector import WindowedMacroDataset
+
+# 여러 기록(user/, move_data/)의 스케일된 지표를 한 파일에 이어 붙인 학습용 코퍼스
+#   <JsonPath>/.corpus/<name>.f32       : (rows, F) float32 raw 바이너리 (memory-map 으로 읽음)
+#   <JsonPath>/.corpus/<name>.json      : 매니페스트 (기록별 시작 행/행 수/캐시 키, 지표 목록, 스케일 배율)
+#   <scaler_path>/<name>_scaler.pkl     : 학습 라벨 기록으로 맞춘 MinMaxScaler (추론에서 그대로 사용)
+CORPUS_VERSION = 1
+CORPUS_DIRNAME = ".corpus"
+CORPUS_SUBFOLDERS = ("user", "move_data")
+TRAIN_LABELS = ("user",)  # 오토인코더는 유저 움직임만 정상으로 학습
+SCALE_FACTOR = 10  # train 과 동일 (스케일 후 10배)
+
+_SCALE_BLOCK_ROWS = 1 << 20
+
+def corpus_dir() -> str:
+    return os.path.join(g_vars.JsonPath, CORPUS_DIRNAME)
+
+def _paths(name: str):
+    base = os.path.join(corpus_dir(), name)
+    return base + ".f32", base + ".json"
+
+def scaler_file(name: str) -> str:
+    return os.path.join(g_vars.scaler_path, f"{name}_scaler.pkl")
+
+def list_recordings(subfolders=CORPUS_SUBFOLDERS) -> list:
+    """(라벨, json 경로) 목록. 라벨은 cunsume_q 가 저장한 하위 폴더 이름"""
+    recordings = []
+    for label in subfolders:
+        folder = os.path.join(g_vars.JsonPath, label)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.lower().endswith(".json"):
+                recordings.append((label, os.path.join(folder, name)))
+    return recordings
+
+def read_manifest(name: str):
+    _, manifest_path = _paths(name)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def is_up_to_date(name: str, subfolders=CORPUS_SUBFOLDERS) -> bool:
+    """폴더 안 기록 구성/내용/지표 설정이 매니페스트와 같고 데이터/스케일러 파일이 다 있으면 True (JSON 은 파싱하지 않음)"""
+    manifest = read_manifest(name)
+    data_path, _ = _paths(name)
+    if manifest is None or manifest.get("version") != CORPUS_VERSION or not os.path.exists(data_path):
+        return False
+    if not os.path.exists(scaler_file(name)):
+        return False  # 스케일러만 지워진 경우 (학습/추론에서 읽다가 실패하지 않도록 다시 생성)
+    try:
+        current = sorted(
+            (label, os.path.basename(path), FeatureCache.cache_key(path))
+            for label, path in list_recordings(subfolders)
+        )
+    except OSError:
+        return False
+    stored = sorted((r["label"], r["name"], r["key"]) for r in manifest["recordings"])
+    return current == stored and manifest.get("features") == list(g_vars.FEATURES)
+
+def _recording_features(path: str, log_queue: Queue = None) -> np.ndarray:
+    def compute():
+        points = JsonController.load(path, log_queue=log_queue) or []
+        return FeatureCache.build_features(points)
+    return FeatureCache.get_or_compute(path, compute, log_queue=log_queue)
+
+def build_corpus(name: str = "corpus", subfolders=CORPUS_SUBFOLDERS, train_labels=TRAIN_LABELS,
+                 log_queue: Queue = None) -> dict:
+    """
+    기록 폴더 전체를 하나의 memory-map 지표 저장소로 변환합니다.
+    1) 기록마다 지표를 계산(지표 캐시 사용)해서 raw 파일에 이어 쓰고, 학습 라벨 기록으로 스케일러를 partial_fit
+    2) 파일을 블록 단위로 다시 열어 제자리에서 스케일링
+    한 번에 기록 하나/블록 하나만 메모리에 올리므로 RAM 보다 큰 코퍼스도 만들 수 있습니다.
+    """
+    def log(msg):
+        log_queue.put(msg) if log_queue else print(msg)
+
+    os.makedirs(corpus_dir(), exist_ok=True)
+    data_path, manifest_path = _paths(name)
+    tmp_path = data_path + f".{os.getpid()}.tmp"
+
+    n_features = len(g_vars.FEATURES)
+    scaler = MinMaxScaler()
+    fitted = False
+    recordings = []
+    total = 0
+
+    with open(tmp_path, "wb") as f:
+        for label, path in list_recordings(subfolders):
+            features = np.ascontiguousarray(_recording_features(path, log_queue=log_queue), dtype=np.float32)
+            if features.ndim != 2 or features.shape[1] != n_features or len(features) == 0:
+                log(f"⚠️ 코퍼스 제외 (지표 없음): {os.path.basename(path)}")
+                continue
+
+            f.write(features.tobytes())
+            if label in train_labels:
+                scaler.partial_fit(features)
+                fitted = True
+
+            recordings.append({
+                "label": label,
+                "name": os.path.basename(path),
+                "key": FeatureCache.cache_key(path),
+                "start": total,
+                "rows": len(features),
+            })
+            total += len(features)
+            log(f"📦 코퍼스 추가: [{label}] {os.path.basename(path)} ({len(features)} rows)")
+
+    if not fitted:
+        os.remove(tmp_path)
+        raise ValueError(f"학습 라벨 {list(train_labels)} 기록이 없습니다: {g_vars.JsonPath}")
+
+    # 2) 제자리 스케일링
+    data = np.memmap(tmp_path, dtype=np.float32, mode="r+", shape=(total, n_features))
+    for lo in range(0, total, _SCALE_BLOCK_ROWS):
+        hi = min(lo + _SCALE_BLOCK_ROWS, total)
+        data[lo:hi] = scaler.transform(data[lo:hi]) * SCALE_FACTOR
+    data.flush()
+    del data
+    os.replace(tmp_path, data_path)
+
+    import joblib
+    joblib.dump(scaler, scaler_file(name))
+
+    manifest = {
+        "version": CORPUS_VERSION,
+        "features": list(g_vars.FEATURES),
+        "dtype": "float32",
+        "shape": [total, n_features],
+        "scale_factor": SCALE_FACTOR,
+        "train_labels": list(train_labels),
+        "recordings": recordings,
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=4)
+
+    log(f"✅ 코퍼스 생성 완료: {name} ({len(recordings)}개 기록, {total} rows)")
+    return manifest
+
+def open_features(name: str, manifest: dict = None) -> np.memmap:
+    """스케일된 지표 행렬 (rows, F) memory-map. copy-on-write 라 원본 파일은 바뀌지 않습니다."""
+    manifest = manifest or read_manifest(name)
+    data_path, _ = _paths(name)
+    return np.memmap(data_path, dtype=manifest["dtype"], mode="c", shape=tuple(manifest["shape"]))
+
+def corpus_starts(manifest: dict, seq_len: int, stride: int, labels=None) -> np.ndarray:
+    """기록 경계를 넘지 않는 윈도우 시작 인덱스 (코퍼스 전역 행 기준)"""
+    labels = manifest["train_labels"] if labels is None else labels
+    starts = []
+    for r in manifest["recordings"]:
+        if r["label"] not in labels or r["rows"] < seq_len:
+            continue
+        starts.append(np.arange(0, r["rows"] - seq_len + 1, stride, dtype=np.int64) + r["start"])
+    return np.concatenate(starts) if starts else np.empty(0, dtype=np.int64)
+
+def load_dataset(name: str, seq_len: int = None, stride: int = None, labels=None) -> WindowedMacroDataset:
+    """코퍼스에서 윈도우를 바로 잘라 주는 학습 데이터셋 (지표 행렬은 memory-map 그대로 공유)"""
+    seq_len = seq_len or g_vars.SEQ_LEN
+    stride = stride or g_vars.STRIDE
+    manifest = read_manifest(name)
+    if manifest is None:
+        raise FileNotFoundError(f"코퍼스가 없습니다: {name}")
+    starts = corpus_starts(manifest, seq_len, stride, labels=labels)
+    return WindowedMacroDataset(open_features(name, manifest), starts, seq_len)
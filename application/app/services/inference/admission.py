@@ -0,0 +1,157 @@
+import json
+import time
+
+import app.core.globals as g_vars
+import app.models.BinaryProtocol as BinaryProtocol
+
+# 소켓 서버 입장 제어 (과부하 시 빨리 거절해서 받은 요청은 지연 목표 안에 처리).
+# - 클라이언트(IP)별 토큰 버킷 두 개: 초당 요청 수, 초당 요청 바이트 → 넘으면 429 (retry_after 포함)
+#   (다시 연결해도 버킷이 새로 차지 않도록 IP 로 묶음)
+# - IP 별 처리 대기/중 요청 수 한도 (그 IP 의 모든 연결 합산) → 넘으면 429
+# - 서버 전체 처리 대기/중 요청 수 한도 → 넘으면 503
+# 연결 하나의 처리 대기/중 요청 수는 handle_connection 의 파이프라인 큐(socket_pipeline_depth)로 제한되므로
+# localhost 처럼 모든 클라이언트가 같은 IP 여도 한 연결이 처리 자리를 다 차지하지는 못합니다.
+# 거절은 프레임을 읽은 직후 이벤트 루프에서 바로 응답하고 파싱/추론은 하지 않습니다.
+# 관리 명령 stats 는 과부하 중에도 상태를 볼 수 있도록 제한하지 않습니다 (load/reload 는 제한).
+# 모든 메서드는 이벤트 루프 스레드에서만 호출합니다 (잠금 없음).
+_PRUNE_INTERVAL = 30.0  # 이 시간 동안 안 쓴 클라이언트 항목 정리 (초)
+
+def error_payload(body: bytes, status: int, message: str, **extra) -> bytes:
+    """요청 형식(JSON/바이너리)에 맞춘 에러 응답 본문"""
+    if BinaryProtocol.is_binary_request(body):
+        return BinaryProtocol.encode_response(BinaryProtocol.peek_request(body)[1], status, message=message)
+    return json.dumps({"status": status, "message": message, **extra}, ensure_ascii=False).encode("utf-8")
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount: float = 1.0) -> float:
+        """토큰을 쓰고 0 을 반환. 모자라면 쓰지 않고 다시 채워질 때까지 남은 시간(초)을 반환"""
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+class _Client:
+    __slots__ = ("requests", "bytes", "inflight", "accepted", "rejected", "seen")
+
+    def __init__(self, requests: TokenBucket, bytes_: TokenBucket):
+        self.requests = requests
+        self.bytes = bytes_
+        self.inflight = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.seen = time.monotonic()
+
+class Admission:
+    def __init__(self, max_inflight: int = None, ip_max_inflight: int = None,
+                 client_rate: float = None, client_burst: float = None, client_mb_per_sec: float = None):
+        self.max_inflight = int(max_inflight if max_inflight is not None else g_vars.socket_max_inflight)
+        self.ip_max_inflight = int(ip_max_inflight if ip_max_inflight is not None else g_vars.ip_max_inflight)
+        self.client_rate = float(client_rate if client_rate is not None else g_vars.client_rate_limit)
+        self.client_burst = float(client_burst if client_burst is not None else g_vars.client_rate_burst)
+        mb_per_sec = float(client_mb_per_sec if client_mb_per_sec is not None else g_vars.client_mb_per_sec)
+        self.client_bytes_rate = mb_per_sec * 1024 * 1024
+        # 최대 크기 요청 하나는 항상 받을 수 있도록 (버킷 용량 = 1초 분량과 최대 메시지 중 큰 값)
+        self.client_bytes_burst = max(self.client_bytes_rate, g_vars.socket_max_message_mb * 1024 * 1024)
+
+        self._clients = {}  # IP -> _Client
+        self._pruned = time.monotonic()
+        self.inflight = 0
+        self.inflight_peak = 0
+        self.accepted = 0
+        self.rejected = {"rate": 0, "bytes": 0, "ip_busy": 0, "server_busy": 0}
+
+    def _client(self, client: str) -> _Client:
+        entry = self._clients.get(client)
+        if entry is None:
+            entry = self._clients[client] = _Client(
+                TokenBucket(self.client_rate, max(self.client_burst, 1)) if self.client_rate > 0 else None,
+                TokenBucket(self.client_bytes_rate, self.client_bytes_burst) if self.client_bytes_rate > 0 else None,
+            )
+        entry.seen = time.monotonic()
+        return entry
+
+    def _prune(self):
+        now = time.monotonic()
+        if now - self._pruned < _PRUNE_INTERVAL:
+            return
+        self._pruned = now
+        for client in [c for c, e in self._clients.items()
+                       if e.inflight == 0 and now - e.seen > _PRUNE_INTERVAL
+                       and (e.requests is None or e.requests.full()) and (e.bytes is None or e.bytes.full())]:
+            del self._clients[client]
+
+    def _reject(self, entry: _Client, reason: str, status: int, message: str, retry_after: float = None) -> tuple:
+        entry.rejected += 1
+        self.rejected[reason] += 1
+        extra = {"retry_after": round(retry_after, 3)} if retry_after else {}
+        return status, message, extra
+
+    def admit(self, client: str, size: int) -> tuple:
+        """
+        요청 하나 입장 확인 (client 는 IP). 받으면 None (처리 후 release 필수),
+        거절이면 (status, message, 응답에 더할 값) 을 반환
+        """
+        self._prune()
+        entry = self._client(client)
+
+        if self.inflight >= self.max_inflight:
+            return self._reject(entry, "server_busy", 503, "서버가 포화 상태입니다. 잠시 후 다시 시도하세요.")
+        if entry.inflight >= self.ip_max_inflight:
+            return self._reject(entry, "ip_busy", 429, f"같은 IP 의 처리 중인 요청이 너무 많습니다 (최대 {self.ip_max_inflight}개).")
+
+        # 요청 수 → 바이트 순서로 확인하고, 바이트에서 거절되면 요청 토큰은 돌려줌
+        if entry.requests is not None:
+            wait = entry.requests.take(1)
+            if wait:
+                return self._reject(entry, "rate", 429, "요청 속도 제한을 넘었습니다.", wait)
+        if entry.bytes is not None:
+            wait = entry.bytes.take(size)
+            if wait:
+                if entry.requests is not None:
+                    entry.requests.tokens += 1
+                return self._reject(entry, "bytes", 429, "전송량 제한을 넘었습니다.", wait)
+
+        entry.inflight += 1
+        entry.accepted += 1
+        self.inflight += 1
+        self.inflight_peak = max(self.inflight_peak, self.inflight)
+        self.accepted += 1
+        return None
+
+    def release(self, client: str):
+        entry = self._clients.get(client)
+        if entry is not None:
+            entry.inflight = max(entry.inflight - 1, 0)
+        self.inflight = max(self.inflight - 1, 0)
+
+    def stats(self, top: int = 5) -> dict:
+        busiest = sorted(self._clients.items(), key=lambda kv: (kv[1].inflight, kv[1].rejected), reverse=True)[:top]
+        return {
+            "inflight": self.inflight,
+            "inflight_peak": self.inflight_peak,
+            "max_inflight": self.max_inflight,
+            "ip_max_inflight": self.ip_max_inflight,
+            "accepted": self.accepted,
+            "rejected": dict(self.rejected),
+            "clients": len(self._clients),
+            "top_clients": [
+                {"client": c, "inflight": e.inflight, "accepted": e.accepted, "rejected": e.rejected}
+                for c, e in busiest
+            ],
+        }
@@ -3,11 +3,12 @@ import time
 import app.core.globals as g_vars
 from datetime import datetime
 from multiprocessing import Queue, Event
-from app.services.inference.macro_dectector import MacroDetector
+from app.services.inference.streaming_detector import StreamingMacroDetector
+from app.services.inference.scheduler import InferenceScheduler
+from app.services.inference.model_registry import get_registry
 from queue import Empty
 from tkinter import filedialog, messagebox
 import os
-from collections import deque
 
 def main(stop_event=None, log_queue:Queue=None, chart_Show=True):
     use_existing = False
@@ -56,13 +57,12 @@ def main(stop_event=None, log_queue:Queue=None, chart_Show=True):
         stop_event = Event()
 
     # Detector 초기화
-    detector = MacroDetector(
+    detector = get_registry(log_queue).detector(
         model_path=g_vars.init_model_path,
-        seq_len=g_vars.SEQ_LEN,
-        threshold=g_vars.threshold,
+        scale_path=g_vars.init_scale_path,
+        cls=StreamingMacroDetector,
         chart_Show=chart_Show,
         stop_event=stop_event,
-        scale_path=g_vars.init_scale_path
     )
 
     detector.start_plot_process()
@@ -106,7 +106,8 @@ def main(stop_event=None, log_queue:Queue=None, chart_Show=True):
                 'timestamp': datetime.now().isoformat(),
                 'x': int(x),
                 'y': int(y),
-                'deltatime': delta
+                'deltatime': delta,
+                'captured_at': now_ts,
             }
             state['last_ts'] = now_ts
 
@@ -115,59 +116,56 @@ def main(stop_event=None, log_queue:Queue=None, chart_Show=True):
             if state['lendata'] is not None:
                 state['lendata'] += 1
 
-                if state['lendata'] <= detector.allowable_add_data:
+                if state['lendata'] < detector.allowable_add_data:
                     if log_queue:
                         log_queue.put(f"⏳ Data 수집 중... {state['lendata']} / {detector.allowable_add_data}")
                     else:
                         print(f"⏳ Data 수집 중... {state['lendata']} / {detector.allowable_add_data}")
-                elif state['lendata'] == detector.allowable_add_data:
+                else:
                     if log_queue:
                         log_queue.put("✅ Data 수집 완료")
                     else:
                         print("✅ Data 수집 완료")
                     state['lendata'] = None
 
+    # 이벤트가 밀리면 판정 간격을 넓히거나 지난 윈도우를 건너뛰어 latency_budget 안에서 판정
+    scheduler = InferenceScheduler(detector, log_queue=log_queue)
+
     listener = mouse.Listener(on_move=on_move)
     listener.start()
 
-    junk_buffer = deque(maxlen=detector.allowable_add_data)
     try:
         while not stop_event.is_set():
             
             try:
-                data = data_queue.get(timeout=0.05)
-                junk_buffer.append(data)
-                
+                batch = [data_queue.get(timeout=0.05)]
                 while not data_queue.empty():
-                    junk_buffer.append(data_queue.get_nowait())
+                    batch.append(data_queue.get_nowait())
             except Empty:
                 continue
             
-            if len(junk_buffer) >= detector.allowable_add_data:
-                for data in junk_buffer:
-                    result = detector.push(data)
-
-                    if result:
-                        m_str = result.get('macro_probability', "0%")
-                        raw_e = result.get('raw_error', 0.0)
-
-                        if result.get("is_human", True):
-                            log_msg = f"{m_str} (err: {raw_e:.4f})"
-                        else:
-                            log_msg = f"{m_str} (err: {raw_e:.4f}) 🚨"
+            # 점마다 지표 한 줄씩 갱신, STRIDE 행마다 판정이 나옴
+            for result in scheduler.process(batch):
+                if result:
+                    m_str = result.get('macro_probability', "0%")
+                    raw_e = result.get('raw_error', 0.0)
+
+                    if result.get("is_human", True):
+                        log_msg = f"{m_str} (err: {raw_e:.4f})"
+                    else:
+                        log_msg = f"{m_str} (err: {raw_e:.4f}) 🚨"
 
-                        if log_queue:
-                            log_queue.put(log_msg)
-                        else:
-                            print(log_msg)
-                junk_buffer.clear()
+                    if log_queue:
+                        log_queue.put(log_msg)
+                    else:
+                        print(log_msg)
 
     except Exception as e:
         error_msg = f"에러 발생: {e}"
         if log_queue: log_queue.put(error_msg)
         else: print(error_msg)
     finally:
-        detector.buffer.clear()
+        detector.reset()
         listener.stop()  # 리스너 안전 종료
         if log_queue:
             log_queue.put("🛑 Macro Detector Stopped")
@@ -7,10 +7,10 @@ from queue import Empty
 from tkinter import filedialog, messagebox
 import os
 import json
-from collections import deque
 
 import app.core.globals as g_vars
-from app.services.inference.macro_dectector import MacroDetector
+import app.repostitories.FeatureCache as FeatureCache
+from app.services.inference.model_registry import get_registry
 
 def main(stop_event=None, log_queue:Queue=None, chart_Show=True):
     use_existing = False
@@ -56,13 +56,11 @@ def main(stop_event=None, log_queue:Queue=None, chart_Show=True):
         log_queue.put(f"📂 로드 완료:\n- 모델: {m_name}\n- 스케일러: {s_name}")
 
     # Detector 초기화
-    detector = MacroDetector(
+    detector = get_registry(log_queue).detector(
         model_path=g_vars.init_model_path,
-        seq_len=g_vars.SEQ_LEN,
-        threshold=g_vars.threshold,
+        scale_path=g_vars.init_scale_path,
         chart_Show=chart_Show,
         stop_event=stop_event,
-        scale_path=g_vars.init_scale_path,
         log_queue=log_queue
     )
 
@@ -84,24 +82,27 @@ def main(stop_event=None, log_queue:Queue=None, chart_Show=True):
         else:
             print(f"weight_threshold : {g_vars.weight_threshold}")
             
-        user_data:list[dict]
-
         file_pahh = filedialog.askopenfilename(title="Json 파일을 선택해 주세요", filetypes=(("json 파일", "*.json"), ("모든 파일", "*.*")))
         if not os.path.exists(file_pahh):
             return [] 
 
-        try:
-            with open(file_pahh, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        
-            user_data = data
-        except Exception as e:
-            print(e)
-            user_data = []
+        def compute_features():
+            user_data:list[dict]
+            try:
+                with open(file_pahh, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            
+                user_data = data
+            except Exception as e:
+                print(e)
+                user_data = []
 
-        print(f"user_data length : {len(user_data)}")
+            print(f"user_data length : {len(user_data)}")
+            # 학습과 달리 정렬하지 않고 기록 순서대로 재생 (이전 push/_infer 경로와 같은 윈도우)
+            return FeatureCache.build_features(user_data, sort=False)
 
-        detector.buffer = deque(maxlen=int(len(user_data)))
+        # 같은 기록/설정이면 JSON 파싱과 지표 생성을 건너뜀
+        features = FeatureCache.get_or_compute(file_pahh, compute_features, log_queue=log_queue, sort=False)
 
         timeinterval = 7
 
@@ -123,16 +124,7 @@ def main(stop_event=None, log_queue:Queue=None, chart_Show=True):
         g_vars.CHART_DATA.put_nowait("NEW_SESSION")
 
         try:
-            for step in user_data:
-                data = {
-                    'timestamp': datetime.fromisoformat(step.get("timestamp")),
-                    'x': step.get("x"),
-                    'y': step.get("y"),
-                    'deltatime': step.get("deltatime")  
-                }
-                detector.push(data)
-            
-            detector._infer()
+            detector.infer_features(features)
         finally:
             detector.buffer.clear()
             try:
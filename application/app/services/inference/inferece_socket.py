@@ -3,15 +3,392 @@ import app.core.globals as g_vars
 from datetime import datetime
 from multiprocessing import Queue
 
-from app.services.inference.macro_dectector import MacroDetector
+from app.services.inference.model_registry import get_registry, artifact_paths, ModelRegistry
+from app.services.inference.micro_batcher import MicroBatcher
+from app.services.inference.session_store import SessionStore
+from app.services.inference.worker_pool import WorkerPool
+from app.services.inference.admission import Admission, error_payload
 from multiprocessing import Event
-from app.models.MouseDetectorSocket import ResponseBody, RequestBody
-import socket
+from app.models.MouseDetectorSocket import ResponseBody, RequestBody, AdminRequest, SessionRequest
 import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import app.utilites.framing as framing
+import app.models.BinaryProtocol as BinaryProtocol
+import numpy as np
+import pandas as pd
 from queue import Empty
 from tkinter import filedialog, messagebox
 import os
 
+def handle_admin(registry: ModelRegistry, request: AdminRequest, state: dict, log_queue: Queue = None) -> dict:
+    """
+    관리 명령 처리. 모델은 백그라운드에서 읽고 warmup 한 뒤 바꿔 끼우므로 그동안에도 판정은 계속됩니다.
+    state["paths"] : 기본 모델 (모델 경로, 스케일러 경로), state["sessions"] : 스트리밍 세션
+    """
+    if request.admin == "stats":
+        return {"status": 0, "model": os.path.basename(state["paths"][0]), **registry.stats()}
+
+    if request.admin == "reload":
+        started = registry.refresh(force=True)
+        return {"status": 0, "message": f"바뀐 모델 {started}개 교체 준비 중"}
+
+    if request.admin == "load":
+        try:
+            model_path, scale_path = artifact_paths(request.model_id)
+        except ValueError as e:
+            return {"status": 400, "message": str(e)}
+        if not (os.path.exists(model_path) and os.path.exists(scale_path)):
+            return {"status": 404, "message": f"모델 파일 없음: {request.model_id}"}
+
+        def on_ready(model_path, scale_path):
+            state["paths"] = (model_path, scale_path)
+            g_vars.init_model_path, g_vars.init_scale_path = model_path, scale_path
+            msg = f"🔁 기본 모델 교체 완료: {os.path.basename(model_path)}"
+            log_queue.put(msg) if log_queue else print(msg)
+
+        registry.preload(model_path, scale_path, on_ready=on_ready)
+        return {"status": 202, "message": f"모델 준비 중: {os.path.basename(model_path)}"}
+
+    return {"status": 400, "message": f"알 수 없는 관리 명령: {request.admin}"}
+
+def _detector_for(model_id: str, registry: ModelRegistry, batcher: MicroBatcher, state: dict,
+                  stop_event, chart_Show: bool):
+    """사용자/게임별 모델: 레지스트리에 올라가 있는 가중치를 바로 사용 (없으면 기본 모델)"""
+    if model_id:
+        detector = registry.detector(model_id, chart_Show=False, stop_event=stop_event)
+    else:
+        model_path, scale_path = state["paths"]
+        detector = registry.detector(model_path=model_path, scale_path=scale_path,
+                                     chart_Show=chart_Show, stop_event=stop_event)
+    detector.batcher = batcher
+    detector.batch_size = batcher.max_batch
+    return detector
+
+def handle_session(request: SessionRequest, registry: ModelRegistry, batcher: MicroBatcher, state: dict) -> dict:
+    """
+    스트리밍 세션 요청 처리. state["sessions"] : SessionStore
+    open → session_id 발급, push → 새 점 추가 후 새 윈도우 판정만 반환, close → 세션 정리
+    """
+    sessions: SessionStore = state["sessions"]
+
+    if request.session == "open":
+        model_path, scale_path = state["paths"]
+        try:
+            session = sessions.open(request.session_id, request.model_id, model_path, scale_path,
+                                    batcher=batcher, stride=request.stride)
+        except (FileNotFoundError, ValueError) as e:
+            return {"status": 404, "message": str(e)}
+        return {
+            "status": 0,
+            "session_id": session.session_id,
+            "warmup_points": session.detector.allowable_add_data,
+            "stride": session.detector.stride,
+        }
+
+    if request.session == "push":
+        x, y, deltatime = [], [], []
+        for step in request.data:
+            x.append(step.get("x"))
+            y.append(step.get("y"))
+            deltatime.append(step["dt"] if step.get("dt") is not None else step.get("deltatime"))
+        try:
+            verdicts = sessions.push(request.session_id, x, y, deltatime)
+        except KeyError:
+            return {"status": 404, "session_id": request.session_id, "message": "세션이 없거나 만료되었습니다."}
+        return {"status": 0, "session_id": request.session_id, "verdicts": verdicts}
+
+    if request.session == "close":
+        session = sessions.close(request.session_id)
+        if session is None:
+            return {"status": 404, "session_id": request.session_id}
+        return {"status": 0, "session_id": request.session_id, "points": session.points, "windows": session.windows}
+
+    return {"status": 400, "message": f"알 수 없는 세션 명령: {request.session}"}
+
+def process_request(receive_data: dict, registry: ModelRegistry, batcher: MicroBatcher, state: dict,
+                    stop_event, chart_Show: bool, log_queue: Queue = None) -> dict:
+    """JSON 요청 하나 판정 (CPU 작업이라 이벤트 루프가 아니라 executor 스레드에서 실행)"""
+    try:
+        if "admin" in receive_data:
+            result = handle_admin(registry, AdminRequest(**receive_data), state, log_queue)
+            if receive_data.get("admin") == "stats":
+                result["batcher"] = batcher.stats()
+                result["sessions"] = state["sessions"].stats()
+            return result
+
+        if "session" in receive_data:
+            return handle_session(SessionRequest(**receive_data), registry, batcher, state)
+
+        receive_data = RequestBody(**receive_data)
+        user_data = receive_data.data
+
+        try:
+            detector = _detector_for(receive_data.model_id, registry, batcher, state, stop_event, chart_Show)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ 모델 없음: {receive_data.model_id}")
+            return {"status": 404, "message": str(e)}
+
+        print(f"📩 수신 완료: {len(user_data)} 건")
+
+        # 요청에 담긴 점 전체로 판정 (detector.buffer 는 최근 10개만 보관해서 쓰지 않음)
+        points = [
+            (
+                step.get("x"),
+                step.get("y"),
+                datetime.fromisoformat(step.get("ts") or step.get("timestamp")),
+                step["dt"] if step.get("dt") is not None else step.get("deltatime"),
+            )
+            for step in user_data
+        ]
+
+        # 추론 시작
+        send_data = detector.infer_points(points)
+
+        return ResponseBody(
+            id = receive_data.id,
+            status = 0,
+            analysis_results = send_data or []
+        ).model_dump()
+    except Exception as e:
+        # 5. 내부 서버 에러 (status: 500)
+        print(f"❌ 분석 중 에러: {e}")
+        return {"status": 500, "message": str(e)}
+
+def process_binary_request(body: bytes, registry: ModelRegistry, batcher: MicroBatcher, state: dict,
+                           stop_event, chart_Show: bool, log_queue: Queue = None) -> bytes:
+    """바이너리 요청 하나 판정 → 바이너리 응답 (JSON/pydantic/datetime 변환 없이 배열로 바로 처리)"""
+    req_id = None
+    try:
+        request = BinaryProtocol.decode_request(body)
+        req_id = request["id"]
+    except (BinaryProtocol.ProtocolError, UnicodeDecodeError) as e:
+        return BinaryProtocol.encode_response(req_id, 400, message=str(e))
+
+    try:
+        flags = request["flags"]
+        if flags & BinaryProtocol.SESSION_PUSH:
+            # 스트리밍 세션: id 가 세션 ID, 새 윈도우 판정만 응답
+            sessions: SessionStore = state["sessions"]
+            if flags & BinaryProtocol.SESSION_OPEN:
+                model_path, scale_path = state["paths"]
+                stride = 1 if flags & BinaryProtocol.ALL_WINDOWS else None
+                try:
+                    sessions.open(req_id, request["model_id"], model_path, scale_path, batcher=batcher, stride=stride)
+                except (FileNotFoundError, ValueError) as e:
+                    return BinaryProtocol.encode_response(req_id, 404, message=str(e))
+            try:
+                verdicts = sessions.push(req_id, request["x"].tolist(), request["y"].tolist(), request["deltatime"].tolist())
+            except KeyError:
+                return BinaryProtocol.encode_response(req_id, 404, message="세션이 없거나 만료되었습니다.")
+            if flags & BinaryProtocol.SESSION_CLOSE:
+                sessions.close(req_id)
+            return BinaryProtocol.encode_response(req_id, 0, verdicts)
+
+        try:
+            detector = _detector_for(request["model_id"], registry, batcher, state, stop_event, chart_Show)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ 모델 없음: {request['model_id']}")
+            return BinaryProtocol.encode_response(req_id, 404, message=str(e))
+
+        df = pd.DataFrame({
+            "x": request["x"].astype(np.float64),
+            "y": request["y"].astype(np.float64),
+            "deltatime": request["deltatime"].astype(np.float64),
+        }, copy=False)
+        send_data = detector.infer_frame(df)
+        return BinaryProtocol.encode_response(req_id, 0, send_data)
+    except Exception as e:
+        print(f"❌ 분석 중 에러: {e}")
+        return BinaryProtocol.encode_response(req_id, 500, message=str(e))
+
+def process_frame(body: bytes, *args) -> bytes:
+    """프레임 본문 하나 → 응답 본문 (JSON 파싱까지 executor 스레드에서 처리)"""
+    if BinaryProtocol.is_binary_request(body):
+        return process_binary_request(body, *args)
+    try:
+        receive_data = json.loads(body.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        return json.dumps({"status": 400, "message": f"잘못된 JSON: {e}"}, ensure_ascii=False).encode('utf-8')
+    return json.dumps(process_request(receive_data, *args), ensure_ascii=False).encode('utf-8')
+
+def build_context(model_path: str, scale_path: str, stop_event, chart_Show: bool = True, log_queue: Queue = None) -> dict:
+    """
+    요청 처리에 필요한 것들 (레지스트리, 배처, 세션 저장소, executor).
+    프로세스 하나로 돌 때는 메인에서, 워커 풀일 때는 워커 프로세스마다 하나씩 만듭니다.
+    """
+    # 요청에 model_id 가 없으면 기본 모델(state["paths"])로 판정.
+    # 요청마다 레지스트리에서 탐지기를 받으므로 모델이 교체되면 다음 요청부터 새 모델을 씁니다.
+    registry = get_registry(log_queue)
+    state = {
+        "paths": (model_path, scale_path),
+        "sessions": SessionStore(registry, log_queue=log_queue),
+    }
+    state["sessions"].start_sweeper(stop_event)
+    registry.start_watcher(stop_event)
+    batcher = MicroBatcher(log_queue=log_queue).start()
+    executor = ThreadPoolExecutor(max_workers=g_vars.socket_workers, thread_name_prefix="infer")
+    return {
+        "executor": executor,
+        "args": (registry, batcher, state, stop_event, chart_Show, log_queue),
+    }
+
+async def dispatch(ctx: dict, conn_key: int, body: bytes) -> bytes:
+    """프레임 본문 하나 처리: 워커 풀이 있으면 워커 프로세스로, 없으면 이 프로세스의 executor 에서"""
+    loop = asyncio.get_running_loop()
+    pool = ctx.get("pool")
+    if pool is not None:
+        return await pool.dispatch(conn_key, body, loop)
+    return await loop.run_in_executor(ctx["executor"], process_frame, body, *ctx["args"])
+
+def _is_stats(body: bytes) -> bool:
+    # 최상위 admin 키가 "stats" 인 작은 JSON 만 (입장 제어 면제). 큰 판정 요청은 파싱하지 않음
+    if BinaryProtocol.is_binary_request(body) or b'"admin"' not in body:
+        return False
+    request = framing.peek_control(body)
+    return request is not None and request.get("admin") == "stats"
+
+def _with_admission(ctx: dict, reply: bytes) -> bytes:
+    """관리 명령 stats 응답에 입장 제어 지표(대기/처리 중 요청 수, 거절 수)를 더함"""
+    admission = ctx.get("admission")
+    if admission is None:
+        return reply
+    try:
+        result = json.loads(reply.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError, AttributeError):
+        return reply
+    result["admission"] = admission.stats()
+    return json.dumps(result, ensure_ascii=False).encode('utf-8')
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, ctx: dict):
+    """
+    연결 하나 처리. 길이 접두 프레임이면 연결을 유지하면서 요청을 계속 받고,
+    프레임 본문은 JSON 또는 BinaryProtocol 요청(magic "MDB1")이고, 응답도 요청과 같은 형식으로 보냅니다.
+    이전 방식(접두 없는 JSON)이면 한 번 응답하고 끊습니다.
+
+    받기와 처리는 따로 돕니다: 앞 요청을 판정하는 동안에도 다음 프레임을 계속 받아서 큐(socket_pipeline_depth)에
+    쌓아 두고, 응답은 요청 순서대로 보냅니다. 세션 push 를 응답을 기다리지 않고 연달아 보내면(청크 업로드)
+    업로드가 끝나기 전에 앞 청크의 지표 계산/판정이 진행되고 판정도 청크마다 바로 돌아옵니다.
+    """
+    max_size = int(g_vars.socket_max_message_mb * 1024 * 1024)
+    pool = ctx.get("pool")
+    conn_key = pool.connection_key() if pool is not None else 0
+    admission: Admission = ctx.get("admission")
+    idle_timeout = g_vars.socket_idle_timeout
+    addr = writer.get_extra_info("peername")
+    # 속도/처리 중 한도는 IP 단위 (연결 하나의 처리 중 요청 수는 아래 파이프라인 큐 크기로 제한됨)
+    client = str(addr[0]) if addr else "unknown"
+    print(f"✅ 연결됨: {addr}")
+
+    def admit(body: bytes):
+        """입장 확인: 받으면 None, 거절이면 바로 보낼 에러 응답 본문"""
+        if admission is None or _is_stats(body):
+            return None
+        rejected = admission.admit(client, len(body))
+        if rejected is None:
+            return None
+        status, message, extra = rejected
+        return error_payload(body, status, message, **extra)
+
+    queue = asyncio.Queue(maxsize=g_vars.socket_pipeline_depth)
+
+    async def respond():
+        broken = False
+        while True:
+            item = await queue.get()
+            try:
+                if item is None:
+                    return
+                kind, data = item
+                if broken:
+                    continue  # 연결이 끊겼으면 남은 요청은 버리고 받는 쪽이 막히지 않게 큐만 비움
+                if kind == "frame":
+                    data = await dispatch(ctx, conn_key, data)
+                elif kind == "stats":
+                    data = _with_admission(ctx, await dispatch(ctx, conn_key, data))
+                writer.write(framing.encode_frame(data))
+                await writer.drain()
+            except (ConnectionError, OSError) as e:
+                print(f"🔌 응답 중 연결 끊김: {addr} ({e})")
+                broken = True
+            finally:
+                if item is not None and item[0] == "frame" and admission is not None:
+                    admission.release(client)
+                queue.task_done()
+
+    responder = asyncio.create_task(respond())
+    try:
+        while not responder.done():
+            try:
+                head = await asyncio.wait_for(reader.readexactly(1), idle_timeout)
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                break  # 클라이언트 종료 또는 유휴 시간 초과
+
+            if head == framing.LEGACY_FIRST_BYTE:
+                body = await framing.read_legacy_json(reader, max_size, head, idle_timeout)
+                await queue.join()
+                rejected = admit(body)
+                if rejected is not None:
+                    writer.write(rejected)
+                elif _is_stats(body):
+                    writer.write(_with_admission(ctx, await dispatch(ctx, conn_key, body)))
+                else:
+                    try:
+                        writer.write(await dispatch(ctx, conn_key, body))
+                    finally:
+                        if admission is not None:
+                            admission.release(client)
+                await writer.drain()
+                break
+
+            try:
+                body = await framing.read_frame(reader, max_size, header=head)
+            except framing.FrameError as e:
+                # 길이가 잘못되면 이후 바이트 경계를 알 수 없으므로 에러를 보내고 연결 종료
+                await queue.put(("reply", json.dumps({"status": 413, "message": str(e)}, ensure_ascii=False).encode('utf-8')))
+                break
+            # 거절은 파싱/추론 없이 바로 응답 (응답 순서는 그대로 유지)
+            rejected = admit(body)
+            if rejected is not None:
+                await queue.put(("reply", rejected))
+            else:
+                await queue.put(("stats" if _is_stats(body) else "frame", body))
+    except asyncio.IncompleteReadError:
+        print(f"🔌 요청 도중 연결 끊김: {addr}")
+    except Exception as e:
+        print(f"❌ 연결 처리 에러: {e}")
+    finally:
+        # 이미 받은 요청의 응답은 다 보내고 닫음
+        if not responder.done():
+            await queue.put(None)
+            await responder
+        writer.close()
+
+async def serve(ctx: dict, stop_event, host: str = "localhost", port: int = 52341):
+    """stop_event 가 설정될 때까지 asyncio 서버 실행"""
+    connections = set()
+
+    async def on_connect(reader, writer):
+        task = asyncio.current_task()
+        connections.add(task)
+        try:
+            await handle_connection(reader, writer, ctx)
+        except asyncio.CancelledError:
+            pass  # 서버 종료 시 연결 작업 취소 (그대로 올리면 asyncio 가 콜백 에러로 로그를 남김)
+        finally:
+            connections.discard(task)
+
+    server = await asyncio.start_server(on_connect, host, port, reuse_address=True, backlog=128)
+    print(f"🚀 서버가 포트 {port}에서 시작되었습니다.")
+
+    async with server:
+        while not stop_event.is_set():
+            await asyncio.sleep(0.2)
+        server.close()
+        for task in list(connections):
+            task.cancel()
+        await asyncio.gather(*connections, return_exceptions=True)
+
 def main(stop_event=None, log_queue:Queue=None, chart_Show=True):
     use_existing = False
     if g_vars.init_model_path and g_vars.init_scale_path:
@@ -59,89 +436,34 @@ def main(stop_event=None, log_queue:Queue=None, chart_Show=True):
         stop_event = Event()
 
     # Detector 초기화
-    detector = MacroDetector(
-        model_path=g_vars.init_model_path,
-        seq_len=g_vars.SEQ_LEN,
-        threshold=g_vars.threshold,
-        chart_Show=chart_Show,
-        stop_event=stop_event,
-        scale_path=g_vars.init_scale_path
-    )
-    detector.start_plot_process()
+    n_processes = g_vars.socket_processes or os.cpu_count() or 1
+    pool = None
+    chart_detector = None
+    if n_processes > 1:
+        # 워커 프로세스마다 모델을 올리고 판정은 워커에서만 (메인은 연결 처리만 하므로 차트는 띄우지 않음)
+        pool = WorkerPool(
+            n_processes, g_vars.init_model_path, g_vars.init_scale_path,
+            threads=g_vars.torch_threads_per_worker or None, log_queue=log_queue,
+        ).start()
+        ctx = {"pool": pool}
+    else:
+        ctx = build_context(g_vars.init_model_path, g_vars.init_scale_path, stop_event, chart_Show, log_queue)
+        registry = ctx["args"][0]
+        chart_detector = registry.detector(
+            model_path=g_vars.init_model_path,
+            scale_path=g_vars.init_scale_path,
+            chart_Show=chart_Show,
+            stop_event=stop_event,
+        )
+        chart_detector.start_plot_process()
+    ctx["admission"] = Admission()
     
     if log_queue : log_queue.put(f"weight_threshold : {g_vars.weight_threshold}")
     else:
         print(f"weight_threshold : {g_vars.weight_threshold}")
-        
-    user_data:list[dict]
-
-    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    server_socket.bind(("localhost", 52341))
-    server_socket.listen(5)
-    server_socket.settimeout(1.0)
-    
-    print("🚀 서버가 포트 52341에서 시작되었습니다.")
 
     try:
-        while not stop_event.is_set():
-            client_socket = None
-            try:
-                client_socket, addr = server_socket.accept()
-                print(f"✅ 연결됨: {addr}")
-                client_socket.settimeout(1.0)
-            
-                data = client_socket.recv(1024 * 1024)
-
-                if not data:
-                    print("🔌 데이터 없음")
-                
-                receive_data = json.loads(data.decode('utf-8'))
-                
-                receive_data = RequestBody(**receive_data)
-                user_data = receive_data.data
-
-                print(f"📩 수신 완료: {len(user_data)} 건")
-
-                all_data = []
-                for step in user_data:
-                    if stop_event.is_set():
-                        break
-                    
-                    p_data = {
-                        'timestamp': datetime.fromisoformat(step.get("ts") or step.get("timestamp")),
-                        'x': step.get("x"),
-                        'y': step.get("y"),
-                        'deltatime': step.get("dt") or step.get("deltatime")
-                    }
-                    
-                    detector.push(p_data)
-
-                # 추론 시작
-                send_data = detector._infer()                    
-
-                result_json = ResponseBody(
-                    id = receive_data.id,
-                    status = 0,
-                    analysis_results = send_data
-                )
-
-                final_payload = result_json.model_dump_json().encode('utf-8')
-
-                client_socket.sendall(final_payload)
-                
-                # 버퍼 초기화
-                detector.buffer.clear()
-            except socket.timeout:
-                continue  # 🔥 정상: 아직 데이터 없음                
-            except Exception as e:
-                # 5. 내부 서버 에러 (status: 500)
-                print(f"❌ 분석 중 에러: {e}")
-                error_res = json.dumps({"status": 500, "message": str(e)}).encode('utf-8')
-                client_socket.sendall(error_res)
-            finally:
-                if client_socket:
-                    client_socket.close() 
+        asyncio.run(serve(ctx, stop_event))
     except Exception as e:
         print(f"❌ 서버 치명적 오류: {e}")
  
@@ -154,7 +476,8 @@ def main(stop_event=None, log_queue:Queue=None, chart_Show=True):
         else:
             print(f"에러 발생: {e}")
     finally:
-        detector.buffer.clear()
+        if chart_detector is not None:
+            chart_detector.buffer.clear()
         if log_queue:
             log_queue.put("🛑 Detector 종료")
         else:
@@ -171,6 +494,10 @@ def main(stop_event=None, log_queue:Queue=None, chart_Show=True):
     else:
         print("🛑 Macro Detector Stopped")
 
-    server_socket.close()
+    if pool is not None:
+        pool.close()
+    else:
+        ctx["executor"].shutdown(wait=False, cancel_futures=True)
+        ctx["args"][1].close()
     print("🛑 서버 소켓 종료")
     stop_event.set()
\ No newline at end of file
@@ -1,4 +1,3 @@
-import torch
 import joblib
 import numpy as np
 import pandas as pd
@@ -8,12 +7,11 @@ import sys
 
 from sklearn.preprocessing import RobustScaler
 import app.core.globals as g_vars
-from app.models.TransformerMacroDetector import TransformerMacroAutoencoder
+import app.models.OnnxBackend as OnnxBackend
 from app.core.indicators import indicators_generation
 
-from app.utilites.make_sequence import make_seq
+from app.utilites.make_sequence import iter_seq_batches
 from app.utilites.make_gauss import make_gauss
-from app.utilites.loss_caculation import Loss_Calculation
 
 def inferece_plot_main(chart_queue: Queue, features, threshold, chart_view, process_lock, stop_event=None):
     from app.utilites.plot_monitor import RealTimeMonitor
@@ -81,11 +79,11 @@ class MacroDetector:
             device=None, 
             chart_Show=True, 
             stop_event=None,
-            log_queue:Queue=None):
+            log_queue:Queue=None,
+            shared=None):
         
         self.seq_len = seq_len
         self.base_threshold = threshold if threshold is not None else g_vars.threshold
-        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
         self.log_queue = log_queue
         # 안정 장치
         self.buffer = deque(maxlen=10)
@@ -94,21 +92,93 @@ class MacroDetector:
         self.chart_Show = chart_Show
         self.plot_proc = None
 
+        self.model_path = model_path
+        self.scale_path = scale_path
+
+        # 서버에서 MicroBatcher 를 붙이면 다른 세션 윈도우와 모아서 forward
+        self.batcher = None
+        self.batch_size = g_vars.infer_batch_size
+
         # ===== 모델 초기화 =====
-        self.model = TransformerMacroAutoencoder(
-            input_size=g_vars.input_size,
-            d_model=g_vars.d_model,
-            nhead=g_vars.n_head,
-            num_layers=g_vars.num_layers,
-            dim_feedforward=g_vars.dim_feedforward,
-            dropout=g_vars.dropout
-        ).to(self.device)
-
-        self.model.load_state_dict(torch.load(model_path, map_location=self.device, weights_only=True))
-        self.model.eval()
+        if shared is not None:
+            # ModelRegistry 에 이미 올라간 모델/스케일러를 같이 씀 (버퍼 등 세션 상태만 따로)
+            self.backend = shared.backend
+            self.precision = shared.precision
+            self.device = shared.device
+            self.model = shared.model
+            self.runtime = shared.runtime
+            self.scaler = shared.scaler
+            return
+
+        # "onnx" 백엔드는 onnxruntime(CPU)만 쓰고 torch 를 import 하지 않습니다.
+        self.backend = g_vars.inference_backend
+        self.precision = "fp32"
+        if self.backend == "onnx":
+            self.device = "cpu"
+            self.model = None
+            self.runtime = OnnxBackend.load_session(model_path, intra_op_threads=g_vars.onnx_threads, log_queue=log_queue)
+        else:
+            self._load_torch_model(model_path, seq_len, device, log_queue)
 
         self.scaler:RobustScaler = joblib.load(scale_path)
 
+    def _load_torch_model(self, model_path: str, seq_len: int, device, log_queue: Queue = None):
+        import torch
+        from app.models.TransformerMacroDetector import TransformerMacroAutoencoder
+        from app.models.CompiledRuntime import CompiledRuntime
+        import app.models.Quantization as Quantization
+        import app.models.SharedWeights as SharedWeights
+
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+
+        # CPU 에서는 메모리 맵 가중치를 복사 없이 붙여서 워커 프로세스끼리 같은 물리 메모리를 씀
+        # (모델은 meta 장치에 껍데기만 만들어서 버려질 초기 가중치도 할당하지 않음)
+        shared_weights = SharedWeights.enabled() and self.device == "cpu"
+        with torch.device("meta" if shared_weights else self.device):
+            self.model = TransformerMacroAutoencoder(
+                input_size=g_vars.input_size,
+                d_model=g_vars.d_model,
+                nhead=g_vars.n_head,
+                num_layers=g_vars.num_layers,
+                dim_feedforward=g_vars.dim_feedforward,
+                dropout=g_vars.dropout
+            )
+
+        if shared_weights:
+            self.model.load_state_dict(SharedWeights.load_state_dict(model_path), assign=True)
+        else:
+            self.model.load_state_dict(torch.load(model_path, map_location=self.device, weights_only=True))
+        self.model.eval()
+
+        # CPU 서버용 int8 동적 양자화 (nn.Linear 가중치만, GPU 에서는 사용 안 함)
+        if g_vars.quantize == "int8":
+            if self.device == "cpu":
+                self.model = Quantization.load_int8(model_path, self.model, log_queue=log_queue)
+                self.precision = "int8"
+            else:
+                msg = "⚠️ int8 양자화는 CPU 전용입니다. fp32 로 실행합니다."
+                self.log_queue.put(msg) if self.log_queue else print(msg)
+
+        # 추론 실행기: "compiled" 면 (SEQ_LEN, 배치 버킷)별 TorchScript 고정 모델, 아니면 eager 모델
+        self.runtime = self.model
+        if g_vars.inference_runtime == "compiled":
+            self.runtime = CompiledRuntime(
+                self.model, model_path,
+                seq_len=seq_len,
+                input_size=g_vars.input_size,
+                device=self.device,
+                max_batch=max(g_vars.infer_batch_size, g_vars.batch_max_size),
+                variant=self.precision,
+                shared_weights=shared_weights and self.precision == "fp32",
+                log_queue=log_queue,
+            )
+
+    def warmup(self):
+        """첫 요청 지연 방지: 컴파일 버킷 준비 + 빈 윈도우 한 번 추론"""
+        if hasattr(self.runtime, "warmup"):
+            self.runtime.warmup()
+        self.score_batch(np.zeros((1, self.seq_len, g_vars.input_size), dtype=np.float32))
+
     def push(self, data: dict):
         self.buffer.append((data.get('x'), data.get('y'), data.get('timestamp'), data.get('deltatime')))
         
@@ -134,67 +204,87 @@ class MacroDetector:
         self.plot_proc.start()
 
     def _infer(self):
-        df = pd.DataFrame(list(self.buffer), columns=["x", "y", "timestamp", "deltatime"])
-    
+        return self.infer_points(list(self.buffer))
+
+    def infer_points(self, points: list):
+        """(x, y, timestamp, deltatime) 점 목록 전체를 지표 → 추론 (소켓 요청 한 건 등)"""
+        return self.infer_frame(pd.DataFrame(points, columns=["x", "y", "timestamp", "deltatime"]))
+
+    def infer_frame(self, df: pd.DataFrame):
+        """x, y, deltatime 컬럼이 있는 점 DataFrame 을 지표 → 추론 (바이너리 요청은 배열로 바로 만듦)"""
         df = df[df["deltatime"] <= g_vars.filter_tolerance].reset_index(drop=True)
         
         df = indicators_generation(
             df_chunk=df, 
             chunk_size=g_vars.chunk_size,
-            offset=g_vars.offset
+            offset=g_vars.offset,
+            features=g_vars.FEATURES,
         )
 
-        if len(df) < g_vars.SEQ_LEN:
+        return self.infer_features(df[g_vars.FEATURES])
+
+    def infer_features(self, features):
+        """지표 행렬 (n, len(FEATURES)) 을 스케일링 → 시퀀스 → 추론 (지표 캐시 적중 시 바로 사용)"""
+        if len(features) < g_vars.SEQ_LEN:
             return None
                 
-        df_filter_chunk = df[g_vars.FEATURES].copy()
+        df_filter_chunk = pd.DataFrame(np.asarray(features), columns=g_vars.FEATURES)
         
         chunks_scaled_array = self.scaler.transform(df_filter_chunk)
         
-        chunks_scaled_df = pd.DataFrame(chunks_scaled_array, columns=g_vars.FEATURES)
-        
-        chunks_scaled_df = chunks_scaled_df * 10 # train이랑 동일 하게
-  
-        final_input:np.array = make_seq(data=chunks_scaled_df, seq_len=g_vars.SEQ_LEN, stride=1)
-        
+        chunks_scaled_array = chunks_scaled_array * 10 # train이랑 동일 하게
+
         send_data = []
-        for i, input in enumerate(final_input):
-            if self.stop_event.is_set():
+        # stride=1 윈도우를 batch_size(기본 infer_batch_size)개씩 묶어서 한 번에 forward
+        for starts, batch in iter_seq_batches(chunks_scaled_array, g_vars.SEQ_LEN, stride=1,
+                                              batch_size=self.batch_size):
+            if self.stop_event is not None and self.stop_event.is_set():
                 if self.log_queue:
                     self.log_queue.put("🛑 Detector 중지")
                 else:
                     print("🛑 Detector 중지")
-                break            
-            last_seq = torch.tensor(input, dtype=torch.float32).unsqueeze(0).to(self.device)
+                break
 
-            with torch.no_grad():
-                output = self.model(last_seq)
+            sample_errors = self.score_batch(batch)
 
-                sample_errors = Loss_Calculation(outputs=output, batch=last_seq).item()
+            results = [
+                {"is_human": err <= self.base_threshold, "error_pct": err / self.base_threshold * 100}
+                for err in sample_errors
+            ]
+            send_data.extend(results)
+            self._emit_batch(chunks_scaled_array, starts, sample_errors, results)
 
-                # 임계치 판정 logic
-                is_human = sample_errors <= self.base_threshold
-                
-            if g_vars.CHART_DATA is not None:
-                try:
-                    # chunks_scaled_df에서 현재 시퀀스의 '끝 지점' 데이터를 추출하여 전송
-                    # 보통 시퀀스의 마지막 타임스텝 데이터를 특징값으로 봅니다.
-                    current_features = chunks_scaled_df.iloc[i + g_vars.SEQ_LEN - 1] 
-                    g_vars.CHART_DATA.put_nowait((current_features, sample_errors, self.base_threshold))
-                except Exception: 
-                    pass
-
-            _error = sample_errors / self.base_threshold * 100
-                    
-            send_data.append({
-                "is_human": is_human,
-                "error_pct": _error, 
-            })
-            
-        
-            # 메시지 구성
-            log_text = f"{is_human}, {_error:.4f} %"
+        return send_data
+
+    def score_batch(self, batch: np.ndarray) -> list:
+        """(batch, SEQ_LEN, F) 윈도우의 샘플별 재구성 오차"""
+        if self.batcher is not None:
+            return self.batcher.score(self, batch)
+        return self._forward_errors(batch)
+
+    def _forward_errors(self, batch: np.ndarray) -> list:
+        if self.backend == "onnx":
+            return self.runtime.errors(batch).tolist()
+
+        import torch
+        from app.utilites.loss_caculation import Loss_Calculation
+
+        x = torch.from_numpy(np.ascontiguousarray(batch, dtype=np.float32)).to(self.device)
+        with torch.no_grad():
+            output = self.runtime(x)
+            return Loss_Calculation(outputs=output, batch=x).cpu().tolist()
+
+    def _emit_batch(self, chunks_scaled_array, starts, sample_errors, results):
+        # 차트는 큐에서 마지막 값만 그리므로 배치의 마지막 윈도우만 보내고, 로그도 배치 단위로 한 번에 보냅니다.
+        if g_vars.CHART_DATA is not None:
+            try:
+                # 현재 시퀀스의 '끝 지점' 데이터를 특징값으로 봅니다.
+                current_features = chunks_scaled_array[starts[-1] + g_vars.SEQ_LEN - 1]
+                g_vars.CHART_DATA.put_nowait((current_features, sample_errors[-1], self.base_threshold))
+            except Exception: 
+                pass
 
-            self.log_queue.put(log_text) if self.log_queue else print(log_text)
+        # 메시지 구성
+        log_text = "\n".join(f"{r['is_human']}, {r['error_pct']:.4f} %" for r in results)
 
-        return send_data
\ No newline at end of file
+        self.log_queue.put(log_text) if self.log_queue else print(log_text)
@@ -0,0 +1,165 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import Queue
+
+import numpy as np
+
+import app.core.globals as g_vars
+
+class _Pending:
+    __slots__ = ("detector", "windows", "future", "arrived")
+
+    def __init__(self, detector, windows: np.ndarray, arrived: float):
+        self.detector = detector
+        self.windows = windows
+        self.future = Future()
+        self.arrived = arrived
+
+class MicroBatcher:
+    """
+    여러 세션(연결)의 추론 윈도우를 모아서 한 번에 forward 하는 배치 계층.
+
+    - 요청은 score(detector, windows) 로 윈도우를 넣고 자기 몫의 오차만 돌려받음 (다른 요청과 섞여도 순서 유지)
+    - 첫 윈도우가 들어온 뒤 max_batch 개가 차거나 max_wait 초가 지나면 바로 실행
+    - 같은 가중치(detector.runtime)를 쓰는 윈도우끼리만 묶음 (모델이 다르면 다음 배치로)
+    - 최근 지연 p99 가 latency_slo 를 넘으면 배치 크기를 절반으로 줄이고, 여유가 생기면 다시 늘림
+    forward 는 배치 스레드 하나에서만 실행되고, 요청 스레드는 결과를 기다리기만 합니다.
+    """
+    def __init__(self, max_batch: int = None, max_wait: float = None, latency_slo: float = None,
+                 adapt_every: int = 50, log_queue: Queue = None):
+        self.max_batch = int(max_batch or g_vars.batch_max_size)
+        self.max_wait = float(max_wait if max_wait is not None else g_vars.batch_max_wait_ms / 1000)
+        self.latency_slo = float(latency_slo if latency_slo is not None else g_vars.batch_p99_ms / 1000)
+        self.adapt_every = adapt_every
+        self.log_queue = log_queue
+
+        self.batch_limit = self.max_batch  # 지연에 따라 줄었다 늘었다 하는 현재 배치 크기
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+        self.latencies = deque(maxlen=2000)  # 윈도우 묶음별 (대기 + forward) 시간
+        self.batches = 0
+        self.windows = 0
+
+    def _log(self, msg):
+        self.log_queue.put(msg) if self.log_queue else print(msg)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def submit(self, detector, windows: np.ndarray) -> list:
+        """windows 를 현재 배치 크기 이하 묶음으로 나눠서 넣고 묶음별 Future 목록을 반환"""
+        now = time.perf_counter()
+        size = self.batch_limit
+        pending = [
+            _Pending(detector, windows[i:i + size], now)
+            for i in range(0, len(windows), size)
+        ]
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher 가 종료되었습니다.")
+            self._queue.extend(pending)
+            self._cond.notify()
+        return [p.future for p in pending]
+
+    def score(self, detector, windows: np.ndarray) -> list:
+        """(n, SEQ_LEN, F) 윈도우의 샘플별 재구성 오차 (다른 세션 윈도우와 같이 forward)"""
+        errors = []
+        for future in self.submit(detector, windows):
+            errors.extend(future.result())
+        return errors
+
+    def _ready_count(self, runtime) -> int:
+        return sum(len(p.windows) for p in self._queue if p.detector.runtime is runtime)
+
+    def _take(self) -> list:
+        """다음 배치로 실행할 묶음들 (같은 runtime, 합계 batch_limit 이하)"""
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+
+            head = self._queue[0]
+            deadline = head.arrived + self.max_wait
+            while not self._closed and self._ready_count(head.detector.runtime) < self.batch_limit:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            taken, rest, total = [], deque(), 0
+            for p in self._queue:
+                if p.detector.runtime is head.detector.runtime and (not taken or total + len(p.windows) <= self.batch_limit):
+                    taken.append(p)
+                    total += len(p.windows)
+                else:
+                    rest.append(p)
+            self._queue = rest
+            return taken
+
+    def _run(self):
+        while True:
+            taken = self._take()
+            if taken is None:
+                return
+
+            try:
+                windows = np.concatenate([p.windows for p in taken]) if len(taken) > 1 else taken[0].windows
+                errors = taken[0].detector._forward_errors(windows)
+            except Exception as e:
+                for p in taken:
+                    p.future.set_exception(e)
+                continue
+
+            now = time.perf_counter()
+            start = 0
+            for p in taken:
+                end = start + len(p.windows)
+                p.future.set_result(errors[start:end])
+                self.latencies.append(now - p.arrived)
+                start = end
+
+            self.batches += 1
+            self.windows += len(windows)
+            if self.batches % self.adapt_every == 0:
+                self._adapt()
+
+    def _p99(self) -> float:
+        return float(np.percentile(self.latencies, 99)) if self.latencies else 0.0
+
+    def _adapt(self):
+        p99 = self._p99()
+        if p99 > self.latency_slo and self.batch_limit > 1:
+            self.batch_limit = max(self.batch_limit // 2, 1)
+            self.latencies.clear()
+            self._log(f"⚠️ 배치 지연 p99 {p99 * 1000:.1f} ms > {self.latency_slo * 1000:.0f} ms → 배치 크기 {self.batch_limit}")
+        elif p99 < self.latency_slo / 2 and self.batch_limit < self.max_batch:
+            self.batch_limit = min(self.batch_limit * 2, self.max_batch)
+            self.latencies.clear()
+            self._log(f"✅ 배치 지연 p99 {p99 * 1000:.1f} ms → 배치 크기 {self.batch_limit}")
+
+    def stats(self) -> dict:
+        lat = np.asarray(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "batches": self.batches,
+            "windows": self.windows,
+            "avg_batch": self.windows / max(self.batches, 1),
+            "batch_limit": self.batch_limit,
+            "p50_ms": float(np.percentile(lat, 50)),
+            "p99_ms": float(np.percentile(lat, 99)),
+            "queued": len(self._queue),
+        }
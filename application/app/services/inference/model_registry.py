@@ -0,0 +1,257 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from multiprocessing import Queue
+
+import app.core.globals as g_vars
+from app.services.inference.macro_dectector import MacroDetector
+
+# 프로세스 전체에서 같이 쓰는 모델 레지스트리.
+# - 키: (모델 경로, 스케일러 경로, 각 파일 mtime, 추론 백엔드) → 파일이 다시 저장되면 다른 키가 되어 새로 읽음
+# - 값: 모델 + 스케일러를 불러 둔 MacroDetector (세션 상태 없이 가중치 보관용)
+# - 메모리(model_registry_max_mb)와 개수(model_registry_max_models) 한도를 넘으면 가장 오래 안 쓴 것부터 내림
+# 요청은 detector(model_id) 로 가중치를 공유하는 새 탐지기를 받아서 로딩 비용 없이 바로 추론합니다.
+#
+# 무중단 교체: 이미 올라간 모델의 파일이 바뀌면(재학습) 새 버전은 백그라운드 스레드에서 읽고 warmup 한 뒤
+# 한 번에 바꿔 끼웁니다. 그동안의 요청은 이전 버전으로 판정하고, 이미 받아 간 탐지기는 끝까지 이전 가중치를 씁니다.
+# 파일은 model_swap_settle 초 동안 더 바뀌지 않아야 읽습니다 (저장 중인 파일 방지).
+_MODEL_ID = re.compile(r"^[\w\-. ]+$")
+
+def artifact_paths(model_id: str) -> tuple:
+    """모델 ID(학습 시 filename) → (<save_path>/<ID>_model.pt, <scaler_path>/<ID>_scaler.pkl)"""
+    if not model_id or not _MODEL_ID.match(model_id) or ".." in model_id:
+        raise ValueError(f"잘못된 모델 ID: {model_id!r}")
+    return (
+        os.path.join(g_vars.save_path, f"{model_id}_model.pt"),
+        os.path.join(g_vars.scaler_path, f"{model_id}_scaler.pkl"),
+    )
+
+def detector_bytes(detector: MacroDetector) -> int:
+    """불러온 모델 가중치 + 스케일러가 차지하는 대략적인 메모리"""
+    size = os.path.getsize(detector.scale_path)
+    if detector.model is not None:
+        # state_dict 기준 (int8 양자화 Linear 의 packed 가중치는 parameters()/buffers() 에 안 나옴)
+        import app.models.Quantization as Quantization
+        size += Quantization.model_bytes(detector.model)
+    else:
+        size += os.path.getsize(detector.runtime.path)  # onnx 세션: 그래프 파일 크기
+    return size
+
+class ModelRegistry:
+    def __init__(self, max_bytes: int = None, max_models: int = None, settle: float = None, log_queue: Queue = None):
+        self.max_bytes = int(max_bytes if max_bytes is not None else g_vars.model_registry_max_mb * 1024 * 1024)
+        self.max_models = int(max_models if max_models is not None else g_vars.model_registry_max_models)
+        self.settle = float(settle if settle is not None else g_vars.model_swap_settle)
+        self.log_queue = log_queue
+
+        self._entries = OrderedDict()  # key -> (detector, bytes), 뒤쪽이 최근 사용
+        self._loading = {}  # key -> Lock (같은 모델을 동시에 두 번 읽지 않도록)
+        self._failed = set()  # 읽기에 실패한 버전 (같은 파일로 다시 시도하지 않음)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.swaps = 0
+        self._watcher = None
+
+    def _log(self, msg):
+        self.log_queue.put(msg) if self.log_queue else print(msg)
+
+    def _key(self, model_path: str, scale_path: str) -> tuple:
+        model_path = os.path.realpath(model_path)
+        scale_path = os.path.realpath(scale_path)
+        return (
+            model_path, scale_path,
+            os.stat(model_path).st_mtime_ns, os.stat(scale_path).st_mtime_ns,
+            g_vars.inference_backend,
+        )
+
+    def _used_bytes(self) -> int:
+        return sum(size for _, size in self._entries.values())
+
+    def _evict(self, keep: tuple = None):
+        # 호출하는 쪽에서 self._lock 을 잡고 있어야 함
+        while self._entries and (len(self._entries) > self.max_models or self._used_bytes() > self.max_bytes):
+            key = next(iter(self._entries))
+            if key == keep:
+                break  # 방금 올린 모델 하나가 한도보다 커도 그 모델은 유지
+            self._entries.pop(key)
+            self._log(f"♻️ 모델 내림 (LRU): {os.path.basename(key[0])}")
+
+    def _previous(self, key: tuple):
+        # 같은 파일의 이전 버전(mtime 이 다른 키)
+        return next((k for k in reversed(self._entries) if k[:2] == key[:2] and k != key), None)
+
+    def _load(self, key: tuple) -> MacroDetector:
+        """key 버전을 읽고 warmup 한 뒤 등록 (같은 키는 한 번만 읽음)"""
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        with loading:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    # 기다리는 동안 다른 스레드가 먼저 읽음
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+
+            try:
+                detector = MacroDetector(
+                    model_path=key[0],
+                    scale_path=key[1],
+                    seq_len=g_vars.SEQ_LEN,
+                    threshold=g_vars.threshold,
+                    chart_Show=False,
+                    log_queue=self.log_queue,
+                )
+                detector.warmup()
+                size = detector_bytes(detector)
+
+                with self._lock:
+                    # 이전 버전은 레지스트리에서만 내림 (이미 받아 간 탐지기는 끝까지 그대로 사용)
+                    old = [k for k in self._entries if k[:2] == key[:2] and k != key]
+                    for k in old:
+                        self._entries.pop(k)
+                    self._entries[key] = (detector, size)
+                    self.misses += 1
+                    self.swaps += bool(old)
+                    self._evict(keep=key)
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+
+            self._log(f"{'🔁 모델 교체' if old else '📦 모델 로드'}: {os.path.basename(key[0])} ({size / 1024 / 1024:.1f} MB)")
+            return detector
+
+    def _swap(self, key: tuple):
+        try:
+            self._load(key)
+        except Exception as e:
+            with self._lock:
+                self._failed.add(key)
+            self._log(f"⚠️ 새 모델 읽기 실패, 이전 모델 유지: {os.path.basename(key[0])} ({e})")
+
+    def _reload_async(self, key: tuple, force: bool = False) -> bool:
+        """새 버전을 백그라운드에서 읽기 시작 (이미 읽는 중이거나 파일이 아직 저장 중이면 건너뜀)"""
+        with self._lock:
+            if key in self._entries or key in self._loading or key in self._failed:
+                return False
+            if not force and time.time() - max(key[2], key[3]) / 1e9 < self.settle:
+                return False
+            self._loading[key] = threading.Lock()
+        threading.Thread(target=self._swap, args=(key,), daemon=True).start()
+        return True
+
+    def get_paths(self, model_path: str, scale_path: str) -> MacroDetector:
+        """
+        경로로 불러온 (공유용) 탐지기. 처음이면 바로 읽고,
+        파일이 바뀐 경우에는 새 버전을 백그라운드에서 준비하는 동안 이전 버전을 돌려줍니다.
+        """
+        key = self._key(model_path, scale_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            previous = self._previous(key)
+            if previous is not None:
+                self._entries.move_to_end(previous)
+                self.hits += 1
+                stale = self._entries[previous][0]
+
+        if previous is not None:
+            self._reload_async(key)
+            return stale
+        return self._load(key)
+
+    def preload(self, model_path: str, scale_path: str, on_ready=None) -> threading.Thread:
+        """백그라운드에서 읽고 warmup. 끝나면 on_ready(model_path, scale_path) 호출 (관리 명령 'load' 용)"""
+        def run():
+            try:
+                self._load(self._key(model_path, scale_path))
+            except Exception as e:
+                self._log(f"⚠️ 모델 미리 읽기 실패: {os.path.basename(model_path)} ({e})")
+                return
+            if on_ready is not None:
+                on_ready(model_path, scale_path)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        올라가 있는 모델 중 파일이 바뀐 것을 백그라운드에서 다시 읽기 시작. 시작한 개수를 반환
+        (force: 관리 명령처럼 저장이 끝난 걸 아는 경우 settle 대기 없이 바로)
+        """
+        with self._lock:
+            paths = {k[:2] for k in self._entries}
+
+        started = 0
+        for model_path, scale_path in paths:
+            try:
+                key = self._key(model_path, scale_path)
+            except OSError:
+                continue  # 저장 중이라 잠깐 파일이 없을 수 있음 → 다음 확인 때 다시
+            started += self._reload_async(key, force=force)
+        return started
+
+    def start_watcher(self, stop_event=None, interval: float = None) -> threading.Thread:
+        """interval 초마다 refresh() 하는 감시 스레드 (프로세스당 하나)"""
+        interval = float(interval if interval is not None else g_vars.model_watch_interval)
+        if interval <= 0 or (self._watcher and self._watcher.is_alive()):
+            return self._watcher
+
+        stop_event = stop_event or threading.Event()
+
+        def watch():
+            while not stop_event.wait(interval):
+                self.refresh()
+
+        self._watcher = threading.Thread(target=watch, daemon=True)
+        self._watcher.start()
+        return self._watcher
+
+    def get(self, model_id: str) -> MacroDetector:
+        return self.get_paths(*artifact_paths(model_id))
+
+    def detector(self, model_id: str = None, model_path: str = None, scale_path: str = None,
+                 cls=MacroDetector, **kwargs) -> MacroDetector:
+        """
+        레지스트리의 가중치를 공유하는 새 탐지기 (cls 는 MacroDetector 또는 그 하위 클래스).
+        model_id 를 주면 학습 저장 경로에서, 아니면 model_path / scale_path 로 찾습니다.
+        """
+        base = self.get(model_id) if model_id else self.get_paths(model_path, scale_path)
+        kwargs.setdefault("seq_len", g_vars.SEQ_LEN)
+        kwargs.setdefault("threshold", g_vars.threshold)
+        return cls(model_path=base.model_path, scale_path=base.scale_path, shared=base, **kwargs)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "models": len(self._entries),
+                "used_mb": self._used_bytes() / 1024 / 1024,
+                "max_mb": self.max_bytes / 1024 / 1024,
+                "hits": self.hits,
+                "misses": self.misses,
+                "swaps": self.swaps,
+                "loading": len(self._loading),
+            }
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry(log_queue: Queue = None) -> ModelRegistry:
+    """프로세스 전체에서 하나만 쓰는 레지스트리"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(log_queue=log_queue)
+        return _registry
@@ -0,0 +1,116 @@
+import time
+from multiprocessing import Queue
+
+import app.core.globals as g_vars
+
+class InferenceScheduler:
+    """
+    StreamingMacroDetector 앞단의 부하 조절기.
+
+    점 수집(지표 갱신)은 항상 전부 처리하고, 비용이 큰 추론만 조절합니다.
+    - 여유가 있으면: 판정할 차례가 될 때마다 바로 추론 (기존 동작)
+    - 밀리면(이벤트 나이 > latency_budget): 한 번에 꺼낸 이벤트 묶음 안의 판정 차례들을 하나로 합쳐서
+      가장 최신 윈도우만 추론하고, 지난 윈도우는 건너뜀
+    - 계속 밀리면 판정 간격(stride)을 2배씩 넓히고(최대 2**max_level 배), 여유가 생기면 다시 좁힘
+    단계가 바뀔 때마다 log_queue 로 알립니다.
+    """
+    def __init__(self, detector, latency_budget: float = None, max_level: int = 3,
+                 recover_batches: int = 20, log_queue: Queue = None):
+        self.detector = detector
+        self.latency_budget = float(latency_budget if latency_budget is not None else g_vars.latency_budget)
+        self.max_level = max_level
+        self.recover_batches = recover_batches
+        self.log_queue = log_queue
+
+        self.base_stride = detector.stride
+        self.level = 0
+        self.cost_ema = 0.0
+        self.skipped = 0
+        self.scored = 0
+        self._calm = 0
+
+    def _log(self, msg):
+        self.log_queue.put(msg) if self.log_queue else print(msg)
+
+    def _age(self, data: dict, now: float) -> float:
+        captured = data.get('captured_at')
+        return now - captured if captured is not None else 0.0
+
+    def _score(self, data: dict) -> dict:
+        t0 = time.perf_counter()
+        result = self.detector.score_latest()
+        now = time.perf_counter()
+
+        cost = now - t0
+        self.cost_ema = cost if self.scored == 0 else 0.8 * self.cost_ema + 0.2 * cost
+        self.scored += 1
+
+        result["latency"] = self._age(data, now)
+        result["stride"] = self.detector.stride
+        return result
+
+    def process(self, events: list) -> list:
+        """한 번에 꺼낸 이벤트 묶음을 처리하고 이번에 나온 판정 목록을 반환"""
+        verdicts = []
+        due = None
+        for data in events:
+            if not self.detector.ingest(data):
+                continue
+
+            now = time.perf_counter()
+            # 지금 추론해도 예산 안에 판정이 나갈 수 있으면 바로 추론
+            if self.level == 0 and self._age(data, now) + self.cost_ema <= self.latency_budget:
+                # 앞에서 미뤄 둔 윈도우는 지금 판정으로 대신함 (같은 윈도우를 두 번 판정하지 않도록)
+                if due is not None:
+                    self.skipped += 1
+                    due = None
+                verdicts.append(self._score(data))
+                continue
+
+            # 밀린 상태: 더 새 윈도우가 뒤에 있으면 지금 윈도우는 건너뜀
+            if due is not None:
+                self.skipped += 1
+            self.detector.skip()
+            due = data
+
+        if due is not None:
+            verdicts.append(self._score(due))
+
+        self._adapt(verdicts, len(events))
+        return verdicts
+
+    def _set_level(self, level: int, reason: str):
+        old_stride = self.detector.stride
+        self.level = level
+        self.detector.stride = self.base_stride * (2 ** level)
+        self._log(
+            f"⚠️ 추론 부하 조절 [{reason}] stride {old_stride} → {self.detector.stride} "
+            f"(추론 {self.cost_ema * 1000:.1f} ms, 건너뛴 윈도우 {self.skipped})"
+            if level > 0 else
+            f"✅ 추론 부하 정상화: stride {old_stride} → {self.detector.stride} (건너뛴 윈도우 {self.skipped})"
+        )
+
+    def _adapt(self, verdicts: list, backlog: int):
+        worst = max((v["latency"] for v in verdicts), default=0.0)
+
+        if worst > self.latency_budget:
+            self._calm = 0
+            if self.level < self.max_level:
+                self._set_level(self.level + 1, f"지연 {worst * 1000:.0f} ms > {self.latency_budget * 1000:.0f} ms, 대기 {backlog}")
+            return
+
+        # 예산의 절반 안쪽으로 충분히 오래 유지되면 한 단계씩 복귀
+        if verdicts and worst < self.latency_budget / 2:
+            self._calm += 1
+            if self.level > 0 and self._calm >= self.recover_batches:
+                self._calm = 0
+                self._set_level(self.level - 1, "여유")
+
+    def stats(self) -> dict:
+        return {
+            "level": self.level,
+            "stride": self.detector.stride,
+            "scored": self.scored,
+            "skipped": self.skipped,
+            "cost_ms": self.cost_ema * 1000,
+        }
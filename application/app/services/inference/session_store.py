@@ -0,0 +1,120 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from multiprocessing import Queue
+
+import app.core.globals as g_vars
+from app.services.inference.model_registry import ModelRegistry
+from app.services.inference.streaming_detector import StreamingMacroDetector
+
+class Session:
+    __slots__ = ("session_id", "detector", "lock", "created", "last_seen", "points", "windows")
+
+    def __init__(self, session_id: str, detector: StreamingMacroDetector):
+        self.session_id = session_id
+        self.detector = detector
+        self.lock = threading.Lock()  # 같은 세션의 push 는 순서대로 하나씩
+        self.created = time.monotonic()
+        self.last_seen = self.created
+        self.points = 0
+        self.windows = 0
+
+class SessionStore:
+    """
+    소켓 스트리밍 세션 보관소.
+
+    세션마다 StreamingMacroDetector(지표 상태 + 스케일된 지표 링 버퍼)를 들고 있어서,
+    클라이언트는 새 점만 보내고 서버는 새로 생긴 윈도우만 추론합니다.
+    가중치는 ModelRegistry 것을 같이 쓰므로 세션당 메모리는 링 버퍼 정도입니다.
+    - session_ttl 초 동안 요청이 없으면 만료
+    - session_max 개를 넘으면 가장 오래 쉬고 있는 세션부터 닫음
+    세션은 열 때의 모델로 끝까지 판정합니다 (모델이 교체되면 새로 연 세션부터 적용).
+    """
+    def __init__(self, registry: ModelRegistry, ttl: float = None, max_sessions: int = None, log_queue: Queue = None):
+        self.registry = registry
+        self.ttl = float(ttl if ttl is not None else g_vars.session_ttl)
+        self.max_sessions = int(max_sessions if max_sessions is not None else g_vars.session_max)
+        self.log_queue = log_queue
+
+        self._sessions = OrderedDict()  # session_id -> Session, 뒤쪽이 최근 사용
+        self._lock = threading.Lock()
+        self.expired = 0
+
+    def _log(self, msg):
+        self.log_queue.put(msg) if self.log_queue else print(msg)
+
+    def open(self, session_id: str = None, model_id: str = None, model_path: str = None, scale_path: str = None,
+             batcher=None, stride: int = None) -> Session:
+        """
+        세션 열기 (같은 ID 가 있으면 새 상태로 다시 시작)
+        stride: 판정 간격 (기본 STRIDE, 1 이면 청크 업로드처럼 모든 윈도우 판정)
+        """
+        detector = self.registry.detector(
+            model_id, model_path=model_path, scale_path=scale_path,
+            cls=StreamingMacroDetector, chart_Show=False, stride=stride,
+        )
+        if batcher is not None:
+            detector.batcher = batcher
+            detector.batch_size = batcher.max_batch
+
+        session = Session(session_id or uuid.uuid4().hex, detector)
+        with self._lock:
+            self._sessions.pop(session.session_id, None)
+            self._sessions[session.session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                old_id, _ = self._sessions.popitem(last=False)
+                self._log(f"♻️ 세션 수 한도 초과로 닫음: {old_id}")
+        self.expire()
+        return session
+
+    def get(self, session_id: str) -> Session:
+        """열려 있는 세션 (없거나 만료됐으면 KeyError)"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or time.monotonic() - session.last_seen > self.ttl:
+                self._sessions.pop(session_id, None)
+                raise KeyError(session_id)
+            session.last_seen = time.monotonic()
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def push(self, session_id: str, x, y, deltatime) -> list:
+        """세션에 새 점들을 넣고 새로 생긴 윈도우의 판정 목록 반환"""
+        session = self.get(session_id)
+        with session.lock:
+            verdicts = session.detector.push_arrays(x, y, deltatime)
+            session.points += len(x)
+            session.windows += len(verdicts)
+            session.last_seen = time.monotonic()
+        return verdicts
+
+    def close(self, session_id: str) -> Session:
+        """세션 닫기. 닫은 세션(없으면 None)을 반환"""
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def expire(self) -> int:
+        """ttl 동안 쓰지 않은 세션 정리. 정리한 개수를 반환"""
+        now = time.monotonic()
+        with self._lock:
+            idle = [sid for sid, s in self._sessions.items() if now - s.last_seen > self.ttl]
+            for sid in idle:
+                self._sessions.pop(sid)
+            self.expired += len(idle)
+        return len(idle)
+
+    def start_sweeper(self, stop_event) -> threading.Thread:
+        """ttl/4 마다 만료 세션을 정리하는 스레드"""
+        def sweep():
+            while not stop_event.wait(max(self.ttl / 4, 1.0)):
+                self.expire()
+
+        thread = threading.Thread(target=sweep, daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> dict:
+        self.expire()
+        with self._lock:
+            return {"sessions": len(self._sessions), "expired": self.expired}
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+import app.core.globals as g_vars
+from app.core.indicators_stream import StreamingIndicators
+from app.services.inference.macro_dectector import MacroDetector
+
+def scaler_affine(scaler, n_features: int):
+    """
+    학습 스케일러(MinMax/Robust/Standard 등 지표별 선형 변환)를 a * x + b 계수로 풀어 둡니다.
+    점마다 scaler.transform 을 부르면 입력 검증 비용이 커서, 스트리밍에서는 계수로 직접 계산합니다.
+    """
+    zeros = np.zeros((1, n_features))
+    ones = np.ones((1, n_features))
+    names = getattr(scaler, "feature_names_in_", None)
+    if names is not None:
+        # DataFrame 으로 학습된 스케일러는 같은 컬럼 이름으로 넘겨야 경고가 나지 않음
+        zeros = pd.DataFrame(zeros, columns=names)
+        ones = pd.DataFrame(ones, columns=names)
+    b = np.asarray(scaler.transform(zeros), dtype=np.float64)[0]
+    a = np.asarray(scaler.transform(ones), dtype=np.float64)[0] - b
+    return a, b
+
+class StreamingMacroDetector(MacroDetector):
+    """
+    실시간 마우스 추론용 스트리밍 탐지기.
+
+    - 점 하나마다 StreamingIndicators 로 지표 한 줄을 O(1)로 만들고, 스케일해서 고정 크기 링 버퍼에 기록
+    - 지표 행이 STRIDE 개 쌓일 때마다 마지막 SEQ_LEN 행 윈도우를 한 번 추론해서 push() 에서 바로 판정 반환
+    - 점/지표 버퍼는 모두 미리 할당된 고정 크기라 세션이 길어져도 점당 비용과 메모리가 늘지 않습니다.
+    """
+    def __init__(self, model_path: str, scale_path: str, stride: int = None, **kwargs):
+        super().__init__(model_path=model_path, scale_path=scale_path, **kwargs)
+
+        self.stride = int(stride or g_vars.STRIDE)
+        n_features = len(g_vars.FEATURES)
+
+        self.indicators = StreamingIndicators(
+            chunk_size=g_vars.chunk_size,
+            offset=g_vars.offset,
+            features=g_vars.FEATURES,
+            max_deltatime=g_vars.filter_tolerance,
+        )
+        self._scale_a, self._scale_b = scaler_affine(self.scaler, n_features)
+        self._scale_a *= 10 # train이랑 동일 하게
+        self._scale_b *= 10
+
+        # 스케일된 지표 링 버퍼. 행을 k, k + SEQ_LEN 두 곳에 써서 마지막 SEQ_LEN 행이 항상 연속 슬라이스가 되게 함
+        self._ring = np.zeros((2 * self.seq_len, n_features), dtype=np.float32)
+
+        # 첫 판정까지 필요한 점 수 (지표 워밍업 offset + 시퀀스 길이)
+        self.allowable_add_data = g_vars.offset + self.seq_len
+        self.reset()
+
+    def reset(self):
+        """세션 상태 초기화"""
+        self.indicators.reset()
+        self.buffer.clear()
+        self.rows = 0
+        self._pending = 0
+
+    def ingest(self, data: dict) -> bool:
+        """
+        점 하나를 지표 링 버퍼에 반영. 판정할 차례(새 지표 행이 stride 개 쌓였고 윈도우가 찼음)면 True.
+        """
+        return self._ingest_xy(data.get('x'), data.get('y'), data.get('deltatime'))
+
+    def _ingest_xy(self, x, y, deltatime) -> bool:
+        row = self.indicators.push(x, y, deltatime)
+        if row is None:
+            return False
+
+        k = self.rows % self.seq_len
+        scaled = row * self._scale_a + self._scale_b
+        self._ring[k] = scaled
+        self._ring[k + self.seq_len] = scaled
+        self.rows += 1
+        self._pending += 1
+
+        return self.rows >= self.seq_len and self._pending >= self.stride
+
+    def window(self) -> np.ndarray:
+        """마지막 SEQ_LEN 개 지표 행 (seq_len, F) - 링 버퍼의 뷰"""
+        k = (self.rows - 1) % self.seq_len
+        return self._ring[k + 1:k + 1 + self.seq_len]
+
+    def score_latest(self) -> dict:
+        """현재 윈도우를 추론해서 판정 반환"""
+        self._pending = 0
+        window = self.window()
+        raw_error = self.score_batch(window[None])[0]
+        return self._verdict(window, raw_error)
+
+    def _verdict(self, window: np.ndarray, raw_error: float) -> dict:
+        is_human = raw_error <= self.base_threshold
+        _error = raw_error / self.base_threshold * 100
+
+        if g_vars.CHART_DATA is not None:
+            try:
+                g_vars.CHART_DATA.put_nowait((window[-1].copy(), raw_error, self.base_threshold))
+            except Exception:
+                pass
+
+        return {
+            "macro_probability": f"{_error:.2f}%",
+            "raw_error": raw_error,
+            "error_pct": _error,
+            "is_human": is_human,
+        }
+
+    def skip(self):
+        """이번 판정 차례를 추론 없이 넘김 (부하 조절용)"""
+        self._pending = 0
+
+    def push(self, data: dict):
+        """점 하나 추가. 판정할 차례면 판정 dict, 아니면 None"""
+        if self.ingest(data):
+            return self.score_latest()
+        return None
+
+    def push_arrays(self, x, y, deltatime) -> list:
+        """
+        점 여러 개를 한 번에 추가 (세션 스트리밍용). 이번에 새로 판정할 차례가 된 윈도우만 모아서
+        한 번에 추론하고 판정 목록을 반환 (각 판정의 "row" 는 세션 시작부터 센 마지막 지표 행 번호)
+        """
+        windows, rows = [], []
+        for px, py, dt in zip(x, y, deltatime):
+            if self._ingest_xy(px, py, dt):
+                self._pending = 0
+                windows.append(self.window().copy())
+                rows.append(self.rows)
+
+        if not windows:
+            return []
+
+        windows = np.stack(windows)
+        errors = []
+        for i in range(0, len(windows), self.batch_size):
+            errors.extend(self.score_batch(windows[i:i + self.batch_size]))
+
+        verdicts = []
+        for window, row, raw_error in zip(windows, rows, errors):
+            verdict = self._verdict(window, raw_error)
+            verdict["row"] = row
+            verdicts.append(verdict)
+        return verdicts
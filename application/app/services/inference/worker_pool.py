@@ -0,0 +1,310 @@
+import os
+import re
+import sys
+import json
+import ctypes
+import uuid
+import zlib
+import time
+import queue
+import itertools
+import threading
+import multiprocessing as mp
+from multiprocessing import Queue
+
+import app.core.globals as g_vars
+import app.models.BinaryProtocol as BinaryProtocol
+import app.utilites.framing as framing
+from app.core.settings import Settings
+from app.services.inference.admission import error_payload
+from app.services.inference.model_registry import artifact_paths
+
+# 소켓 서버용 다중 프로세스 추론 워커 풀.
+# - 워커 프로세스마다 레지스트리/배처/세션 저장소를 따로 두고, 시작할 때 기본 모델을 읽어 warmup
+# - torch(onnxruntime) 스레드 수는 워커당 threads 로 고정해서 코어를 나눠 씀 (과다 구독 방지)
+# - 메인 프로세스(asyncio)는 프레임 본문을 그대로 넘기기만 하고, 파싱/지표/추론은 워커에서 처리
+# - 세션 요청은 세션 ID 해시로, 그 밖의 요청은 연결 단위로 워커를 고정 (세션 상태가 한 워커에만 있으므로)
+# - 관리 명령(admin)은 모든 워커에 보내서 모델 교체 등을 같이 적용
+# 워커가 죽으면 그 워커에 이미 보낸 요청에는 503 을 돌려주고 그 자리에 새 워커를 띄웁니다 (그 워커의 세션은 사라짐).
+# 아직 보내지 않은 요청은 outbox 에 남아 있다가 새 워커로 갑니다.
+
+# 부모에서 바뀐 설정(config.json 이후 수정분)을 워커에도 그대로 적용하기 위한 값들
+_DERIVED_KEYS = ("FEATURES", "input_size", "filter_tolerance", "offset", "save_path", "scaler_path")
+
+def settings_snapshot() -> dict:
+    keys = list(vars(Settings()).keys()) + list(_DERIVED_KEYS)
+    return {k: getattr(g_vars, k) for k in keys if hasattr(g_vars, k)}
+
+def default_threads(n_workers: int) -> int:
+    return max((os.cpu_count() or 1) // max(n_workers, 1), 1)
+
+# 큰 세션 push 는 파싱하지 않고 본문 앞부분(CONTROL_MAX_BYTES)에서 세션 필드만 찾음
+_SESSION_FIELD = re.compile(rb'"session"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_SESSION_ID_FIELD = re.compile(rb'"session_id"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+def _peek_string(pattern, head: bytes):
+    match = pattern.search(head)
+    if match is None:
+        return None
+    try:
+        return json.loads(b'"' + match.group(1) + b'"')
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+
+def route_key(body: bytes):
+    """
+    프레임 본문 → (본문, 워커 고정 키, 종류). 종류는 "admin" | "session" | None.
+    작은 명령만 파싱하고, 큰 세션 push 는 session_id 를 본문 앞 CONTROL_MAX_BYTES 안에서 찾음
+    (세션 ID 없이 여는 세션은 여기서 ID 를 정해서 본문에 넣음, 이후 push 가 같은 워커로 가도록)
+    """
+    if BinaryProtocol.is_binary_request(body):
+        flags, req_id = BinaryProtocol.peek_request(body)
+        if flags & BinaryProtocol.SESSION_PUSH:
+            return body, req_id, "session"
+        return body, None, None
+
+    if b'"admin"' not in body and b'"session"' not in body:
+        return body, None, None
+
+    request = framing.peek_control(body)
+    if request is not None:
+        if "admin" in request:
+            return body, None, "admin"
+        if "session" not in request:
+            return body, None, None
+        if not request.get("session_id") and request["session"] == "open":
+            request["session_id"] = uuid.uuid4().hex
+            body = json.dumps(request, ensure_ascii=False).encode("utf-8")
+        return body, str(request["session_id"]) if request.get("session_id") else None, "session"
+
+    head = body[:framing.CONTROL_MAX_BYTES]
+    if _peek_string(_SESSION_FIELD, head) is None:
+        return body, None, None  # 큰 판정 요청
+    return body, _peek_string(_SESSION_ID_FIELD, head), "session"
+
+def _trim_heap():
+    # warmup 중 trace/추론에 쓰고 해제한 메모리를 OS 에 돌려줌 (glibc 는 해제해도 힙에 남겨 둠)
+    if sys.platform.startswith("linux"):
+        try:
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+
+def worker_main(index: int, requests, responses, model_path: str, scale_path: str, threads: int,
+                snapshot: dict, log_queue: Queue = None):
+    """워커 프로세스 본체: requests 로 (번호, 본문)을 받아 responses 로 (번호, 응답 본문)을 보냄"""
+    for k, v in snapshot.items():
+        setattr(g_vars, k, v)
+    g_vars.CHART_DATA = None  # 차트는 메인 프로세스 쪽에서만 (읽는 쪽 없는 큐가 쌓이지 않게)
+    g_vars.onnx_threads = threads
+    if g_vars.model_mmap == "auto":
+        g_vars.model_mmap = "on"  # 같은 모델을 여러 워커가 올리므로 가중치 공유
+
+    if g_vars.inference_backend != "onnx":
+        import torch
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass
+
+    import app.services.inference.inferece_socket as inferece_socket
+
+    stop_event = threading.Event()
+    ctx = inferece_socket.build_context(model_path, scale_path, stop_event, chart_Show=False, log_queue=log_queue)
+    ctx["args"][0].get_paths(model_path, scale_path)  # 기본 모델 warmup
+    _trim_heap()
+
+    send_lock = threading.Lock()
+    responses.send((-1, index))  # 준비 완료
+
+    def reply(req_id, future):
+        try:
+            payload = future.result()
+        except Exception as e:
+            payload = json.dumps({"status": 500, "message": str(e)}, ensure_ascii=False).encode("utf-8")
+        with send_lock:
+            responses.send((req_id, payload))
+
+    try:
+        while True:
+            try:
+                message = requests.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            req_id, body = message
+            future = ctx["executor"].submit(inferece_socket.process_frame, body, *ctx["args"])
+            future.add_done_callback(lambda f, req_id=req_id: reply(req_id, f))
+    finally:
+        stop_event.set()
+        ctx["executor"].shutdown(wait=True)
+        ctx["args"][1].close()
+
+class _Worker:
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.requests = None  # 메인 → 워커
+        self.responses = None  # 워커 → 메인
+        self.outbox = queue.Queue()
+        self.ready = threading.Event()
+        self.sent = set()  # 이 워커 프로세스에 보냈고 아직 응답이 없는 요청 번호 (self._lock 으로 보호)
+
+class WorkerPool:
+    def __init__(self, n_workers: int, model_path: str, scale_path: str, threads: int = None, log_queue: Queue = None):
+        self.n_workers = max(int(n_workers), 1)
+        self.threads = int(threads or default_threads(self.n_workers))
+        self.model_path = model_path
+        self.scale_path = scale_path
+        self.log_queue = log_queue
+
+        self._workers = [_Worker(i) for i in range(self.n_workers)]
+        self._pending = {}  # 요청 번호 -> (워커 번호, loop, future, 본문)
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._rr = itertools.count()
+        self._closed = False
+        self.restarts = 0
+
+    def _log(self, msg):
+        self.log_queue.put(msg) if self.log_queue else print(msg)
+
+    def _spawn(self, worker: _Worker):
+        req_recv, req_send = mp.Pipe(duplex=False)
+        resp_recv, resp_send = mp.Pipe(duplex=False)
+        worker.ready.clear()
+        worker.requests = req_send
+        worker.responses = resp_recv
+        worker.process = mp.Process(
+            target=worker_main,
+            args=(worker.index, req_recv, resp_send, self.model_path, self.scale_path, self.threads,
+                  settings_snapshot(), self.log_queue),
+            daemon=True,
+        )
+        worker.process.start()
+        req_recv.close()
+        resp_send.close()
+        threading.Thread(target=self._receive, args=(worker, resp_recv), daemon=True).start()
+
+    def start(self, timeout: float = 300.0):
+        """워커를 모두 띄우고 기본 모델 warmup 이 끝날 때까지 대기"""
+        for worker in self._workers:
+            self._spawn(worker)
+            threading.Thread(target=self._send, args=(worker,), daemon=True).start()
+        for worker in self._workers:
+            if not worker.ready.wait(timeout):
+                raise RuntimeError(f"추론 워커 {worker.index} 시작 실패")
+        self._log(f"⚙️ 추론 워커 {self.n_workers}개 준비 (워커당 스레드 {self.threads})")
+        return self
+
+    def _send(self, worker: _Worker):
+        # 파이프 쓰기가 막혀도 이벤트 루프가 멈추지 않도록 워커마다 보내는 스레드를 둠
+        while True:
+            message = worker.outbox.get()
+            while True:
+                worker.ready.wait()  # 재시작 중이면 새 워커가 준비될 때까지 대기
+                try:
+                    worker.requests.send(message)
+                    break
+                except (OSError, ValueError):
+                    # 워커가 죽은 경우: 재시작은 _receive 쪽에서 하고, 이 요청은 새 워커에 다시 보냄
+                    if message is None or self._closed:
+                        break
+                    time.sleep(0.05)
+            if message is None:
+                return  # 종료 요청까지 워커에 보냄
+            with self._lock:
+                if message[0] in self._pending:  # 그 사이 응답이 왔으면 표시하지 않음
+                    worker.sent.add(message[0])
+
+    def _receive(self, worker: _Worker, responses):
+        while True:
+            try:
+                req_id, payload = responses.recv()
+            except (EOFError, OSError):
+                break
+            if req_id == -1:
+                worker.ready.set()
+                continue
+            with self._lock:
+                entry = self._pending.pop(req_id, None)
+                worker.sent.discard(req_id)
+            if entry is not None:
+                _, loop, future, _ = entry
+                loop.call_soon_threadsafe(_resolve, future, payload)
+
+        if self._closed or responses is not worker.responses:
+            return
+        # 워커 비정상 종료: 보낸 요청만 실패 처리 후 재시작 (outbox 에 남은 요청은 새 워커가 처리)
+        worker.ready.clear()
+        worker.process.join(timeout=5)
+        with self._lock:
+            failed = list(worker.sent)
+            worker.sent.clear()
+        self._fail(failed, 503, "추론 워커가 재시작되었습니다.")
+        self.restarts += 1
+        self._log(f"⚠️ 추론 워커 {worker.index} 종료 (exit {worker.process.exitcode}) → 재시작")
+        self._spawn(worker)
+
+    def _fail(self, req_ids: list, status: int, message: str):
+        for req_id in req_ids:
+            with self._lock:
+                entry = self._pending.pop(req_id, None)
+            if entry is not None:
+                _, loop, future, body = entry
+                loop.call_soon_threadsafe(_resolve, future, error_payload(body, status, message))
+
+    def _submit(self, worker: _Worker, body: bytes, loop):
+        future = loop.create_future()
+        req_id = next(self._ids)
+        with self._lock:
+            self._pending[req_id] = (worker.index, loop, future, body)
+        worker.outbox.put((req_id, body))
+        return future
+
+    def connection_key(self) -> int:
+        """새 연결에 배정할 워커 (라운드 로빈)"""
+        return next(self._rr) % self.n_workers
+
+    def _loaded(self, request: dict, workers: list):
+        """관리 명령 load 가 모든 워커에서 받아들여졌으면 이후 (재)시작하는 워커도 새 기본 모델로 띄움"""
+        if request.get("admin") != "load" or any(w.get("status") != 202 for w in workers):
+            return
+        try:
+            self.model_path, self.scale_path = artifact_paths(request.get("model_id"))
+        except ValueError:
+            return
+        g_vars.init_model_path, g_vars.init_scale_path = self.model_path, self.scale_path
+
+    async def dispatch(self, conn_key: int, body: bytes, loop) -> bytes:
+        body, key, kind = route_key(body)
+
+        if kind == "admin":
+            # 모든 워커에 적용. stats 는 워커별 결과를 모아서 반환
+            results = [await self._submit(w, body, loop) for w in self._workers]
+            workers = [json.loads(r.decode("utf-8")) for r in results]
+            self._loaded(framing.peek_control(body), workers)
+            merged = dict(workers[0], workers=workers, restarts=self.restarts)
+            return json.dumps(merged, ensure_ascii=False).encode("utf-8")
+
+        if kind == "session" and key is None and len(body) > framing.CONTROL_MAX_BYTES:
+            return error_payload(body, 400, f"큰 세션 요청은 session_id 를 본문 앞 {framing.CONTROL_MAX_BYTES} 바이트 안에 넣어야 합니다.")
+
+        index = zlib.crc32(key.encode("utf-8")) % self.n_workers if key is not None else conn_key
+        return await self._submit(self._workers[index], body, loop)
+
+    def close(self):
+        self._closed = True
+        for worker in self._workers:
+            worker.ready.set()
+            worker.outbox.put(None)
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+def _resolve(future, payload):
+    if not future.done():
+        future.set_result(payload)
@@ -7,24 +7,23 @@ import time
 import numpy as np
 import os
 
-from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import MinMaxScaler
 
 import app.core.globals as g_vars
 import joblib
 
-from app.models.TransformerMacroDetector import TransformerMacroAutoencoder, MacroDataset
+from app.models.TransformerMacroDetector import TransformerMacroAutoencoder, WindowedMacroDataset
 
 import app.repostitories.JsonController as JsonController
+import app.repostitories.FeatureCache as FeatureCache
+import app.repostitories.FeatureCorpus as FeatureCorpus
 
-from app.core.indicators import indicators_generation
 from multiprocessing import Queue
 
-from app.utilites.make_df_from_points import make_df_from_points
-from app.utilites.make_sequence import make_seq
+from app.utilites.make_sequence import window_starts
 
 from app.utilites.save_confing import update_parameters
-from app.utilites.loss_caculation import Loss_Calculation
+from app.utilites.loss_caculation import Loss_Calculation, recommend_threshold
 
 def train_plot_main(train_queue: Queue):
     import sys
@@ -138,25 +137,7 @@ class TrainMode():
 
                 errors = np.array(all_val_errors)
 
-                # 1. 중앙값과 MAD 계산 (이상치에 절대 안 휘둘림)
-                median_e = np.median(errors)
-                mad_e = np.median(np.abs(errors - median_e))
-
-                # 2. 통계적으로 '정상 범위' 밖의 에러들(Outliers)을 완전히 제외하고 다시 계산
-                # 보통 Median + 3 * (1.4826 * MAD) 밖의 값은 쓰레기 데이터로 봅니다.
-                upper_limit = median_e + (3 * 1.4826 * mad_e)
-                refined_errors = errors[errors < upper_limit]
-
-                # 3. 정제된 에러들로만 다시 평균, 표준편차 계산
-                m_e = np.mean(refined_errors)
-                s_e = np.std(refined_errors)
-
-                # 4. 여기서 배수(Multiplier) 5.0~6.0 적용
-                multiplier = 6.0 
-                current_epoch_threshold = m_e + (multiplier * s_e)
-
-                # 5. 안전장치: 현재 Val(평균)보다는 커야 함
-                current_epoch_threshold = max(current_epoch_threshold, np.mean(errors) * 1.2)
+                current_epoch_threshold = recommend_threshold(errors)
 
                 # 로그 출력
                 status_msg = f"Epoch {epoch+1} | Train: {avg_train_loss:.6f} | Val: {avg_val_loss:.6f} | Thres: {current_epoch_threshold:.6f}"
@@ -204,15 +185,16 @@ class TrainMode():
     def main(self):
         self.log_queue.put(f"device : {self.device} | SEQ_LEN : {g_vars.SEQ_LEN} | STRIDE : {g_vars.STRIDE}")
 
-        user_all: list[dict]
-        filename, user_all = JsonController.read(log_queue=self.log_queue)
-        is_dict = True
-            
-        user_df_chunk = make_df_from_points(user_all, is_dict=is_dict)
+        if g_vars.train_source == "corpus":
+            return self.main_corpus()
 
-        user_df_chunk= user_df_chunk.sort_values('timestamp').reset_index(drop=True)
+        filename, json_path = JsonController.select_path(log_queue=self.log_queue)
+        if not json_path:
+            return
 
-        user_df_chunk = user_df_chunk[user_df_chunk["deltatime"] <= g_vars.filter_tolerance].reset_index(drop=True)
+        def compute_features():
+            user_all: list[dict] = JsonController.load(json_path, log_queue=self.log_queue) or []
+            return FeatureCache.build_features(user_all)
 
         pd.options.display.float_format = '{:,.4f}'.format
         def print_box(title, content, color_code="36"): # 36: Cyan, 32: Green, 33: Yellow
@@ -223,14 +205,9 @@ class TrainMode():
             print(content)
             print("\033[" + color_code + "m" + "-"*width + "\033[0m\n")
 
-        # ===== 지표 생성 ======
-        setting_user_df_chunk: pd.DataFrame = indicators_generation(
-            df_chunk=user_df_chunk, 
-            chunk_size=g_vars.chunk_size, 
-            offset=g_vars.offset
-        )
-
-        setting_user_df_chunk = setting_user_df_chunk[g_vars.FEATURES].copy()
+        # ===== 지표 생성 (같은 기록/설정이면 캐시 사용) ======
+        features = FeatureCache.get_or_compute(json_path, compute_features, log_queue=self.log_queue)
+        setting_user_df_chunk = pd.DataFrame(features, columns=g_vars.FEATURES)
 
         stats_before = setting_user_df_chunk[g_vars.FEATURES].agg(['min', 'max', 'mean', 'std']).T
         print_box("📊 RAW DATA STATISTICS (Before Scaling)", stats_before, "33")        
@@ -250,17 +227,42 @@ class TrainMode():
         joblib.dump(scaler, final_save_path)
         print(f"✅ Cliping Save")
         
-        final_input:np.array = make_seq(data=chunks_scaled_df, seq_len=g_vars.SEQ_LEN, stride=g_vars.STRIDE)
+        # 지표 행렬은 한 벌만 두고, 시퀀스는 윈도우 시작 인덱스로만 표현합니다.
+        feature_matrix = np.ascontiguousarray(scaled_array, dtype=np.float32)
+        starts = window_starts(feature_matrix, seq_len=g_vars.SEQ_LEN, stride=g_vars.STRIDE)
 
-        print(f"✅ 최종 시퀀스 Shape: {final_input.shape}")
-        print(f"🚀 첫 번째 시퀀스 내부 덩어리 예시:\n{final_input[0][0]}")
+        print(f"✅ 최종 시퀀스 Shape: {(len(starts), g_vars.SEQ_LEN, g_vars.input_size)}")
+        print(f"🚀 첫 번째 시퀀스 내부 덩어리 예시:\n{feature_matrix[starts[0]]}")
 
         # ==== 데이터 셋 정의 ====
-        train, val = train_test_split(final_input, test_size=0.2, shuffle=True)
+        dataset = WindowedMacroDataset(feature_matrix, starts, seq_len=g_vars.SEQ_LEN)
+        train_dataset, val_dataset = dataset.split(test_size=0.2, shuffle=True)
+
+        self.fit(filename, train_dataset, val_dataset)
+
+    def main_corpus(self, name: str = None):
+        """user/, move_data/ 기록 전체를 memory-map 코퍼스로 만들어(또는 재사용) 학습"""
+        name = name or g_vars.corpus_name
+
+        if FeatureCorpus.is_up_to_date(name):
+            self.log_queue.put(f"⚡ 코퍼스 재사용: {name}")
+        else:
+            try:
+                FeatureCorpus.build_corpus(name, log_queue=self.log_queue)
+            except ValueError as e:
+                self.log_queue.put(f"❌ 코퍼스 생성 실패: {e}")
+                return
+
+        dataset = FeatureCorpus.load_dataset(name)
+        if len(dataset) < 2:
+            self.log_queue.put(f"❌ 학습할 시퀀스가 부족합니다: {len(dataset)}")
+            return
+        self.log_queue.put(f"✅ 코퍼스 시퀀스: {len(dataset)} (SEQ_LEN {dataset.seq_len})")
 
-        train_dataset = MacroDataset(train)
-        val_dataset   = MacroDataset(val)
+        train_dataset, val_dataset = dataset.split(test_size=0.2, shuffle=True)
+        self.fit(name, train_dataset, val_dataset)
 
+    def fit(self, filename: str, train_dataset, val_dataset):
         # ==== 모델 정의 ====
         model = TransformerMacroAutoencoder(
             input_size=g_vars.input_size,
@@ -0,0 +1,129 @@
+import json
+import socket
+import struct
+import asyncio
+
+import numpy as np
+
+# 길이 접두 프레임: [4바이트 big-endian 길이][본문]
+# 한 연결로 요청/응답을 여러 번 주고받을 수 있고, TCP 에서 쪼개져 와도 본문 길이만큼 다 읽습니다.
+# 이전 클라이언트(접두 없이 JSON 만 보내고 응답 후 끊는 방식)는 첫 바이트가 '{' 인 것으로 구분합니다.
+# ('{' 로 시작하는 길이 접두는 2 GB 이상이라 max_size 에 걸림)
+HEADER = struct.Struct(">I")
+LEGACY_FIRST_BYTE = b"{"
+
+class FrameError(Exception):
+    pass
+
+def encode_frame(payload: bytes) -> bytes:
+    return HEADER.pack(len(payload)) + payload
+
+def encode_json(obj) -> bytes:
+    return encode_frame(json.dumps(obj, ensure_ascii=False).encode("utf-8"))
+
+async def read_frame(reader: asyncio.StreamReader, max_size: int, header: bytes = None) -> bytes:
+    """프레임 하나를 읽어 본문을 반환. header 는 이미 읽은 앞부분 (legacy 판별용)"""
+    header = (header or b"") + await reader.readexactly(HEADER.size - len(header or b""))
+    (size,) = HEADER.unpack(header)
+    if size > max_size:
+        raise FrameError(f"메시지가 너무 큽니다: {size} > {max_size} bytes")
+    return await reader.readexactly(size)
+
+# 관리/세션 열기 같은 작은 명령만 이벤트 루프에서 파싱 (큰 판정 요청은 executor 에서)
+CONTROL_MAX_BYTES = 4096
+
+def peek_control(body: bytes):
+    """작은 JSON 본문(CONTROL_MAX_BYTES 이하)만 파싱해서 dict 로 반환. 크거나 JSON 객체가 아니면 None"""
+    if len(body) > CONTROL_MAX_BYTES:
+        return None
+    try:
+        request = json.loads(body.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    return request if isinstance(request, dict) else None
+
+class JsonBoundary:
+    """
+    접두 없는 JSON 객체가 끝나는 위치 찾기. 파싱하지 않고 문자열 안/밖과 중괄호 깊이만 추적합니다.
+    (이벤트 루프에서 돌기 때문에 조각마다 numpy 로 한 번에 계산, 역슬래시가 있는 조각만 바이트 단위로)
+    """
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+
+    def _feed_bytes(self, chunk: bytes) -> int:
+        for i, c in enumerate(chunk):
+            if self.escape:
+                self.escape = False
+            elif self.in_string:
+                if c == 0x5C:  # '\\'
+                    self.escape = True
+                elif c == 0x22:  # '"'
+                    self.in_string = False
+            elif c == 0x22:
+                self.in_string = True
+            elif c == 0x7B:  # '{'
+                self.depth += 1
+            elif c == 0x7D:  # '}'
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
+    def feed(self, chunk: bytes) -> int:
+        """chunk 안에서 최상위 객체가 끝나는 위치 + 1, 아직 안 끝났으면 -1"""
+        if self.escape or b"\\" in chunk:
+            return self._feed_bytes(chunk)
+        a = np.frombuffer(chunk, dtype=np.uint8)
+        inside = np.logical_xor.accumulate(a == 0x22)  # 여는 따옴표부터 닫는 따옴표 전까지 True
+        if self.in_string:
+            inside = ~inside
+        step = (a == 0x7B).view(np.int8) - (a == 0x7D).view(np.int8)
+        step[inside] = 0
+        depth = np.cumsum(step, dtype=np.int64)
+        depth += self.depth
+        hit = np.flatnonzero((depth == 0) & (step < 0))
+        if len(hit):
+            return int(hit[0]) + 1
+        if len(a):
+            self.depth = int(depth[-1])
+            self.in_string = bool(inside[-1])
+        return -1
+
+async def read_legacy_json(reader: asyncio.StreamReader, max_size: int, head: bytes, idle_timeout: float) -> bytes:
+    """
+    접두 없는 JSON 을 객체 끝(또는 연결 종료)까지 읽어 원본 바이트로 반환.
+    파싱은 하지 않습니다 (executor 의 process_frame 에서 한 번만)
+    """
+    boundary = JsonBoundary()
+    buf = bytearray()
+    chunk = head
+    while True:
+        end = boundary.feed(chunk)
+        if end >= 0:
+            buf += chunk[:end]
+            return bytes(buf)
+        buf += chunk
+        if len(buf) > max_size:
+            raise FrameError(f"메시지가 너무 큽니다: > {max_size} bytes")
+        chunk = await asyncio.wait_for(reader.read(65536), idle_timeout)
+        if not chunk:
+            return bytes(buf)  # 끝까지 안 닫힌 JSON → process_frame 에서 400
+
+# ===== 동기 클라이언트용 =====
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("연결이 끊겼습니다.")
+        buf += chunk
+    return bytes(buf)
+
+def send_frame(sock: socket.socket, payload: bytes):
+    sock.sendall(encode_frame(payload))
+
+def recv_frame(sock: socket.socket) -> bytes:
+    (size,) = HEADER.unpack(_recv_exactly(sock, HEADER.size))
+    return _recv_exactly(sock, size)
@@ -1,4 +1,5 @@
 import torch
+import numpy as np
 
 def Loss_Calculation(outputs, batch):
     return MSE_Loss(outputs, batch)
@@ -21,3 +22,27 @@ def Huber_Loss_Score(outputs, batch, delta=1.0):
     # 샘플별 평균 계산 (batch_size 크기의 벡터 반환)
     sample_huber = (0.5 * quad**2 + delta * lin).mean(dim=(1, 2))
     return sample_huber
+
+
+def recommend_threshold(errors, multiplier: float = 6.0) -> float:
+    """검증 샘플 오차 분포 → 판정 임계치 (학습 시 epoch 마다 계산하는 값과 동일)"""
+    errors = np.asarray(errors)
+
+    # 1. 중앙값과 MAD 계산 (이상치에 절대 안 휘둘림)
+    median_e = np.median(errors)
+    mad_e = np.median(np.abs(errors - median_e))
+
+    # 2. 통계적으로 '정상 범위' 밖의 에러들(Outliers)을 완전히 제외하고 다시 계산
+    # 보통 Median + 3 * (1.4826 * MAD) 밖의 값은 쓰레기 데이터로 봅니다.
+    upper_limit = median_e + (3 * 1.4826 * mad_e)
+    refined_errors = errors[errors < upper_limit]
+
+    # 3. 정제된 에러들로만 다시 평균, 표준편차 계산
+    m_e = np.mean(refined_errors)
+    s_e = np.std(refined_errors)
+
+    # 4. 여기서 배수(Multiplier) 5.0~6.0 적용
+    threshold = m_e + (multiplier * s_e)
+
+    # 5. 안전장치: 현재 Val(평균)보다는 커야 함
+    return max(threshold, np.mean(errors) * 1.2)
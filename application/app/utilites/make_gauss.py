@@ -1,72 +1,149 @@
 import numpy as np
 import sys
 import pandas as pd
+from numba import njit, prange
 from numpy.lib.stride_tricks import as_strided
 
-def make_gauss(data: pd.DataFrame, chunk_size: int, chunk_stride: int, offset: int, train_mode: bool = True) -> np.array:
-    data_np = data.values[offset:].astype(np.float64)
+# diff**3, np.diff(n=2) 같은 블록 임시 배열이 넘지 않도록 하는 메모리 상한 (bytes)
+GAUSS_BLOCK_BYTES = 64 * 1024 * 1024
+
+@njit(parallel=True)
+def _entropy_unique(chunks, bins, eps, out_entropy, out_unique):
+    """
+    모든 (윈도우, 지표) 칸의 히스토그램 엔트로피와 고유값 비율을 한 번에 계산.
+    윈도우 값을 정렬한 뒤 np.histogram(bins) 과 같은 규칙으로 빈을 세고, 정렬된 값에서 고유값 개수를 셉니다.
+    윈도우 단위로 prange 병렬 처리합니다.
+    """
+    num_chunks, chunk_size, n_features = chunks.shape
+    for idx in prange(num_chunks):
+        buf = np.empty(chunk_size)
+        counts = np.zeros(bins, dtype=np.int64)
+        edges = np.empty(bins + 1)
+        for col in range(n_features):
+            for k in range(chunk_size):
+                buf[k] = chunks[idx, k, col]
+            buf.sort()
+
+            # 고유값 비율: 기록기는 유저보다 똑같은 값이 반복될 확률이 높음
+            n_unique = 1
+            for k in range(1, chunk_size):
+                if buf[k] != buf[k - 1]:
+                    n_unique += 1
+            out_unique[idx, col] = n_unique / chunk_size
+
+            # 실측 엔트로피 (np.histogram 과 동일한 빈 경계/보정 규칙)
+            first = buf[0]
+            last = buf[chunk_size - 1]
+            if first == last:
+                first -= 0.5
+                last += 0.5
+            step = (last - first) / bins
+            for b in range(bins + 1):
+                edges[b] = b * step + first
+            edges[bins] = last
+            denom = last - first
+
+            counts[:] = 0
+            for k in range(chunk_size):
+                v = buf[k]
+                i = int(((v - first) / denom) * bins)
+                if i == bins:
+                    i -= 1
+                if v < edges[i]:
+                    i -= 1
+                elif i != bins - 1 and v >= edges[i + 1]:
+                    i += 1
+                counts[i] += 1
+
+            total = 0.0
+            for b in range(bins):
+                total += counts[b]
+            ent = 0.0
+            for b in range(bins):
+                if counts[b] > 0:
+                    p = counts[b] / (total + eps)
+                    ent -= p * np.log2(p)
+            out_entropy[idx, col] = ent
+
+
+def make_gauss(data: pd.DataFrame, chunk_size: int, chunk_stride: int, offset: int, train_mode: bool = True,
+               max_block_bytes: int = GAUSS_BLOCK_BYTES) -> np.array:
+    data_np = np.ascontiguousarray(np.asarray(data)[offset:], dtype=np.float64)
     n_samples, n_features = data_np.shape
     eps = 1e-9
 
     num_chunks = (n_samples - chunk_size) // chunk_stride + 1
     if num_chunks <= 0: return np.array([])
-    
+
     itemsize = data_np.itemsize
     chunks = as_strided(
         data_np,
         shape=(num_chunks, chunk_size, n_features),
-        strides=(chunk_stride * n_features * itemsize, n_features * itemsize, itemsize)
+        strides=(chunk_stride * n_features * itemsize, n_features * itemsize, itemsize),
+        writeable=False,
     )
 
-    # 1. 기본 통계량
-    m = np.mean(chunks, axis=1, keepdims=True)
-    diff = chunks - m
-    s = np.std(chunks, axis=1, ddof=0)
-    s_safe = s + eps
+    s = np.empty((num_chunks, n_features))
+    sk = np.empty((num_chunks, n_features))
+    roughness = np.empty((num_chunks, n_features))
+    jerk_rough = np.empty((num_chunks, n_features))
 
-    # 지표 1: 왜도 (대칭성)
-    sk = np.mean(diff**3, axis=1) / (s_safe**3)
-    
-    # 지표 2: 거칠기 (1차 미분 - 속도의 변화)
-    roughness = np.mean(np.abs(np.diff(chunks, axis=1)), axis=1)
+    # 블록당 임시 배열 ~3개 (diff, diff**3, 2차 미분) 가 메모리 상한 안에 들어가도록 블록 크기 결정
+    per_chunk_bytes = 3 * chunk_size * n_features * itemsize
+    block = max(1, int(max_block_bytes // max(per_chunk_bytes, 1)))
 
-    # 지표 3: 가속도 거칠기 (2차 미분 - 기록기 보간법 검거용)
-    # 유저는 떨림 때문에 이게 크고, 매크로는 계산된 부드러운 곡선이라 이게 매우 작습니다.
-    jerk_rough = np.mean(np.abs(np.diff(chunks, n=2, axis=1)), axis=1)
+    for start in range(0, num_chunks, block):
+        end = min(start + block, num_chunks)
+        part = chunks[start:end]
 
-    # 2. 엔트로피 및 고유값 분석
-    actual_entropy = np.zeros((num_chunks, n_features))
-    unique_ratio = np.zeros((num_chunks, n_features)) # 지표 4: 고유값 비율
-    
-    for idx in range(num_chunks):
-        window = chunks[idx]
-        for col in range(n_features):
-            col_data = window[:, col]
-            
-            # 실측 엔트로피
-            counts, _ = np.histogram(col_data, bins=10)
-            p = counts / (counts.sum() + eps)
-            p = p[p > 0]
-            actual_entropy[idx, col] = -np.sum(p * np.log2(p))
-            
-            # 고유값 비율: 기록기는 유저보다 똑같은 값이 반복될 확률이 높음
-            unique_ratio[idx, col] = len(np.unique(col_data)) / chunk_size
+        # 1. 기본 통계량
+        m = np.mean(part, axis=1, keepdims=True)
+        diff = part - m
+        s_blk = np.sqrt(np.mean(diff * diff, axis=1))
+        s[start:end] = s_blk
+
+        # 지표 1: 왜도 (대칭성)
+        np.power(diff, 3, out=diff)
+        sk[start:end] = np.mean(diff, axis=1) / ((s_blk + eps)**3)
+        del diff
+
+        # 지표 2: 거칠기 (1차 미분 - 속도의 변화)
+        d1 = np.diff(part, axis=1)
+        roughness[start:end] = np.mean(np.abs(d1), axis=1)
 
-        if train_mode and ((idx + 1) % max(1, (num_chunks // 50)) == 0 or (idx + 1) == num_chunks):
-            progress = (idx + 1) / num_chunks
+        # 지표 3: 가속도 거칠기 (2차 미분 - 기록기 보간법 검거용)
+        # 유저는 떨림 때문에 이게 크고, 매크로는 계산된 부드러운 곡선이라 이게 매우 작습니다.
+        d2 = np.diff(d1, axis=1)
+        np.abs(d2, out=d2)
+        jerk_rough[start:end] = np.mean(d2, axis=1)
+        del d1, d2
+
+        if train_mode:
+            progress = end / num_chunks
             bar = '■' * int(20 * progress) + '□' * (20 - int(20 * progress))
-            sys.stdout.write(f'\r특징 추출 중: [{bar}] {progress*100:>5.1f}% ({idx+1}/{num_chunks})')
+            sys.stdout.write(f'\r특징 추출 중 (통계): [{bar}] {progress*100:>5.1f}% ({end}/{num_chunks})')
             sys.stdout.flush()
 
+    if train_mode:
+        sys.stdout.write('\n특징 추출 중 (엔트로피/고유값)...')
+        sys.stdout.flush()
+
+    # 2. 엔트로피 및 고유값 분석 (전체 윈도우를 한 번에, 병렬)
+    actual_entropy = np.zeros((num_chunks, n_features))
+    unique_ratio = np.zeros((num_chunks, n_features)) # 지표 4: 고유값 비율
+    _entropy_unique(chunks, 10, eps, actual_entropy, unique_ratio)
+
+    s_safe = s + eps
+
     # 이론적 엔트로피 및 갭
     theo_entropy = 0.5 * np.log2(2 * np.pi * np.e * (s_safe**2) + eps)
     entropy_gap = theo_entropy - actual_entropy
-    
+
     # [수정] 지표별로 5가지 특성을 묶음 (Sk, Gap, Rough, Jerk, Unique)
     # 이제 한 지표당 5개의 파라미터가 들어갑니다.
     combined = np.stack([sk, entropy_gap, roughness, jerk_rough, unique_ratio], axis=-1)
-    result = combined.reshape(num_chunks, -1) 
+    result = combined.reshape(num_chunks, -1)
 
     if train_mode:
-        sys.stdout.write('\n')
-    return result
\ No newline at end of file
+        sys.stdout.write(' 완료\n')
+    return result
@@ -1,14 +1,56 @@
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
-def make_seq(data:np.ndarray, seq_len:int, stride:int) -> np.array:
-    # ==== Seq 작업 ====
-    seq_len = seq_len
-    seq_stride = stride
-    sequences = []
+def _as_rows(data) -> np.ndarray:
+    # DataFrame.values 는 열 우선(F-order)일 수 있어서, 윈도우가 연속 메모리가 되도록 행 우선으로 맞춥니다.
+    return np.ascontiguousarray(np.asarray(data))
 
-    for j in range(0, len(data) - seq_len + 1, seq_stride):
-        seq = data[j : j + seq_len]
-        sequences.append(seq)
+def seq_view(data, seq_len: int) -> np.ndarray:
+    """
+    stride=1 윈도우 전체를 복사 없이 보는 읽기 전용 뷰 (n - seq_len + 1, seq_len, n_features).
+    """
+    data = _as_rows(data)
+    if len(data) < seq_len:
+        return np.empty((0, seq_len) + data.shape[1:], dtype=data.dtype)
+    # sliding_window_view 는 윈도우 축을 마지막에 붙이므로 (윈도우, seq_len, 지표) 순서로 바꿉니다.
+    return np.moveaxis(sliding_window_view(data, seq_len, axis=0), -1, 1)
 
-    return np.array(sequences) 
+def window_starts(data, seq_len: int, stride: int, skip_zero: bool = False) -> np.ndarray:
+    """
+    윈도우 시작 인덱스. skip_zero 이면 모든 값이 0 인 윈도우(움직임 없음)를 제외합니다.
+    """
+    data = np.asarray(data)
+    n = len(data)
+    if n < seq_len:
+        return np.empty(0, dtype=np.int64)
 
+    starts = np.arange(0, n - seq_len + 1, stride, dtype=np.int64)
+    if skip_zero:
+        # 0 이 아닌 값이 있는 행의 누적 개수로 윈도우마다 O(1) 판정
+        nonzero = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.any(data.reshape(n, -1) != 0, axis=1), out=nonzero[1:])
+        starts = starts[nonzero[starts + seq_len] - nonzero[starts] > 0]
+    return starts
+
+def make_seq(data, seq_len: int, stride: int, skip_zero: bool = False) -> np.array:
+    """
+    (윈도우, seq_len, 지표) 시퀀스 배열.
+    skip_zero 가 아니면 원본을 복사하지 않는 strided 뷰를 반환합니다 (읽기 전용).
+    """
+    view = seq_view(data, seq_len)
+    if not skip_zero:
+        return view[::stride]
+    return view[window_starts(data, seq_len, stride, skip_zero=True)]
+
+def iter_seq_batches(data, seq_len: int, stride: int, batch_size: int, skip_zero: bool = False,
+                     dtype=np.float32):
+    """
+    윈도우를 batch_size 개씩 (시작 인덱스, (batch, seq_len, 지표) 연속 배열) 로 만들어 돌려줍니다.
+    한 번에 배치 하나만 메모리에 올립니다.
+    """
+    data = _as_rows(data)
+    view = seq_view(data, seq_len)
+    starts = window_starts(data, seq_len, stride, skip_zero=skip_zero)
+    for i in range(0, len(starts), batch_size):
+        idx = starts[i:i + batch_size]
+        yield idx, np.ascontiguousarray(view[idx], dtype=dtype)
@@ -3,6 +3,7 @@ import numpy as np
 import pandas as pd
 from multiprocessing import Queue
 import traceback
+from app.utilites.make_sequence import seq_view, window_starts
 
 # stride = > seq 데이터 겹치는 양 (How much each sequence shifts forward)
 def points_to_features(df_chunk: pd.DataFrame, seq_len: int = g_vars.SEQ_LEN, stride: int = g_vars.STRIDE, log_queue:Queue=None):
@@ -12,21 +13,15 @@ def points_to_features(df_chunk: pd.DataFrame, seq_len: int = g_vars.SEQ_LEN, st
     def df_to_seq(df: pd.DataFrame):
         nonlocal Total_Pass_SEQ
         try:
-            X = []
-            n_rows = len(df)
+            values = df[g_vars.FEATURES].to_numpy()
 
-            for i in range(0, n_rows - seq_len + 1, stride):
-                seq = df.iloc[i:i + seq_len][g_vars.FEATURES].values
+            # 윈도우를 하나씩 잘라 복사하지 않고, strided 뷰에서 살아남은 윈도우만 한 번에 꺼냅니다.
+            starts = window_starts(values, seq_len, stride, skip_zero=True)
+            Total_Pass_SEQ += len(starts)
 
-                if np.all(seq==0):
-                    continue
-
-                Total_Pass_SEQ += 1
-                X.append(seq)
-
-            if len(X) == 0:
+            if len(starts) == 0:
                 return np.empty((0, seq_len, len(g_vars.FEATURES)), dtype=np.float32)
-            return np.asarray(X, dtype=np.float32)
+            return np.asarray(seq_view(values, seq_len)[starts], dtype=np.float32)
         
         except Exception as e:
             log_queue.put("Error occurred in df_to_seq:")
@@ -0,0 +1,32 @@
+import time
+
+from app.services.inference.scheduler import InferenceScheduler
+
+class FakeDetector:
+    """이벤트마다 판정할 윈도우가 하나씩 생기는 탐지기"""
+    def __init__(self):
+        self.stride = 1
+        self.window = 0
+        self.skips = 0
+
+    def ingest(self, data: dict) -> bool:
+        self.window += 1
+        return True
+
+    def skip(self):
+        self.skips += 1
+
+    def score_latest(self) -> dict:
+        return {"window": self.window}
+
+def test_stale_then_fresh_scores_latest_window_once():
+    detector = FakeDetector()
+    scheduler = InferenceScheduler(detector, latency_budget=0.25, log_queue=None)
+    now = time.perf_counter()
+
+    verdicts = scheduler.process([{"captured_at": now - 1.0}, {"captured_at": now}])
+
+    assert [v["window"] for v in verdicts] == [2]
+    assert verdicts[0]["latency"] < 0.25
+    assert scheduler.skipped == 1
+    assert scheduler.level == 0